@@ -4,12 +4,35 @@ AIS Global Fishing - A Python client for the Global Fishing Watch Gateway v3 API
 This package provides a simple interface to the Global Fishing Watch API,
 allowing users to query vessel identity, AIS tracks, behavioral events,
 port-visits, encounters, trips, risk scores & more.
+
+Sub-modules are imported lazily: ``import ais_global_fishing`` does not load
+``requests`` or ``dotenv`` until :class:`GFWClient` is first accessed.
 """
 
-from .gfw_client_lib import GFWClient
+from __future__ import annotations
+
+import importlib
 
 __version__ = "0.1.0"
 __author__ = "Peter Rosemann"
 __email__ = "dkdndes@gmail.com"
 
 __all__ = ["GFWClient"]
+
+# public name -> defining sub-module
+_LAZY_ATTRS = {
+    "GFWClient": "gfw_client_lib",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -3,21 +3,63 @@
 Command-line interface for the AIS Global Fishing client.
 
 This module provides a CLI around the GFWClient class, allowing users to
-search vessels and get vessel details from the command line.
+search vessels, get vessel details, bulk-export tracks, events, port
+visits, encounters and trips, risk-screen many vessels and query stored
+results with SQL from the command line, and profile any of these
+sub-commands.
+
+Start-up cost matters here (``gfw details`` is called from shell loops), so
+only ``argparse`` is imported at module level.  The client – and with it
+``requests`` and ``dotenv`` – is loaded by the sub-command that needs it.
 """
 
 from __future__ import annotations
 
 import argparse
 import sys
-from pprint import pprint
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .export import Shard
+
+
+def __getattr__(name: str):
+    # ``GFWClient`` is resolved on first access so that building the parser
+    # and ``--help`` never import ``requests``.
+    if name == "GFWClient":
+        from .gfw_client_lib import GFWClient
+
+        return GFWClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Profiler attached to every client created while `gfw profile` runs a workload.
+_profiler = None
+
+
+def _client():
+    """Create a :class:`GFWClient` (goes through the module so it can be patched)."""
+    client = sys.modules[__name__].GFWClient()
+    if _profiler is not None:
+        _profiler.attach(client)
+    return client
+
+
+def _phase(family: str):
+    """Time a post-processing block as ``build`` of *family* while `gfw profile` runs."""
+    from contextlib import nullcontext
 
-from .gfw_client_lib import GFWClient
+    return _profiler.phase("build", family) if _profiler is not None else nullcontext()
 
 
 def cmd_search(args: argparse.Namespace) -> None:
     """Handle the `search` sub-command."""
-    client = GFWClient()
+    from pprint import pprint
+
+    client = _client()
     result = client.search_vessels(
         query=args.query,
         where=args.where,
@@ -38,7 +80,9 @@ def cmd_search(args: argparse.Namespace) -> None:
 
 def cmd_details(args: argparse.Namespace) -> None:
     """Handle the `details` sub-command."""
-    client = GFWClient()
+    from pprint import pprint
+
+    client = _client()
     details = client.get_vessel_details(
         vessel_id=args.vessel_id,
         includes=args.include,
@@ -46,6 +90,302 @@ def cmd_details(args: argparse.Namespace) -> None:
     pprint(details)
 
 
+# ---------------------------------------------------------------------- #
+# Bulk export commands
+# ---------------------------------------------------------------------- #
+def _parse_time(value: str) -> datetime:
+    """argparse ``type=`` for ISO dates / datetimes (``2024-01-31[T12:00]``)."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO date/time: {value!r}")
+
+
+def _shard_days(value: str) -> int:
+    """argparse ``type=`` for ``--shard-days``: a whole number of days, 0 or more."""
+    try:
+        days = int(value)
+    except ValueError:
+        days = -1
+    if days < 0:
+        raise argparse.ArgumentTypeError(f"expected a whole number of days (0 or more): {value!r}")
+    return days
+
+
+def _windows(args: argparse.Namespace) -> list:
+    """``--start``/``--end`` as UTC :class:`TimeWindow` shards of ``--shard-days``."""
+    from .timewindow import TimeWindow
+
+    step = timedelta(days=args.shard_days) if args.shard_days else None
+    return TimeWindow.of(args.start, args.end).split(step)
+
+
+def _run_shards(args: argparse.Namespace, shards: list[Shard]) -> None:
+    """Stream *shards* to ``--output`` (or stdout), honouring ``--resume``."""
+    from contextlib import ExitStack
+    from pathlib import Path
+
+    from .export import Checkpoint, run_export
+
+    with ExitStack() as stack:
+        checkpoint = None
+        if args.output:
+            output = Path(args.output)
+            ckpt_path = output.with_name(output.name + ".checkpoint")
+            if not args.resume:
+                ckpt_path.unlink(missing_ok=True)
+            checkpoint = Checkpoint(ckpt_path)
+            stack.callback(checkpoint.close)
+            if args.resume and output.exists() and checkpoint.position is not None:
+                # Drop whatever a shard that did not complete left behind.
+                with output.open("r+b") as fh:
+                    fh.truncate(checkpoint.position)
+            mode = "a" if args.resume else "w"
+            out = stack.enter_context(output.open(mode, encoding="utf-8"))
+        elif args.resume:
+            print("--resume requires --output", file=sys.stderr)
+            sys.exit(2)
+        else:
+            out = sys.stdout
+
+        stats = run_export(shards, out, workers=args.workers, checkpoint=checkpoint, profiler=_profiler)
+
+    print(
+        f"{stats.written} shards written ({stats.records} records), "
+        f"{stats.skipped} skipped, {len(stats.failed)} failed",
+        file=sys.stderr,
+    )
+    if stats.failed:
+        sys.exit(1)
+
+
+def cmd_track(args: argparse.Namespace) -> None:
+    """Handle the `track` sub-command."""
+    from .export import Shard
+
+    client = _client()
+    windows = _windows(args)
+    shards = [
+        Shard(
+            key=f"track:{vessel_id}:{window.key()}",
+            fetch=partial(client.get_track, vessel_id, window.start, window.end, args.resolution),
+            tag={"vesselId": vessel_id},
+        )
+        for vessel_id in args.vessel_ids
+        for window in windows
+    ]
+    _run_shards(args, shards)
+
+
+def cmd_events(args: argparse.Namespace) -> None:
+    """Handle the `events` sub-command."""
+    from .export import Shard
+
+    client = _client()
+    windows = _windows(args)
+    shards = [
+        Shard(
+            key=f"events:{vessel_id}:{window.key()}",
+            fetch=partial(client.get_events, vessel_id, window.start, window.end, args.type, all_pages=True),
+        )
+        for vessel_id in args.vessel_ids
+        for window in windows
+    ]
+    _run_shards(args, shards)
+
+
+def cmd_port_visits(args: argparse.Namespace) -> None:
+    """Handle the `port-visits` sub-command."""
+    from .export import Shard
+
+    client = _client()
+    shards = [
+        Shard(
+            key=f"port-visits:{window.key()}",
+            fetch=partial(
+                client.get_port_visits, window.start, window.end, args.vessel, args.port, all_pages=True
+            ),
+        )
+        for window in _windows(args)
+    ]
+    _run_shards(args, shards)
+
+
+def cmd_event_collection(args: argparse.Namespace) -> None:
+    """Handle the `encounters` / `loitering` sub-commands."""
+    from .export import Shard
+
+    client = _client()
+    fetcher = getattr(client, args.method)
+    shards = [
+        Shard(
+            key=f"{args.command}:{window.key()}",
+            fetch=partial(fetcher, window.start, window.end, args.vessel, all_pages=True),
+        )
+        for window in _windows(args)
+    ]
+    _run_shards(args, shards)
+
+
+def cmd_trips(args: argparse.Namespace) -> None:
+    """Handle the `trips` sub-command (one shard per vessel)."""
+    from .export import Shard
+
+    client = _client()
+    shards = [
+        Shard(
+            key=f"trips:{vessel_id}",
+            fetch=partial(client.get_trips, vessel_id, all_pages=True),
+            tag={"vesselId": vessel_id},
+        )
+        for vessel_id in args.vessel_ids
+    ]
+    _run_shards(args, shards)
+
+
+def cmd_risk(args: argparse.Namespace) -> None:
+    """Handle the `risk` sub-command (bulk risk screening)."""
+    import json
+    from contextlib import ExitStack
+
+    from .risk import RiskScreener, write_table
+
+    vessels: list = list(args.vessel_ids)
+    for path in args.input or []:
+        with open(path, encoding="utf-8") as fh, _phase("risk"):
+            vessels.extend(json.loads(line) for line in fh if line.strip())
+    if not vessels:
+        print("No vessel ids given (pass ids or --input)", file=sys.stderr)
+        sys.exit(2)
+
+    screener = RiskScreener(_client(), workers=args.workers, rps=args.rps)
+    with ExitStack() as stack:
+        out = stack.enter_context(open(args.output, "w", encoding="utf-8", newline="")) if args.output else sys.stdout
+        count = write_table(screener.screen(vessels), out, fmt=args.format)
+
+    print(
+        f"{count} vessels screened ({screener.stats.cache_hits} cached, {screener.stats.errors} failed)",
+        file=sys.stderr,
+    )
+    if screener.stats.errors:
+        sys.exit(1)
+
+
+def cmd_sql(args: argparse.Namespace) -> None:
+    """Handle the `sql` sub-command (SQL over locally stored results)."""
+    import csv
+    import json
+    from contextlib import ExitStack
+
+    from .query import QueryStore
+
+    with QueryStore(args.database) as store:
+        for spec in args.load or []:
+            table, _, path = spec.partition("=")
+            with open(path, encoding="utf-8") as fh:
+                rows = store.add(table, [json.loads(line) for line in fh if line.strip()])
+            print(f"{rows} rows loaded into {table}", file=sys.stderr)
+        for path in args.jobs or []:
+            from .jobs import JobQueue
+
+            with JobQueue(path) as queue:
+                for table, rows in store.load_jobs(queue).items():
+                    print(f"{rows} rows loaded into {table}", file=sys.stderr)
+        if not args.query:
+            return
+
+        with ExitStack() as stack:
+            out = stack.enter_context(open(args.output, "w", encoding="utf-8", newline="")) if args.output else sys.stdout
+            writer = None
+            count = 0
+            for row in store.iter_query(args.query):
+                count += 1
+                if args.format == "jsonl":
+                    out.write(json.dumps(row, separators=(",", ":"), ensure_ascii=False) + "\n")
+                    continue
+                if writer is None:
+                    writer = csv.DictWriter(out, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(row)
+        print(f"{count} rows", file=sys.stderr)
+
+
+def cmd_profile(args: argparse.Namespace) -> None:
+    """Handle the `profile` sub-command (run another sub-command under the profiler)."""
+    import json
+    from pathlib import Path
+
+    from .profiling import Profiler, StackSampler, speedscope
+
+    global _profiler
+    argv = args.workload[1:] if args.workload[:1] == ["--"] else args.workload
+    if not argv or argv[0] == "profile":
+        print("Give the sub-command to profile, e.g. `gfw profile -- events VESSEL_ID --start …`", file=sys.stderr)
+        sys.exit(2)
+    workload = build_parser().parse_args(argv)
+
+    _profiler = Profiler(sample_rate=args.sample_rate)
+    sampler = StackSampler(interval=args.interval)
+    started = time.perf_counter()
+    try:
+        with sampler:
+            workload.func(workload)
+    finally:
+        # Also report a workload that failed: where it spent its time is
+        # often the question.
+        profiler, _profiler = _profiler, None
+        wall = time.perf_counter() - started
+        print(f"\n{' '.join(argv)}: {wall:.3f} s wall time", file=sys.stderr)
+        print(profiler.report(), file=sys.stderr)
+        if sampler.samples:
+            print("\nhottest functions (sampled self time):", file=sys.stderr)
+            for name, seconds in sampler.top(args.top):
+                print(f"  {seconds:>8.3f}  {name}", file=sys.stderr)
+        if args.speedscope:
+            Path(args.speedscope).write_text(json.dumps(speedscope(profiler, sampler, name=" ".join(argv))))
+            print(f"speedscope profile written to {args.speedscope}", file=sys.stderr)
+
+
+def cmd_mock_server(args: argparse.Namespace) -> None:
+    """Handle the `mock-server` sub-command."""
+    from .mockserver import run
+
+    run(
+        host=args.host,
+        port=args.port,
+        rps=args.rps,
+        burst=args.burst,
+        max_in_flight=args.max_in_flight,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        fleet_size=args.fleet_size,
+        page_size=args.page_size,
+        compress=not args.no_compress,
+        bandwidth=args.bandwidth,
+        seed=args.seed,
+    )
+
+
+def _add_export_options(parser: argparse.ArgumentParser, *, windowed: bool = True) -> None:
+    """Options shared by every bulk export sub-command."""
+    if windowed:
+        parser.add_argument("--start", type=_parse_time, required=True, help="Window start (ISO date/time, UTC)")
+        parser.add_argument("--end", type=_parse_time, required=True, help="Window end (ISO date/time, UTC)")
+        parser.add_argument(
+            "--shard-days",
+            type=_shard_days,
+            default=30,
+            help="Split the window into shards of N days (0 = single request, default: 30)",
+        )
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Parallel requests (default: 4)")
+    parser.add_argument("-o", "--output", help="JSON Lines output file (default: stdout)")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to --output and skip shards listed in its .checkpoint file",
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="CLI helper for the Global Fishing Watch Gateway v3 API"
@@ -79,6 +419,115 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_details.set_defaults(func=cmd_details)
 
+    # track --------------------------------------------------------------
+    p_track = sub.add_parser("track", help="Export AIS tracks for one or more vessels")
+    p_track.add_argument("vessel_ids", nargs="+", metavar="vessel_id", help="GFW vessel-id(s)")
+    p_track.add_argument("-r", "--resolution", default="1h", help="Track resolution (default: 1h)")
+    _add_export_options(p_track)
+    p_track.set_defaults(func=cmd_track)
+
+    # events -------------------------------------------------------------
+    p_events = sub.add_parser("events", help="Export behavioural events for one or more vessels")
+    p_events.add_argument("vessel_ids", nargs="+", metavar="vessel_id", help="GFW vessel-id(s)")
+    p_events.add_argument(
+        "-t",
+        "--type",
+        action="append",
+        metavar="EVENT_TYPE",
+        help="Event type filter (e.g. FISHING, PORT_VISIT)",
+    )
+    _add_export_options(p_events)
+    p_events.set_defaults(func=cmd_events)
+
+    # port-visits --------------------------------------------------------
+    p_visits = sub.add_parser("port-visits", help="Export port visits")
+    p_visits.add_argument("--vessel", action="append", metavar="VESSEL_ID", help="Restrict to vessel-id")
+    p_visits.add_argument("--port", action="append", metavar="PORT_ID", help="Restrict to port-id")
+    _add_export_options(p_visits)
+    p_visits.set_defaults(func=cmd_port_visits)
+
+    # encounters / loitering ---------------------------------------------
+    for name, method, help_text in (
+        ("encounters", "get_encounters", "Export vessel-to-vessel encounters"),
+        ("loitering", "get_loitering_events", "Export loitering events"),
+    ):
+        p_coll = sub.add_parser(name, help=help_text)
+        p_coll.add_argument("--vessel", action="append", metavar="VESSEL_ID", help="Restrict to vessel-id")
+        _add_export_options(p_coll)
+        p_coll.set_defaults(func=cmd_event_collection, method=method)
+
+    # trips --------------------------------------------------------------
+    p_trips = sub.add_parser(
+        "trips",
+        help="Export port-to-port trips (not time-bounded by the API; sharded per vessel)",
+    )
+    p_trips.add_argument("vessel_ids", nargs="+", metavar="vessel_id", help="GFW vessel-id(s)")
+    _add_export_options(p_trips, windowed=False)
+    p_trips.set_defaults(func=cmd_trips)
+
+    # risk ---------------------------------------------------------------
+    p_risk = sub.add_parser("risk", help="Risk-screen many vessels concurrently")
+    p_risk.add_argument("vessel_ids", nargs="*", metavar="vessel_id", help="GFW vessel-id(s)")
+    p_risk.add_argument(
+        "--input",
+        action="append",
+        metavar="FILE",
+        help="JSON Lines export (e.g. from `gfw port-visits -o`) to take vessel ids from",
+    )
+    p_risk.add_argument("-w", "--workers", type=int, default=8, help="Parallel requests (default: 8)")
+    p_risk.add_argument("--rps", type=float, help="Request-rate limit per second")
+    p_risk.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv", help="Output format (default: csv)")
+    p_risk.add_argument("-o", "--output", help="Output file (default: stdout)")
+    p_risk.set_defaults(func=cmd_risk)
+
+    # sql ----------------------------------------------------------------
+    p_sql = sub.add_parser("sql", help="Query locally stored results with SQL")
+    p_sql.add_argument("database", help="SQLite query store (created if missing)")
+    p_sql.add_argument("query", nargs="?", help="SQL statement to run (omit to only load data)")
+    p_sql.add_argument(
+        "--load",
+        action="append",
+        metavar="TABLE=FILE",
+        help="Load a JSON Lines export into TABLE (vessels, events, port_visits, trips, track_points)",
+    )
+    p_sql.add_argument("--jobs", action="append", metavar="FILE", help="Load the results of a bulk-job queue")
+    p_sql.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv", help="Output format (default: csv)")
+    p_sql.add_argument("-o", "--output", help="Output file (default: stdout)")
+    p_sql.set_defaults(func=cmd_sql)
+
+    # profile ------------------------------------------------------------
+    p_profile = sub.add_parser(
+        "profile",
+        help="Run another sub-command and break its time down by endpoint and phase",
+    )
+    p_profile.add_argument("--speedscope", metavar="FILE", help="Also write a speedscope profile (JSON)")
+    p_profile.add_argument(
+        "--interval", type=float, default=0.005, help="Stack sampling interval in seconds (default: 0.005)"
+    )
+    p_profile.add_argument("--sample-rate", type=float, default=1.0, help="Fraction of requests timed (default: 1)")
+    p_profile.add_argument("--top", type=int, default=10, help="Hottest functions to list (default: 10)")
+    p_profile.add_argument("workload", nargs=argparse.REMAINDER, help="Sub-command to run, after --")
+    p_profile.set_defaults(func=cmd_profile)
+
+    # mock-server --------------------------------------------------------
+    p_mock = sub.add_parser("mock-server", help="Run a local synthetic Gateway v3 server for benchmarks")
+    p_mock.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    p_mock.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    p_mock.add_argument("--rps", type=float, help="Request quota per second (429 beyond it)")
+    p_mock.add_argument("--burst", type=float, help="Token-bucket burst size (default: --rps, at least 1)")
+    p_mock.add_argument("--max-in-flight", type=int, help="Concurrent requests allowed (429 beyond it)")
+    p_mock.add_argument(
+        "--latency",
+        help="Latency spec: fixed:S, uniform:LO,HI, exponential:MEAN or lognormal:MEDIAN,SIGMA",
+    )
+    p_mock.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    p_mock.add_argument("--fleet-size", type=int, default=50, help="Synthetic vessels behind /events and /ports")
+    p_mock.add_argument("--page-size", type=int, default=1000, help="Default page size of list endpoints")
+    p_mock.add_argument("--no-compress", action="store_true", help="Never gzip response bodies")
+    p_mock.add_argument("--bandwidth", type=float, help="Simulated link speed in bytes per second")
+    p_mock.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    p_mock.set_defaults(func=cmd_mock_server)
+
     return parser
 
 
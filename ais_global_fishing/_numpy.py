@@ -0,0 +1,17 @@
+"""
+_numpy.py
+
+The optional ``numpy`` import of the analytics modules
+(:mod:`~ais_global_fishing.tracks`, :mod:`~ais_global_fishing.timeline`,
+:mod:`~ais_global_fishing.network`, …): ``from ._numpy import np`` fails
+with an install hint when the ``analytics`` extra is missing.
+"""
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover
+    raise ImportError(
+        "this part of ais_global_fishing requires numpy: pip install 'ais-global-fishing[analytics]'"
+    ) from exc
+
+__all__ = ["np"]
@@ -0,0 +1,44 @@
+"""
+_sqlite.py
+
+Connection set-up and transactions shared by the SQLite-backed stores
+(:mod:`~ais_global_fishing.jobs`, :mod:`~ais_global_fishing.activity`,
+:mod:`~ais_global_fishing.query` and :mod:`~ais_global_fishing.coordination`).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def connect(path: str | Path, schema: str, *, timeout: float = 5.0) -> sqlite3.Connection:
+    """
+    Open *path* in autocommit mode, usable from any thread (callers
+    serialise access with their own lock), switch it to WAL journaling with
+    ``synchronous=NORMAL`` so that readers never block the writer, and
+    create *schema*.
+    """
+    db = sqlite3.connect(str(path), timeout=timeout, check_same_thread=False, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(schema)
+    return db
+
+
+@contextmanager
+def transaction(db: sqlite3.Connection, mode: str = "") -> Iterator[sqlite3.Connection]:
+    """
+    Run the block in one transaction (``BEGIN`` *mode*, e.g. ``IMMEDIATE``):
+    committed at the end, rolled back if anything raises, so the connection
+    is never left inside an open transaction.
+    """
+    db.execute(f"BEGIN {mode}".rstrip())
+    try:
+        yield db
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
@@ -0,0 +1,302 @@
+"""
+activity.py
+
+Incremental per-vessel cache for ``get_events`` and ``get_track``.
+
+Dashboards poll the same vessels over a trailing window ("last 30 days")
+every few minutes.  :class:`ActivityStore` remembers, per vessel and per
+kind of query, which time ranges it already holds and keeps the records
+themselves in a local SQLite file.  :class:`ActivityCache` answers a
+``(vessel, start, end)`` query from the store and only asks the API for the
+missing parts – in the polling case just the few minutes since the last
+poll, re-fetched from *overlap* earlier to pick up late-arriving or
+still-growing events.
+
+Fetched records are merged in place: events are keyed by their ``id`` and
+track points by their timestamp, so a re-fetched record replaces the stored
+one instead of being duplicated.
+
+Example
+-------
+>>> cache = ActivityCache(client, ActivityStore("activity.sqlite"))
+>>> while True:
+...     now = datetime.now(timezone.utc)
+...     events = cache.events(vessel_id, now - timedelta(days=30), now)
+...     time.sleep(300)
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from ._sqlite import connect, transaction
+from .canonical import joined
+from .records import page_records
+from .timewindow import TimeLike, TimeWindow, to_utc
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS coverage (
+    vessel_id   TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    lo          REAL NOT NULL,
+    hi          REAL NOT NULL,
+    PRIMARY KEY (vessel_id, kind, lo)
+);
+CREATE TABLE IF NOT EXISTS records (
+    vessel_id   TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    rec_key     TEXT NOT NULL,
+    ts          REAL NOT NULL,
+    body        TEXT NOT NULL,
+    PRIMARY KEY (vessel_id, kind, rec_key)
+);
+CREATE INDEX IF NOT EXISTS records_time ON records (vessel_id, kind, ts);
+"""
+
+Interval = tuple[float, float]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    """Sort and merge overlapping or touching ``(lo, hi)`` intervals."""
+    merged: list[list[float]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return [(lo, hi) for lo, hi in merged]
+
+
+def missing_intervals(lo: float, hi: float, covered: Iterable[Interval]) -> list[Interval]:
+    """Parts of ``[lo, hi)`` not covered by the (merged, sorted) *covered* intervals."""
+    gaps = []
+    cursor = lo
+    for c_lo, c_hi in covered:
+        if c_hi <= cursor:
+            continue
+        if c_lo >= hi:
+            break
+        if c_lo > cursor:
+            gaps.append((cursor, c_lo))
+        cursor = max(cursor, c_hi)
+    if cursor < hi:
+        gaps.append((cursor, hi))
+    return gaps
+
+
+class ActivityStore:
+    """
+    SQLite store of per-vessel records and the time ranges they cover.
+
+    *kind* strings separate independent query types for the same vessel
+    (e.g. ``"events:FISHING"`` vs ``"track:1h"``).  Times are stored as
+    epoch seconds (UTC).
+
+    Parameters
+    ----------
+    path
+        Database file (created if missing); ``":memory:"`` for a throw-away
+        store.
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db = connect(self.path, _SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "ActivityStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Coverage
+    # ------------------------------------------------------------------ #
+    def coverage(self, vessel_id: str, kind: str) -> list[Interval]:
+        """Merged time ranges held for ``(vessel_id, kind)``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT lo, hi FROM coverage WHERE vessel_id = ? AND kind = ? ORDER BY lo",
+                (vessel_id, kind),
+            ).fetchall()
+        return [(lo, hi) for lo, hi in rows]
+
+    def missing(self, vessel_id: str, kind: str, lo: float, hi: float) -> list[Interval]:
+        """Parts of ``[lo, hi)`` that are not held yet."""
+        return missing_intervals(lo, hi, self.coverage(vessel_id, kind))
+
+    # ------------------------------------------------------------------ #
+    # Records
+    # ------------------------------------------------------------------ #
+    def merge(
+        self,
+        vessel_id: str,
+        kind: str,
+        span: Optional[Interval],
+        records: Iterable[tuple[str, float, Any]],
+    ) -> int:
+        """
+        Upsert ``(key, timestamp, record)`` triples and mark *span* as covered.
+
+        Records already stored under the same key are replaced, and the new
+        span (if any) is merged into the existing coverage, in one
+        transaction.  Returns the number of records written.
+        """
+        rows = [(vessel_id, kind, key, ts, json.dumps(rec, separators=(",", ":"))) for key, ts, rec in records]
+        with self._lock:
+            with transaction(self._db):
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO records (vessel_id, kind, rec_key, ts, body) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if span is not None and span[1] > span[0]:
+                    self._merge_span(vessel_id, kind, span)
+        return len(rows)
+
+    def _merge_span(self, vessel_id: str, kind: str, span: Interval) -> None:
+        held = self._db.execute(
+            "SELECT lo, hi FROM coverage WHERE vessel_id = ? AND kind = ? AND hi >= ? AND lo <= ?",
+            (vessel_id, kind, span[0], span[1]),
+        ).fetchall()
+        self._db.execute(
+            "DELETE FROM coverage WHERE vessel_id = ? AND kind = ? AND hi >= ? AND lo <= ?",
+            (vessel_id, kind, span[0], span[1]),
+        )
+        self._db.executemany(
+            "INSERT INTO coverage (vessel_id, kind, lo, hi) VALUES (?, ?, ?, ?)",
+            [(vessel_id, kind, lo, hi) for lo, hi in merge_intervals([*held, span])],
+        )
+
+    def records(self, vessel_id: str, kind: str, lo: float, hi: float) -> list:
+        """Stored records with a timestamp in ``[lo, hi)``, in time order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT body FROM records WHERE vessel_id = ? AND kind = ? AND ts >= ? AND ts < ? "
+                "ORDER BY ts, rec_key",
+                (vessel_id, kind, lo, hi),
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def iter_records(self, kind_prefix: str = "") -> Iterator[tuple[str, str, Any]]:
+        """Every stored ``(vessel_id, kind, record)`` whose kind starts with *kind_prefix*."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT vessel_id, kind, body FROM records WHERE substr(kind, 1, ?) = ? ORDER BY vessel_id, kind, ts",
+                (len(kind_prefix), kind_prefix),
+            ).fetchall()
+        for vessel_id, kind, body in rows:
+            yield vessel_id, kind, json.loads(body)
+
+    def invalidate(self, vessel_id: str, kind: Optional[str] = None) -> None:
+        """Forget everything held for *vessel_id* (optionally one *kind* only)."""
+        clause, args = ("vessel_id = ?", (vessel_id,)) if kind is None else ("vessel_id = ? AND kind = ?", (vessel_id, kind))
+        with self._lock:
+            with transaction(self._db):
+                self._db.execute(f"DELETE FROM records WHERE {clause}", args)
+                self._db.execute(f"DELETE FROM coverage WHERE {clause}", args)
+
+
+def _event_row(event: dict) -> tuple[str, float, dict]:
+    ts = to_utc(event["start"]).timestamp()
+    return str(event.get("id") or f"{event.get('type')}@{ts}"), ts, event
+
+
+def _point_row(feature: dict) -> tuple[str, float, dict]:
+    ts = to_utc(feature["properties"]["timestamp"]).timestamp()
+    return repr(ts), ts, feature
+
+
+class ActivityCache:
+    """
+    Delta-fetching front end of :class:`GFWClient` for per-vessel activity.
+
+    Parameters
+    ----------
+    client
+        The :class:`~ais_global_fishing.GFWClient` used for missing ranges.
+    store
+        Where records and coverage are kept (in memory by default).
+    overlap
+        How far before the end of held data a delta fetch starts, so that
+        events reported late – or still open at the previous poll – are
+        picked up and merged.
+    clock
+        Returns the current time; coverage never extends past it, so the
+        trailing edge of a window is always re-checked on the next poll.
+
+    Attributes ``requests`` and ``fetched`` count API calls and records
+    received, which makes the cost of a polling loop visible.
+    """
+
+    def __init__(
+        self,
+        client,
+        store: Optional[ActivityStore] = None,
+        *,
+        overlap: timedelta = timedelta(hours=6),
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.client = client
+        self.store = store if store is not None else ActivityStore()
+        self.overlap = overlap.total_seconds()
+        self.clock = clock
+        self.requests = 0
+        self.fetched = 0
+
+    def events(
+        self,
+        vessel_id: str,
+        start: TimeLike,
+        end: TimeLike,
+        event_types: Optional[Iterable[str]] = None,
+    ) -> dict:
+        """
+        Like :meth:`GFWClient.get_events`, fetching only what is not held
+        yet.  Every page of a missing range is fetched before the range is
+        marked as held.
+        """
+        types = sorted(set(event_types)) if event_types else None
+        kind = f"events:{joined(types) if types else '*'}"
+
+        def fetch(window: TimeWindow) -> list:
+            page = self.client.get_events(vessel_id, window.start, window.end, event_types=types, all_pages=True)
+            return [_event_row(e) for e in page_records(page) if isinstance(e, dict) and e.get("start")]
+
+        entries = self._query(vessel_id, kind, start, end, fetch)
+        return {"entries": entries, "total": len(entries)}
+
+    def track(self, vessel_id: str, start: TimeLike, end: TimeLike, resolution: str = "1h") -> dict:
+        """Like :meth:`GFWClient.get_track`, fetching only what is not held yet."""
+        kind = f"track:{resolution}"
+
+        def fetch(window: TimeWindow) -> list:
+            page = self.client.get_track(vessel_id, window.start, window.end, resolution=resolution)
+            return [_point_row(f) for f in page_records(page) if isinstance(f, dict) and "properties" in f]
+
+        return {"type": "FeatureCollection", "features": self._query(vessel_id, kind, start, end, fetch)}
+
+    def _query(self, vessel_id: str, kind: str, start: TimeLike, end: TimeLike, fetch) -> list:
+        window = TimeWindow.of(start, end)
+        lo, hi = window.start.timestamp(), window.end.timestamp()
+        now = to_utc(self.clock()).timestamp()
+        covered = self.store.coverage(vessel_id, kind)
+
+        for gap_lo, gap_hi in missing_intervals(lo, hi, covered):
+            # Re-read a little of what is held before the gap for late data.
+            if any(c_lo < gap_lo <= c_hi for c_lo, c_hi in covered):
+                gap_lo = max(gap_lo - self.overlap, lo)
+            rows = fetch(TimeWindow.of(gap_lo, gap_hi))
+            self.requests += 1
+            self.fetched += len(rows)
+            self.store.merge(vessel_id, kind, (gap_lo, min(gap_hi, now)), rows)
+
+        return self.store.records(vessel_id, kind, lo, hi)
@@ -0,0 +1,119 @@
+"""
+cache.py
+
+In-memory response cache with per-entry expiry.
+
+:class:`TTLCache` keeps values for *ttl* seconds and, when *maxsize* is
+set, evicts the least recently used entry once full.  It is thread-safe,
+so one instance can be shared by the worker threads of a fan-out.
+
+Example
+-------
+>>> cache = TTLCache(ttl=timedelta(hours=24), maxsize=100_000)
+>>> cache.set("v1", {"score": 0.4})
+>>> cache.get("v1")
+{'score': 0.4}
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Callable, Hashable, Optional, Union
+
+Seconds = Union[float, timedelta]
+
+_MISSING = object()
+
+
+def _seconds(value: Seconds) -> float:
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class TTLCache:
+    """
+    Thread-safe mapping whose entries expire after *ttl*.
+
+    Parameters
+    ----------
+    ttl
+        Default lifetime of an entry (seconds or ``timedelta``).
+    maxsize
+        Upper bound on the number of entries (LRU eviction); ``None`` for
+        unbounded.
+    clock
+        Monotonic clock in seconds; injectable for tests.
+
+    ``hits`` / ``misses`` count lookups through :meth:`get`.
+    """
+
+    def __init__(
+        self,
+        ttl: Seconds,
+        maxsize: Optional[int] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = _seconds(ttl)
+        if self.ttl <= 0:
+            raise ValueError("'ttl' must be positive")
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value stored under *key*, or *default* if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires, value = entry
+                if expires > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[Seconds] = None) -> None:
+        """Store *value* for *ttl* (default: the cache's ttl)."""
+        expires = self._clock() + (self.ttl if ttl is None else _seconds(ttl))
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > self._clock()
+
+    def __len__(self) -> int:
+        """Number of stored entries (expired ones are dropped first)."""
+        self.expire()
+        return len(self._data)
+
+    def expire(self) -> int:
+        """Drop every expired entry; return how many were dropped."""
+        now = self._clock()
+        with self._lock:
+            stale = [key for key, (expires, _) in self._data.items() if expires <= now]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
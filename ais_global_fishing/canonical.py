@@ -0,0 +1,136 @@
+"""
+canonical.py
+
+Canonical encoding of Gateway v3 requests.
+
+Two calls that ask the API the same question – the same IDs in a different
+order, a repeated include, ``+00:00`` instead of ``Z`` – should look the same
+to everything that keys on requests: response caches, in-flight coalescing,
+the job queue and recorded replays.  This module defines that canonical form
+and the stable hash derived from it.
+
+* list parameters (``ids[i]``, ``datasets[i]``, ``includes[i]`` and the
+  comma-joined ``vesselIds``, ``portIds``, ``eventType``, ``includes``) are
+  sorted and de-duplicated;
+* ``start`` / ``end`` are normalised to ``YYYY-MM-DDTHH:MM:SSZ`` in UTC;
+* parameters are ordered by name.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Optional
+
+from .timewindow import format_time
+
+# Parameters sent as ``name[0]=…&name[1]=…``.
+INDEXED_PARAMS = ("ids", "datasets", "includes")
+
+# Parameters sent as one comma-separated value.
+JOINED_PARAMS = frozenset({"vesselIds", "portIds", "eventType", "includes"})
+
+TIME_PARAMS = frozenset({"start", "end"})
+
+_INDEXED_RE = re.compile(r"^(?P<name>[A-Za-z_-]+)\[(?P<idx>\d+)\]$")
+
+
+def unique_sorted(values: Optional[Iterable[str]]) -> list[str]:
+    """Sorted list of the distinct, non-empty *values*."""
+    if not values:
+        return []
+    return sorted({v for v in values if v})
+
+
+def indexed(name: str, values: Optional[Iterable[str]]) -> dict[str, str]:
+    """Encode *values* as ``{name[0]: …, name[1]: …}`` in canonical order."""
+    return {f"{name}[{idx}]": value for idx, value in enumerate(unique_sorted(values))}
+
+
+def joined(values: Optional[Iterable[str]]) -> str:
+    """Encode *values* as one comma-separated string in canonical order."""
+    return ",".join(unique_sorted(values))
+
+
+def joined_groups(
+    values: Optional[Iterable[str]],
+    *,
+    max_items: int,
+    max_chars: int,
+) -> list[str]:
+    """
+    Split *values* into comma-joined groups (in canonical order) of at most
+    *max_items* values and *max_chars* characters each.
+
+    A single value longer than *max_chars* still gets a group of its own.
+    """
+    groups: list[str] = []
+    current: list[str] = []
+    size = 0
+    for value in unique_sorted(values):
+        extra = len(value) + (1 if current else 0)
+        if current and (len(current) >= max_items or size + extra > max_chars):
+            groups.append(",".join(current))
+            current, size, extra = [], 0, len(value)
+        current.append(value)
+        size += extra
+    if current:
+        groups.append(",".join(current))
+    return groups
+
+
+def canonical_params(params: Optional[Mapping[str, Any]]) -> dict[str, Any]:
+    """Return the canonical form of a query-parameter mapping."""
+    if not params:
+        return {}
+
+    lists: dict[str, set[str]] = {}
+    scalars: dict[str, Any] = {}
+    for key, value in params.items():
+        match = _INDEXED_RE.match(key)
+        if match and match["name"] in INDEXED_PARAMS:
+            lists.setdefault(match["name"], set()).add(value)
+        elif key in JOINED_PARAMS and isinstance(value, str):
+            scalars[key] = joined(value.split(","))
+        elif key in TIME_PARAMS and isinstance(value, (str, datetime)):
+            scalars[key] = format_time(value)
+        else:
+            scalars[key] = value
+
+    for name, values in lists.items():
+        scalars.update(indexed(name, values))
+    return dict(sorted(scalars.items()))
+
+
+@dataclass(frozen=True)
+class Request:
+    """
+    Immutable, canonical ``GET`` request.
+
+    Build one with :meth:`Request.of`; equal requests compare and hash equal
+    and share the same :attr:`key`.
+    """
+
+    path: str
+    params: tuple[tuple[str, Any], ...] = ()
+
+    @classmethod
+    def of(cls, path: str, params: Optional[Mapping[str, Any]] = None) -> "Request":
+        return cls(path, tuple(canonical_params(params).items()))
+
+    @property
+    def key(self) -> str:
+        """Stable SHA-256 hex digest identifying the request."""
+        payload = json.dumps([self.path, self.params], separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(self.params)
+
+
+def request_key(path: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Stable hash of the canonical form of ``(path, params)``."""
+    return Request.of(path, params).key
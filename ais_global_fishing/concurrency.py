@@ -0,0 +1,201 @@
+"""
+concurrency.py
+
+Adaptive limits on the number of requests in flight.
+
+A fixed thread count is either too low (idle capacity) or too high (the
+gateway answers ``429``).  :class:`AdaptiveLimit` finds the right number
+while running, in the style of TCP congestion control (AIMD):
+
+* every successful response while at least half the limit is in use
+  raises it by ``1 / limit`` – about one more request per round trip;
+* a throttled or failed response (``429``, ``5xx``, connection error) or a
+  smoothed latency above *tolerance* × the unloaded latency cuts it by the
+  factor *backoff*, at most once per round trip so that one burst of
+  rejections counts as a single congestion signal.
+
+:class:`AdaptiveConcurrency` keeps one limit per endpoint family (tracks,
+events, port visits, …), since each is served by a differently loaded
+backend.  :class:`~ais_global_fishing.GFWClient` routes every request
+through one, so all its parallel paths – split filters, exports, bulk jobs,
+risk screening – share the learned limits.  Thread counts of those paths
+become upper bounds; the limiter decides how many requests actually run.
+
+Example
+-------
+>>> client = GFWClient(concurrency=AdaptiveConcurrency(initial=4, max_limit=32))
+>>> run_jobs(client, queue, workers=32)
+>>> client.concurrency.limits()
+{'events': 11, 'vessels/track': 6}
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+OK = "ok"
+DROPPED = "dropped"
+IGNORED = "ignored"
+
+# Weight of a new sample in the smoothed latency, and how fast the
+# unloaded-latency estimate may drift upwards (per sample).
+_SMOOTHING = 0.2
+_BASELINE_DRIFT = 0.01
+
+
+def endpoint_family(path: str) -> str:
+    """
+    Group a request path into the family whose limit applies to it.
+
+    ``/vessels/{id}/track`` → ``vessels/track``, ``/vessels/{id}`` →
+    ``vessels/details``, ``/events/fishing`` → ``events``,
+    ``/ports/visits`` → ``ports``, ``/vessels/search`` → ``vessels/search``.
+    """
+    parts = [part for part in path.split("/") if part]
+    if not parts:
+        return ""
+    if parts[0] == "vessels":
+        if len(parts) >= 3:
+            return f"vessels/{parts[2]}"
+        if len(parts) == 2:
+            return "vessels/search" if parts[1] == "search" else "vessels/details"
+    return parts[0]
+
+
+@dataclass
+class LimitStats:
+    requests: int = 0
+    dropped: int = 0
+    increases: int = 0
+    decreases: int = 0
+
+
+class AdaptiveLimit:
+    """
+    Thread-safe AIMD concurrency limit.
+
+    Parameters
+    ----------
+    initial
+        Starting limit.
+    min_limit, max_limit
+        Bounds of the limit.
+    backoff
+        Factor applied to the limit on a congestion signal.
+    tolerance
+        Smoothed latency above ``tolerance`` × the unloaded latency counts
+        as congestion.
+    clock
+        Monotonic clock in seconds; injectable for tests.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        *,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        backoff: float = 0.7,
+        tolerance: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("expected 1 <= min_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("'backoff' must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._clock = clock
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.latency: Optional[float] = None  # smoothed
+        self.baseline: Optional[float] = None  # unloaded estimate
+        self._last_decrease = float("-inf")
+        self.stats = LimitStats()
+
+    @property
+    def limit(self) -> int:
+        """Requests allowed in flight right now."""
+        return int(self._limit)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a free slot; ``False`` if *timeout* ran out first."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < int(self._limit), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, outcome: str = OK) -> None:
+        """
+        Free a slot and feed back how the request went: *outcome* is
+        :data:`OK`, :data:`DROPPED` (throttled / server or network error) or
+        :data:`IGNORED` (e.g. a ``404``, which says nothing about load).
+        """
+        with self._cond:
+            # Only a limit that is (mostly) used is known to be too low.
+            saturated = 2 * self.in_flight >= self._limit
+            self.in_flight -= 1
+            self.stats.requests += 1
+            if outcome == DROPPED:
+                self.stats.dropped += 1
+                self._decrease()
+            elif outcome == OK:
+                self._observe(latency)
+                if self.latency > self.tolerance * self.baseline:
+                    self._decrease()
+                elif saturated and self._limit < self.max_limit:
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                    self.stats.increases += 1
+            self._cond.notify_all()
+
+    def _observe(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = self.baseline = latency
+            return
+        self.latency += _SMOOTHING * (latency - self.latency)
+        if latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += _BASELINE_DRIFT * (latency - self.baseline)
+
+    def _decrease(self) -> None:
+        now = self._clock()
+        if now - self._last_decrease < (self.latency or 0):
+            return  # same round trip as the previous signal
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+        self.stats.decreases += 1
+
+
+class AdaptiveConcurrency:
+    """
+    One :class:`AdaptiveLimit` per endpoint family, created on first use
+    with the options given here.
+    """
+
+    def __init__(self, initial: float = 4, **options):
+        self.initial = initial
+        self.options = options
+        AdaptiveLimit(initial, **options)  # validate once, up front
+        self._limits: dict[str, AdaptiveLimit] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, path: str) -> AdaptiveLimit:
+        family = endpoint_family(path)
+        with self._lock:
+            limit = self._limits.get(family)
+            if limit is None:
+                limit = self._limits[family] = AdaptiveLimit(self.initial, **self.options)
+            return limit
+
+    def limits(self) -> dict[str, int]:
+        """Current limit of every family seen so far."""
+        with self._lock:
+            return {family: limit.limit for family, limit in sorted(self._limits.items())}
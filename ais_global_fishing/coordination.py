@@ -0,0 +1,333 @@
+"""
+coordination.py
+
+Response cache, request quota and in-flight de-duplication shared by all
+processes on a host.
+
+A :class:`~ais_global_fishing.cache.TTLCache` and a
+:class:`~ais_global_fishing.ratelimit.TokenBucket` live in one process; a
+``multiprocessing`` pool or a Celery fleet of N workers therefore caches
+everything N times and spends N times the quota.  The classes here keep
+that state in one local SQLite file (WAL mode) instead, which every process
+opens by path:
+
+* :class:`SharedCache` – drop-in for ``TTLCache`` as ``GFWClient(cache=…)``;
+  the client keys entries by base URL and request, so clients of different
+  gateways can share one file.
+  It also hands out *leases*: the first process to miss a key claims it and
+  fetches, the others wait for its result to appear in the cache, so a
+  request needed by every worker is sent once per host.
+* :class:`SharedBucket` – drop-in for ``TokenBucket`` as
+  ``GFWClient(bucket=…)``; refills and withdrawals are atomic transactions,
+  so all processes together stay within one quota.
+
+Both reopen their connection after a ``fork`` and pickle as their path and
+settings, so they can be passed to pool initialisers and Celery tasks.
+
+Example
+-------
+>>> def init_worker():
+...     global client
+...     client = GFWClient(
+...         cache=SharedCache("/tmp/gfw-shared.sqlite", ttl=timedelta(hours=6)),
+...         bucket=SharedBucket("/tmp/gfw-shared.sqlite", rate=10, burst=20),
+...     )
+>>> with multiprocessing.Pool(8, initializer=init_worker) as pool:
+...     pool.map(screen_vessel, vessel_ids)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from ._sqlite import connect, transaction
+from .cache import Seconds, _seconds
+from .ratelimit import _Bucket, _capacity
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key      TEXT PRIMARY KEY,
+    value    BLOB NOT NULL,
+    expires  REAL NOT NULL,
+    stored   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_stored ON cache (stored);
+CREATE TABLE IF NOT EXISTS leases (
+    key      TEXT PRIMARY KEY,
+    owner    TEXT NOT NULL,
+    expires  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    name     TEXT PRIMARY KEY,
+    tokens   REAL NOT NULL,
+    updated  REAL NOT NULL
+);
+"""
+
+_MISSING = object()
+
+# Sets between two size checks of a bounded cache.
+_EVICT_EVERY = 64
+
+
+class _SharedDB:
+    """One SQLite connection per process to the shared state file."""
+
+    def __init__(self, path: str | Path, clock: Callable[[], float]):
+        self.path = str(path)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pid = None
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection inherited through fork() must not be used by the child.
+        if self._pid != os.getpid():
+            self._db = connect(self.path, _SCHEMA, timeout=30)
+            self._pid = os.getpid()
+        return self._db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = self._pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state.update(_lock=None, _pid=None, _db=None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class SharedCache(_SharedDB):
+    """
+    Response cache in a SQLite file, shared by every process opening it.
+
+    Parameters
+    ----------
+    path
+        Database file (created if missing); may be shared with a
+        :class:`SharedBucket`.
+    ttl
+        Default lifetime of an entry (seconds or ``timedelta``).
+    maxsize
+        Upper bound on the number of entries, enforced every few writes by
+        dropping the oldest ones; ``None`` for unbounded.
+    lease
+        Seconds a claim on a key stays valid (see :meth:`claim`); a crashed
+        owner's claim lapses after it.
+    clock
+        Wall clock in seconds (shared by all processes); injectable for
+        tests.
+
+    Values are stored as zlib-compressed JSON, so :meth:`get` returns a new
+    copy each time.  ``hits`` / ``misses`` count this process's lookups.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: Seconds,
+        maxsize: Optional[int] = None,
+        *,
+        lease: float = 120.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(path, clock)
+        self.ttl = _seconds(ttl)
+        if self.ttl <= 0:
+            raise ValueError("'ttl' must be positive")
+        self.maxsize = maxsize
+        self.lease = lease
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        with self._lock:
+            self._connect()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value stored under *key*, or *default* if absent or expired."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM cache WHERE key = ? AND expires > ?", (key, self._clock())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, value: Any, ttl: Optional[Seconds] = None) -> None:
+        """Store *value* (JSON-serialisable) for *ttl* (default: the cache's ttl)."""
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        now = self._clock()
+        expires = now + (self.ttl if ttl is None else _seconds(ttl))
+        with self._lock:
+            db = self._connect()
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, blob, expires, now))
+            self._writes += 1
+            if self.maxsize is not None and self._writes % _EVICT_EVERY == 0:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        (count,) = db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self.maxsize:
+            db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored LIMIT ?)",
+                (count - self.maxsize,),
+            )
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, _MISSING)
+        with self._lock:
+            self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT 1 FROM cache WHERE key = ? AND expires > ?", (key, self._clock())
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        """Number of stored entries (expired ones are dropped first)."""
+        self.expire()
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def expire(self) -> int:
+        """Drop every expired entry and lease; return how many entries were dropped."""
+        now = self._clock()
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM leases WHERE expires <= ?", (now,))
+            return db.execute("DELETE FROM cache WHERE expires <= ?", (now,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM cache")
+            db.execute("DELETE FROM leases")
+
+    # ------------------------------------------------------------------ #
+    # Leases (cross-process in-flight de-duplication)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _owner() -> str:
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def claim(self, key: str) -> bool:
+        """
+        Claim the right to fetch *key*; ``False`` if another process (or
+        thread) holds an unexpired claim.
+        """
+        now = self._clock()
+        with self._lock:
+            db = self._connect()
+            with transaction(db, "IMMEDIATE"):
+                db.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+                claimed = db.execute(
+                    "INSERT OR IGNORE INTO leases VALUES (?, ?, ?)", (key, self._owner(), now + self.lease)
+                ).rowcount == 1
+        return claimed
+
+    def release(self, key: str) -> None:
+        """Give up this thread's claim on *key*."""
+        with self._lock:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner()))
+
+    def wait(self, key: str, default: Any = None, *, poll: float = 0.01, max_poll: float = 0.2) -> Any:
+        """
+        Wait while another process holds a claim on *key*: return the value
+        it stored, or *default* once the claim is gone without one (the
+        fetch failed or the owner died).
+        """
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            with self._lock:
+                held = self._connect().execute(
+                    "SELECT 1 FROM leases WHERE key = ? AND expires > ?", (key, self._clock())
+                ).fetchone()
+            if held is None:
+                value = self.get(key, _MISSING)
+                return default if value is _MISSING else value
+            time.sleep(poll)
+            poll = min(max_poll, poll * 2)
+
+
+class SharedBucket(_SharedDB, _Bucket):
+    """
+    Token bucket in a SQLite file: every process opening *path* with the
+    same *name* spends from one quota.  Same interface as
+    :class:`~ais_global_fishing.ratelimit.TokenBucket`.
+
+    *rate* and *burst* are this process's view; processes should agree on
+    them.  ``rate=None`` means unlimited.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        *,
+        name: str = "default",
+        clock: Callable[[], float] = time.time,
+    ):
+        capacity = _capacity(rate, burst)
+        super().__init__(path, clock)
+        self.rate = rate
+        self.capacity = capacity
+        self.name = name
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", (name, self.capacity, self._clock())
+            )
+
+    def _spend(self, n: float) -> tuple[float, Optional[float]]:
+        """Refill, then spend *n* tokens if possible: ``(tokens left, wait)``."""
+        with self._lock:
+            db = self._connect()
+            with transaction(db, "IMMEDIATE"):
+                row = db.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                now = self._clock()
+                tokens, updated = row if row is not None else (self.capacity, now)
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                wait = None
+                if n:
+                    if tokens >= n:
+                        tokens -= n
+                    else:
+                        wait = (n - tokens) / self.rate
+                db.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (self.name, tokens, now))
+        return tokens, wait
+
+    @property
+    def available(self) -> float:
+        """Tokens that could be spent right now (``inf`` when unlimited)."""
+        if not self.rate:
+            return float("inf")
+        return self._spend(0)[0]
+
+    def _take(self, n: float) -> Optional[float]:
+        return self._spend(n)[1]
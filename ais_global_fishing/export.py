@@ -0,0 +1,186 @@
+"""
+export.py
+
+Sharded, resumable bulk export of API results to JSON Lines.
+
+A bulk export is described as a list of :class:`Shard` objects – one API
+call each, typically one vessel × one time window.  :func:`run_export`
+executes them on a thread pool and writes every record to the output
+stream as soon as its shard completes, so memory use is bounded by the
+number of shards in flight rather than by the size of the export.
+
+Completed shard keys are appended to a :class:`Checkpoint` file; re-running
+the same export with the checkpoint skips everything already written.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, TextIO
+
+from .records import PartialResultError, page_records
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    One unit of export work.
+
+    Parameters
+    ----------
+    key
+        Stable identifier, recorded in the checkpoint once written.
+    fetch
+        Zero-argument callable performing the API request.
+    tag
+        Extra top-level fields merged into every record of this shard
+        (e.g. ``{"vesselId": ...}`` for per-vessel endpoints whose rows do
+        not name the vessel).
+    """
+
+    key: str
+    fetch: Callable[[], Any]
+    tag: dict = field(default_factory=dict)
+
+
+@dataclass
+class ExportStats:
+    """Outcome of :func:`run_export`."""
+
+    written: int = 0
+    skipped: int = 0
+    records: int = 0
+    failed: list[tuple[str, BaseException]] = field(default_factory=list)
+
+
+class Checkpoint:
+    """
+    Append-only file of completed shard keys (one per line), each followed
+    by a tab and the size of the output once the shard was written.
+
+    The key is only appended after the shard's records have been flushed to
+    the output, so a crash can at worst leave part of the shard that was
+    being written – never lose one.  :attr:`position` is the output size of
+    the last completed shard; truncating the output to it before resuming
+    drops that partial shard, which is then written again in full.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._done: set[str] = set()
+        # Nothing completed yet: none of the output is needed.
+        self.position: Optional[int] = 0
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    key, _, position = line.rstrip("\n").partition("\t")
+                    self._done.add(key)
+                    self.position = int(position) if position else None
+        self._fh: Optional[TextIO] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def mark(self, key: str, position: Optional[int] = None) -> None:
+        """Record *key* as completed, with the output size *position* if known."""
+        if self._fh is None:
+            self._fh = self.path.open("a", encoding="utf-8")
+        self._fh.write(key + (f"\t{position}" if position is not None else "") + "\n")
+        self._fh.flush()
+        self._done.add(key)
+        self.position = position
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def write_records(out: TextIO, page: Any, tag: Optional[dict] = None) -> int:
+    """Write every record of *page* to *out* as JSON Lines and return the count."""
+    count = 0
+    for record in page_records(page):
+        if tag and isinstance(record, dict):
+            record = {**record, **tag}
+        out.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    out.flush()
+    return count
+
+
+def run_export(
+    shards: Iterable[Shard],
+    out: TextIO,
+    *,
+    workers: int = 4,
+    checkpoint: Optional[Checkpoint] = None,
+    log: Optional[TextIO] = sys.stderr,
+    profiler: Optional[Any] = None,
+) -> ExportStats:
+    """
+    Execute *shards* concurrently and stream their records to *out*.
+
+    At most ``2 * workers`` shards are in flight at any time; a finished
+    shard is written and dropped before the next one is submitted.  Failed
+    shards – including pages that report failed parts under ``"errors"``
+    (see :class:`~ais_global_fishing.records.PartialResultError`) – are
+    reported in :attr:`ExportStats.failed`, not written, and left out of
+    the checkpoint so that a re-run retries them.
+
+    With a :class:`~ais_global_fishing.profiling.Profiler`, writing each
+    shard is timed as its ``build`` phase, under the family named by the
+    shard key's prefix (``"trips"`` for ``"trips:<vessel>"``).
+    """
+    if workers < 1:
+        raise ValueError("'workers' must be >= 1")
+
+    stats = ExportStats()
+    pending = iter(shards)
+    in_flight: dict = {}
+
+    def _submit(pool: ThreadPoolExecutor) -> bool:
+        for shard in pending:
+            if checkpoint is not None and shard.key in checkpoint:
+                stats.skipped += 1
+                continue
+            in_flight[pool.submit(shard.fetch)] = shard
+            return True
+        return False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while len(in_flight) < 2 * workers and _submit(pool):
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard = in_flight.pop(future)
+                try:
+                    page = future.result()
+                    if isinstance(page, dict) and page.get("errors"):
+                        raise PartialResultError(page, page["errors"])
+                except Exception as exc:
+                    stats.failed.append((shard.key, exc))
+                    if log is not None:
+                        print(f"[failed] {shard.key}: {exc}", file=log)
+                else:
+                    family = shard.key.partition(":")[0]
+                    with profiler.phase("build", family) if profiler is not None else nullcontext():
+                        stats.records += write_records(out, page, shard.tag)
+                    stats.written += 1
+                    if checkpoint is not None:
+                        checkpoint.mark(shard.key, out.tell() if out.seekable() else None)
+                _submit(pool)
+
+    return stats
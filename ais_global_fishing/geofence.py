@@ -0,0 +1,497 @@
+"""
+geofence.py
+
+Zone membership (EEZs, MPAs, fishing areas …) for track points and event
+positions at scale.
+
+A :class:`ZoneSet` is loaded from GeoJSON (or a shapefile, with ``pyshp``)
+and indexed once: every polygon edge is filed under the horizontal bands
+of latitude it spans, sorted by zone.  Classifying points is then a
+vectorised ray cast – each point is tested only against the few edges of
+its band, and a point lies in a zone when it crosses an odd number of that
+zone's edges (holes and multi-polygons included).  Millions of points are
+classified in batches without a Python loop per point or per polygon.
+
+On top of that:
+
+* :meth:`ZoneSet.locate` – ``(point, zone)`` pairs (zones may overlap);
+* :meth:`ZoneSet.visits` – entries, exits and dwell time per vessel and
+  zone from tracks;
+* :meth:`ZoneSet.events` – which fishing events / port visits / encounters
+  happened inside which zone.
+
+Requires ``numpy`` (``pip install "ais-global-fishing[analytics]"``);
+shapefiles also need ``pyshp`` (``pip install "ais-global-fishing[geo]"``).
+
+Example
+-------
+>>> mpas = ZoneSet.from_geojson("mpas.geojson", id_field="WDPAID", name_field="NAME")
+>>> track = Track.from_geojson(client.get_track(vid, start, end), vessel_id=vid)
+>>> mpas.visits([track]).to_records()
+>>> mpas.events(client.get_fishing_events(start, end, vessel_ids=[vid]))
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ._numpy import np
+from .records import first_of, page_records, vessel_id_of
+from .tracks import Track
+
+# Point-edge candidate pairs evaluated per batch (bounds memory use).
+BATCH_PAIRS = 1 << 22
+
+# Index grid: zone bounding boxes cover about this many cells per edge,
+# and at most _MAX_CELLS cells in total.
+_CELLS_PER_EDGE = 2
+_MAX_CELLS = 1 << 22
+
+# Cell states for a zone.
+_INSIDE = 1
+_BOUNDARY = 2
+
+
+@dataclass(frozen=True)
+class Zone:
+    """One named area of a :class:`ZoneSet`."""
+
+    id: str
+    name: str
+    properties: dict = field(default_factory=dict, compare=False, repr=False)
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of ``arange(start, start + count)`` for each pair."""
+    total = int(counts.sum())
+    return np.repeat(starts, counts) + (np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts))
+
+
+def _runs(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct values of sorted *keys* and the offsets of their runs (plus the end)."""
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = keys[1:] != keys[:-1]
+    first = np.flatnonzero(new)
+    return keys[first], np.append(first, len(keys))
+
+
+def _unique_sorted(keys: np.ndarray) -> np.ndarray:
+    keys = np.sort(keys)
+    return _runs(keys)[0]
+
+
+def _isin_sorted(values: np.ndarray, sorted_keys: np.ndarray) -> np.ndarray:
+    if not len(sorted_keys):
+        return np.zeros(len(values), dtype=bool)
+    at = np.minimum(np.searchsorted(sorted_keys, values), len(sorted_keys) - 1)
+    return sorted_keys[at] == values
+
+
+def _box_keys(r0, r1, c0, c1, cols: int) -> np.ndarray:
+    """Cell ids (``row * cols + col``) of every box ``[r0, r1] × [c0, c1]``, box by box."""
+    height, width = r1 - r0 + 1, c1 - c0 + 1
+    box = np.repeat(np.arange(len(r0)), height * width)
+    offset = _ranges(np.zeros(len(r0), np.int64), height * width)
+    return (r0[box] + offset // width[box]) * cols + c0[box] + offset % width[box]
+
+
+def _group_extent(group: np.ndarray, lo: np.ndarray, hi: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per group code ``0 … n-1``: min of *lo* and max of *hi* (0 for empty groups)."""
+    low, high = np.full(n, np.inf), np.full(n, -np.inf)
+    np.minimum.at(low, group, lo)
+    np.maximum.at(high, group, hi)
+    empty = ~np.isfinite(low)
+    low[empty] = high[empty] = 0.0
+    return low, high
+
+
+def _rings(geometry: Optional[dict]) -> list[np.ndarray]:
+    """All rings (outer and holes) of a (Multi)Polygon as ``(n, 2)`` lon/lat arrays."""
+    if not geometry:
+        return []
+    kind = geometry.get("type")
+    if kind == "Polygon":
+        polygons = [geometry.get("coordinates") or []]
+    elif kind == "MultiPolygon":
+        polygons = geometry.get("coordinates") or []
+    elif kind == "GeometryCollection":
+        return [ring for part in geometry.get("geometries") or [] for ring in _rings(part)]
+    else:
+        return []
+    return [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon if len(ring) >= 3]
+
+
+def _features(source: Any) -> list[dict]:
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8") as fh:
+            source = json.load(fh)
+    if isinstance(source, dict):
+        if source.get("type") == "FeatureCollection":
+            return list(source.get("features") or [])
+        if source.get("type") == "Feature":
+            return [source]
+        return [{"type": "Feature", "geometry": source, "properties": {}}]
+    return list(source)
+
+
+class ZoneSet:
+    """
+    Indexed polygons.  Zones are addressed by integer *codes* (their position
+    in :attr:`zones`) in array results.
+
+    Parameters
+    ----------
+    zones
+        The zones, in code order.
+    rings
+        For every zone the list of its rings (``(n, 2)`` arrays of lon, lat;
+        outer rings and holes alike).
+    """
+
+    def __init__(self, zones: list[Zone], rings: list[list[np.ndarray]]):
+        if len(zones) != len(rings):
+            raise ValueError("one list of rings per zone expected")
+        self.zones = list(zones)
+        self.ids = np.array([z.id for z in self.zones], dtype=object)
+        self._build(rings)
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def from_geojson(cls, source: Any, *, id_field: str = "id", name_field: str = "name") -> "ZoneSet":
+        """
+        Zones from a GeoJSON file path, ``FeatureCollection``, ``Feature`` or
+        list of features.  Non-polygon features are skipped.  The zone id is
+        the property *id_field* (else the feature ``id``, else its index);
+        the name is *name_field* (else the id).
+        """
+        zones, rings = [], []
+        for i, feature in enumerate(_features(source)):
+            feature_rings = _rings(feature.get("geometry"))
+            if not feature_rings:
+                continue
+            props = feature.get("properties") or {}
+            zone_id = str(first_of(props, id_field, default=feature.get("id", i)))
+            zones.append(Zone(zone_id, str(props.get(name_field) or zone_id), props))
+            rings.append(feature_rings)
+        return cls(zones, rings)
+
+    @classmethod
+    def from_shapefile(cls, path: str | Path, *, id_field: str = "id", name_field: str = "name") -> "ZoneSet":
+        """Zones from an ESRI shapefile (``.shp`` with its ``.dbf``); needs ``pyshp``."""
+        try:
+            import shapefile
+        except ImportError as exc:
+            raise ImportError(
+                "reading shapefiles requires pyshp: pip install 'ais-global-fishing[geo]'"
+            ) from exc
+        with shapefile.Reader(str(path)) as reader:
+            collection = reader.__geo_interface__
+        return cls.from_geojson(collection, id_field=id_field, name_field=name_field)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def code_of(self, zone_id: str) -> int:
+        codes = np.flatnonzero(self.ids == zone_id)
+        if codes.size == 0:
+            raise KeyError(zone_id)
+        return int(codes[0])
+
+    # ------------------------------------------------------------------ #
+    # Index
+    # ------------------------------------------------------------------ #
+    def _build(self, rings: list[list[np.ndarray]]) -> None:
+        parts = []
+        for code, zone_rings in enumerate(rings):
+            for ring in zone_rings:
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                parts.append(np.column_stack([ring[:-1], ring[1:], np.full(len(ring) - 1, code)]))
+        edges = np.vstack(parts) if parts else np.empty((0, 5))
+        x1, y1, x2, y2, zone = edges.T
+        zone = zone.astype(np.int64)
+        n_zones = max(len(self.zones), 1)
+
+        # Grid: cells sized so that the zones' bounding boxes cover about
+        # _CELLS_PER_EDGE cells per edge.
+        xlo, xhi, ylo, yhi = np.minimum(x1, x2), np.maximum(x1, x2), np.minimum(y1, y2), np.maximum(y1, y2)
+        if len(edges):
+            self._x0, self._y0 = float(xlo.min()), float(ylo.min())
+            width, height = max(float(xhi.max()) - self._x0, 1e-9), max(float(yhi.max()) - self._y0, 1e-9)
+            zx0, zx1 = _group_extent(zone, xlo, xhi, n_zones)
+            zy0, zy1 = _group_extent(zone, ylo, yhi, n_zones)
+            area = float(np.sum((zx1 - zx0) * (zy1 - zy0))) or width * height
+            target = np.clip(_CELLS_PER_EDGE * len(edges), 1, _MAX_CELLS)
+            size = max(np.sqrt(area / target), 1e-9)
+        else:
+            self._x0 = self._y0 = 0.0
+            width = height = size = 1.0
+            zx0 = zx1 = zy0 = zy1 = np.zeros(n_zones)
+        self._cell = size
+        self._rows = int(np.ceil(height / size)) or 1
+        self._cols = int(np.ceil(width / size)) or 1
+        self._width, self._height = width, height
+
+        # Row index for the ray test: every non-horizontal edge under each
+        # row its latitude span touches, sorted by (row, zone).
+        slanted = y1 != y2
+        r0, r1 = self._row(ylo[slanted]), self._row(yhi[slanted])
+        edge = np.flatnonzero(slanted)[np.repeat(np.arange(len(r0)), r1 - r0 + 1)]
+        key = _ranges(r0, r1 - r0 + 1) * n_zones + zone[edge]
+        order = np.argsort(key, kind="stable")
+        edge, key = edge[order], key[order]
+        self._x1, self._y1, self._x2, self._y2 = x1[edge], y1[edge], x2[edge], y2[edge]
+        self._seg_keys, self._seg_start = _runs(key)
+
+        # Cell states: cells touched by a zone's edges are BOUNDARY for it.
+        # Along a row, the other cells of the zone's bounding box form runs
+        # the boundary never enters, so a run is INSIDE if one of its cell
+        # centres is.
+        c0, c1 = self._col(xlo), self._col(xhi)
+        r0, r1 = self._row(ylo), self._row(yhi)
+        boundary = _unique_sorted(_box_keys(r0, r1, c0, c1, self._cols) * n_zones + np.repeat(zone, (r1 - r0 + 1) * (c1 - c0 + 1)))
+        b_r0, b_r1, b_c0, b_c1 = self._row(zy0), self._row(zy1), self._col(zx0), self._col(zx1)
+        spans = (b_r1 - b_r0 + 1) * (b_c1 - b_c0 + 1)
+        boxed = _box_keys(b_r0, b_r1, b_c0, b_c1, self._cols) * n_zones + np.repeat(np.arange(n_zones), spans)
+        boxed = boxed[~_isin_sorted(boxed, boundary)]
+        cells, zones = boxed // n_zones, boxed % n_zones
+        order = np.lexsort((cells, zones))
+        boxed, cells, zones = boxed[order], cells[order], zones[order]
+        new = np.ones(len(boxed), dtype=bool)
+        new[1:] = (zones[1:] != zones[:-1]) | (cells[1:] != cells[:-1] + 1) | (cells[1:] % self._cols == 0)
+        first = np.flatnonzero(new)
+        centre_lat = self._y0 + (cells[first] // self._cols + 0.5) * size
+        centre_lon = self._x0 + (cells[first] % self._cols + 0.5) * size
+        odd = self._ray_parity(centre_lat, centre_lon, zones[first])
+        inside = np.sort(boxed[np.repeat(odd, np.diff(np.append(first, len(boxed))))])
+
+        keys = np.concatenate([boundary, inside])
+        state = np.concatenate([np.full(len(boundary), _BOUNDARY, np.int8), np.full(len(inside), _INSIDE, np.int8)])
+        order = np.argsort(keys, kind="stable")
+        self._cell_keys, self._cell_state = keys[order], state[order]
+
+    def _row(self, lat: np.ndarray) -> np.ndarray:
+        return np.clip(np.floor((lat - self._y0) / self._cell), 0, self._rows - 1).astype(np.int64)
+
+    def _col(self, lon: np.ndarray) -> np.ndarray:
+        return np.clip(np.floor((lon - self._x0) / self._cell), 0, self._cols - 1).astype(np.int64)
+
+    def _ray_parity(self, lat: np.ndarray, lon: np.ndarray, zone: np.ndarray) -> np.ndarray:
+        """
+        For each ``(lat[i], lon[i], zone[i])``: does a ray from the point
+        towards +lon cross the zone's boundary an odd number of times?
+        Only the zone's edges in the point's row are tested.
+        """
+        n_zones = max(len(self.zones), 1)
+        key = self._row(lat) * n_zones + zone
+        seg = np.minimum(np.searchsorted(self._seg_keys, key), max(len(self._seg_keys) - 1, 0))
+        found = self._seg_keys[seg] == key if len(self._seg_keys) else np.zeros(len(key), dtype=bool)
+        starts = np.where(found, self._seg_start[seg], 0) if len(self._seg_keys) else np.zeros(len(key), np.int64)
+        counts = np.where(found, self._seg_start[seg + 1] - starts, 0) if len(self._seg_keys) else starts
+
+        odd = np.zeros(len(key), dtype=bool)
+        bounds = np.cumsum(counts)
+        lo = 0
+        while lo < len(key):
+            base = bounds[lo - 1] if lo else 0
+            hi = max(lo + 1, int(np.searchsorted(bounds, base + BATCH_PAIRS, "right")))
+            point = np.repeat(np.arange(lo, hi), counts[lo:hi])
+            edge = _ranges(starts[lo:hi], counts[lo:hi])
+            py, px = lat[point], lon[point]
+            y1, y2 = self._y1[edge], self._y2[edge]
+            spans = (y1 > py) != (y2 > py)
+            point, edge, py, px, y1, y2 = point[spans], edge[spans], py[spans], px[spans], y1[spans], y2[spans]
+            x1, x2 = self._x1[edge], self._x2[edge]
+            crosses = px < x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+            odd[lo:hi] = np.bincount(point[crosses] - lo, minlength=hi - lo) % 2 == 1
+            lo = hi
+        return odd
+
+    # ------------------------------------------------------------------ #
+    # Classification
+    # ------------------------------------------------------------------ #
+    def locate(self, lat: Any, lon: Any) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Zone membership of points: ``(points, zones)`` index arrays with one
+        pair per point inside a zone, sorted by point, then zone code.
+        """
+        lat = np.asarray(lat, dtype=np.float64).ravel()
+        lon = np.asarray(lon, dtype=np.float64).ravel()
+        n_zones = max(len(self.zones), 1)
+        # Points outside the grid (or nan) are in no zone.
+        with np.errstate(invalid="ignore"):
+            valid = (
+                (lat >= self._y0) & (lat <= self._y0 + self._height)
+                & (lon >= self._x0) & (lon <= self._x0 + self._width)
+            )
+        index = np.flatnonzero(valid)
+        cell = self._row(lat[index]) * self._cols + self._col(lon[index])
+        lo = np.searchsorted(self._cell_keys, cell * n_zones)
+        hi = np.searchsorted(self._cell_keys, (cell + 1) * n_zones)
+
+        # One candidate per (point, zone listed for the point's cell).
+        point = np.repeat(index, hi - lo)
+        entry = _ranges(lo, hi - lo)
+        zone = self._cell_keys[entry] % n_zones
+        boundary = self._cell_state[entry] == _BOUNDARY
+        keep = ~boundary
+        keep[boundary] = self._ray_parity(lat[point[boundary]], lon[point[boundary]], zone[boundary])
+        return point[keep], zone[keep]
+
+    def contains(self, zone_id: str, lat: Any, lon: Any) -> np.ndarray:
+        """Boolean mask of the points inside zone *zone_id*."""
+        lat = np.asarray(lat, dtype=np.float64)
+        points, zones = self.locate(lat, lon)
+        mask = np.zeros(lat.shape, dtype=bool)
+        mask[points[zones == self.code_of(zone_id)]] = True
+        return mask
+
+    def first_zone(self, lat: Any, lon: Any) -> np.ndarray:
+        """Lowest zone code containing each point, ``-1`` for none."""
+        lat = np.asarray(lat, dtype=np.float64)
+        points, zones = self.locate(lat, lon)
+        result = np.full(lat.shape, -1, dtype=np.int64)
+        result[points[::-1]] = zones[::-1]  # earlier (lower) codes written last
+        return result
+
+    # ------------------------------------------------------------------ #
+    # Tracks and events
+    # ------------------------------------------------------------------ #
+    def visits(self, tracks: Iterable[Track]) -> "ZoneVisits":
+        """
+        Stays of each vessel in each zone from time-sorted tracks.
+
+        A visit is a run of consecutive fixes inside a zone.  It is entered
+        at its first fix and exited at the first fix outside after it; a
+        track that ends inside leaves the visit ``ongoing``.
+        """
+        tracks = list(tracks)
+        vessel_ids = np.array([t.vessel_id or "" for t in tracks], dtype=object)
+        lengths = np.array([len(t) for t in tracks], dtype=np.int64)
+        vessel = np.repeat(np.arange(len(tracks)), lengths)
+        times = np.concatenate([t.times for t in tracks]) if tracks else np.empty(0, np.int64)
+        lat = np.concatenate([t.lat for t in tracks]) if tracks else np.empty(0)
+        lon = np.concatenate([t.lon for t in tracks]) if tracks else np.empty(0)
+
+        rows, zones = self.locate(lat, lon)
+        order = np.lexsort((rows, zones, vessel[rows]))
+        rows, zones = rows[order], zones[order]
+        new = np.ones(rows.size, dtype=bool)
+        new[1:] = (zones[1:] != zones[:-1]) | (rows[1:] != rows[:-1] + 1) | (vessel[rows[1:]] != vessel[rows[:-1]])
+        first = np.flatnonzero(new)
+        last = np.append(first[1:], rows.size)[: first.size] - 1
+        start, end = rows[first], rows[last]
+
+        after = np.minimum(end + 1, len(times) - 1)
+        ongoing = (end + 1 >= len(times)) | (vessel[after] != vessel[end])
+        before = np.maximum(start - 1, 0)
+        entered = (start > 0) & (vessel[before] == vessel[start])
+        return ZoneVisits(
+            vessel_ids,
+            self,
+            vessel[start],
+            zones[first],
+            times[start],
+            np.where(ongoing, times[end], times[after]),
+            (end - start + 1).astype(np.int64),
+            entered,
+            ongoing,
+        )
+
+    def events(self, pages: Iterable[Any]) -> list[dict]:
+        """
+        Events (fishing, encounters, loitering, port visits …) whose
+        position lies in a zone: one row per event and zone.
+        """
+        if isinstance(pages, dict):
+            pages = [pages]
+        records = [rec for page in pages for rec in page_records(page) if isinstance(rec, dict)]
+        lat = np.array([_coord(first_of(r, "position.lat", "lat")) for r in records], dtype=np.float64)
+        lon = np.array([_coord(first_of(r, "position.lon", "lon")) for r in records], dtype=np.float64)
+        points, zones = self.locate(lat, lon)
+        return [
+            {
+                "eventId": records[p].get("id"),
+                "type": records[p].get("type"),
+                "vesselId": vessel_id_of(records[p]),
+                "start": records[p].get("start"),
+                "end": records[p].get("end"),
+                "lat": float(lat[p]),
+                "lon": float(lon[p]),
+                "zoneId": self.zones[z].id,
+                "zoneName": self.zones[z].name,
+            }
+            for p, z in zip(points.tolist(), zones.tolist())
+        ]
+
+
+def _coord(value: Any) -> float:
+    return float("nan") if value is None else value
+
+
+@dataclass
+class ZoneVisits:
+    """Stays of vessels in zones (columnar), one row per visit."""
+
+    vessel_ids: np.ndarray
+    zone_set: ZoneSet
+    vessel: np.ndarray
+    zone: np.ndarray
+    enter: np.ndarray  # epoch seconds of the first fix inside
+    exit: np.ndarray  # first fix outside after it (last fix inside if ongoing)
+    points: np.ndarray  # fixes inside
+    entered: np.ndarray  # the vessel was seen outside before the visit
+    ongoing: np.ndarray  # the track ends inside
+
+    def __len__(self) -> int:
+        return len(self.vessel)
+
+    def dwell_hours(self) -> np.ndarray:
+        return (self.exit - self.enter) / 3600.0
+
+    def summary(self) -> dict[str, dict]:
+        """Per zone id: visits, entries, exits, distinct vessels and total dwell hours."""
+        n = len(self.zone_set)
+        visits = np.bincount(self.zone, minlength=n)
+        entries = np.bincount(self.zone, weights=self.entered, minlength=n)
+        exits = np.bincount(self.zone, weights=~self.ongoing, minlength=n)
+        dwell = np.bincount(self.zone, weights=self.dwell_hours(), minlength=n)
+        pairs = np.unique(self.zone * max(1, len(self.vessel_ids)) + self.vessel) if len(self) else np.empty(0, np.int64)
+        vessels = np.bincount(pairs // max(1, len(self.vessel_ids)), minlength=n)
+        return {
+            zone.id: {
+                "visits": int(visits[code]),
+                "entries": int(entries[code]),
+                "exits": int(exits[code]),
+                "vessels": int(vessels[code]),
+                "dwellHours": round(float(dwell[code]), 3),
+            }
+            for code, zone in enumerate(self.zone_set.zones)
+            if visits[code]
+        }
+
+    def to_records(self) -> list[dict]:
+        enter = np.datetime_as_string(self.enter.astype("datetime64[s]"), unit="s")
+        exit_ = np.datetime_as_string(self.exit.astype("datetime64[s]"), unit="s")
+        zones = self.zone_set.zones
+        return [
+            {
+                "vesselId": self.vessel_ids[v],
+                "zoneId": zones[z].id,
+                "zoneName": zones[z].name,
+                "enter": f"{a}Z",
+                "exit": None if open_ else f"{b}Z",
+                "dwellHours": round(float(hours), 3),
+                "points": int(points),
+                "entered": bool(entered),
+            }
+            for v, z, a, b, hours, points, entered, open_ in zip(
+                self.vessel, self.zone, enter, exit_, self.dwell_hours(),
+                self.points, self.entered, self.ongoing,
+            )
+        ]
@@ -5,40 +5,133 @@ gfw_client_lib.py
 Thin Python wrapper around the Global Fishing Watch Gateway v3 API.
 Every method returns the parsed JSON response (dict / list) or raises
 ``requests.HTTPError`` on non-2xx status codes.
+
+List-valued parameters are sent in canonical order (see
+:mod:`ais_global_fishing.canonical`), and identical requests issued
+concurrently are coalesced into a single HTTP call.  Long ``vesselIds`` /
+``portIds`` filters are split into several requests issued concurrently
+and merged back into one response.  Requests in flight are capped by an
+adaptive, per-endpoint-family limit that backs off on throttling.
+
+With ``thread_safe=True`` one client can be shared by any number of worker
+threads: they share its connection pool, response cache, request quota
+and concurrency limits.  :meth:`GFWClient.clone` makes cheap copies that
+share all of that but override single settings.
 """
 
 from __future__ import annotations
 
+import copy
+import itertools
 import os
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 import requests
 from dotenv import load_dotenv
 
+from .cache import TTLCache
+from .canonical import indexed, joined, joined_groups, request_key
+from .concurrency import DROPPED, IGNORED, OK, AdaptiveConcurrency
+from .ratelimit import TokenBucket
+from .records import PartialResultError, merge_pages, project_page
+from .timewindow import TimeLike, TimeWindow
+from .transfer import TransferStats, accept_encoding
+from .transport import SessionTransport, ThreadLocalTransport, Transport
+
+_MISS = object()
+_UNSET = object()
+
+# .env files already loaded by this process
+_LOADED_DOTENV: set[Path] = set()
+
+
+def _load_dotenv_once(path: Path) -> None:
+    """``load_dotenv(path)``, but only the first time for each file."""
+    resolved = path.resolve()
+    if resolved not in _LOADED_DOTENV:
+        load_dotenv(path)
+        _LOADED_DOTENV.add(resolved)
+
 
 class GFWClient:
     """Client for the Global Fishing Watch Gateway v3 API."""
 
     DEFAULT_BASE_URL = "https://gateway.api.globalfishingwatch.org/v3"
 
+    # Largest ``vesselIds`` / ``portIds`` filter sent in one request; longer
+    # filters are split (see :meth:`_get_filtered`).
+    MAX_FILTER_IDS = 200
+    MAX_FILTER_CHARS = 6000
+    # Threads used to fetch the groups of a split filter.
+    FILTER_WORKERS = 8
+    # Keep-alive connections per host of a ``thread_safe`` client.
+    POOL_SIZE = 32
+
+    # Identity sections the server only sends when asked for in ``includes``.
+    INCLUDE_SECTIONS = {
+        "registryOwners": "OWNERSHIP",
+        "registryPublicAuthorizations": "AUTHORIZATIONS",
+        "matchCriteria": "MATCH_CRITERIA",
+    }
+
     # ------------------------------------------------------------------ #
     # Construction / helpers
     # ------------------------------------------------------------------ #
-    def __init__(self, api_key: Optional[str] = None, base_url: str | None = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str | None = None,
+        transport: Optional[Transport] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        *,
+        cache: Optional[TTLCache] = None,
+        bucket: Optional[TokenBucket] = None,
+        thread_safe: bool = False,
+    ):
         """
         Parameters
         ----------
         api_key
             API token.  If *None*, it is read from the environment variable
             ``GLOBALFISHING_WATCH_API_KEY`` (``.env`` will be loaded
-            automatically if present).
+            automatically if present, once per process).
         base_url
             Override API base (useful for staging).
+        transport
+            Object performing the HTTP calls (see
+            :mod:`ais_global_fishing.transport`).  Defaults to a
+            :class:`~ais_global_fishing.transport.SessionTransport` over
+            :attr:`session`; pass a ``RecordingTransport`` or
+            ``ReplayTransport`` to capture or replay traffic.
+        concurrency
+            Adaptive per-endpoint-family limit on requests in flight (see
+            :mod:`ais_global_fishing.concurrency`); a default
+            :class:`~ais_global_fishing.concurrency.AdaptiveConcurrency` if
+            *None*.  Share one between clients to share what it learned.
+        cache
+            Cache of parsed responses by base URL and canonical request (a
+            :class:`~ais_global_fishing.cache.TTLCache`, or a
+            :class:`~ais_global_fishing.coordination.SharedCache` to share
+            it between processes); ``None`` disables caching.  Clients of
+            different gateways can share one cache without seeing each
+            other's responses.  Cached results are shared and must be
+            treated as read-only.
+        bucket
+            :class:`~ais_global_fishing.ratelimit.TokenBucket` (or
+            :class:`~ais_global_fishing.coordination.SharedBucket`) every
+            request spends a token from; ``None`` for no quota.
+        thread_safe
+            Use a :class:`~ais_global_fishing.transport.ThreadLocalTransport`
+            (one session per thread over a shared connection pool of
+            :attr:`POOL_SIZE` connections per host) so that the client can be
+            shared by worker threads.  Ignored when *transport* is given.
         """
         if api_key is None:
-            load_dotenv(Path(".") / ".env")
+            _load_dotenv_once(Path(".") / ".env")
             api_key = os.getenv("GLOBALFISHING_WATCH_API_KEY")
 
         if not api_key:
@@ -50,16 +143,290 @@ class GFWClient:
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self.session = requests.Session()
         self.session.headers.update({"Authorization": f"Bearer {api_key}"})
+        self.session.headers["Accept-Encoding"] = accept_encoding()
+        if transport is None:
+            if thread_safe:
+                transport = ThreadLocalTransport(self.session, self.POOL_SIZE)
+            else:
+                transport = SessionTransport(self.session)
+        self.transport = transport
+        self.concurrency = concurrency if concurrency is not None else AdaptiveConcurrency()
+        self.cache = cache
+        self.bucket = bucket
+        self.transfer = TransferStats()
+        # Set by :meth:`~ais_global_fishing.profiling.Profiler.attach`.
+        self.profiler = None
+
+        # canonical request key -> Future of the request currently in flight
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def clone(
+        self,
+        *,
+        base_url: Optional[str] = None,
+        transport: Optional[Transport] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        cache: Optional[TTLCache] = _UNSET,
+        bucket: Optional[TokenBucket] = _UNSET,
+    ) -> "GFWClient":
+        """
+        Cheap copy of this client with some settings overridden.
+
+        The copy shares the session, connection pool, transfer counters and
+        – unless overridden – the cache, request quota, concurrency limits
+        and in-flight request table, so it costs no more than a dict copy.
+        Pass ``cache=None`` / ``bucket=None`` to bypass them, e.g.
+        ``client.clone(cache=None).get_track(...)`` for a fresh answer.
+        A clone with another *base_url* or *transport* starts with its own
+        in-flight table and, unless one is given, no cache.
+        """
+        other = copy.copy(self)
+        if base_url is not None or transport is not None:
+            other.base_url = base_url or self.base_url
+            other.transport = transport or self.transport
+            other._inflight = {}
+            other._inflight_lock = threading.Lock()
+            other.cache = None
+        if concurrency is not None:
+            other.concurrency = concurrency
+        if cache is not _UNSET:
+            other.cache = cache
+        if bucket is not _UNSET:
+            other.bucket = bucket
+        return other
+
+    def get(
+        self,
+        path: str,
+        params: dict | None = None,
+        *,
+        all_pages: bool = False,
+        on_page: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        GET any Gateway *path* with raw query *params*, for requests that are
+        planned as data rather than as method calls (e.g. the units of a
+        :class:`~ais_global_fishing.jobs.JobQueue`).  Served through the same
+        cache, quota, concurrency limit and de-duplication as the endpoint
+        methods; ``all_pages=True`` follows ``nextOffset`` and calls
+        *on_page* with every page (see :meth:`_get_all`).
+        """
+        if all_pages:
+            return self._get_all(path, params, on_page=on_page)
+        return self._get(path, params)
 
     # ------------------------------------------------------------------ #
     # _internal request helpers
     # ------------------------------------------------------------------ #
     def _get(self, path: str, params: dict | None = None):
-        """Perform a GET request and return parsed JSON."""
+        """
+        Perform a GET request and return parsed JSON.
+
+        Results are served from and stored in :attr:`cache` if one is set
+        (see :meth:`_fetch_cached`), keyed by :attr:`base_url` and the
+        canonical form of the request.
+        If a semantically equal request is already in flight on another
+        thread, wait for it and share its result instead of sending a second
+        one.  Callers must therefore treat the returned object as read-only.
+        """
+        key = request_key(f"{self.base_url}{path}", params)
+        cache = self.cache
+        if cache is not None:
+            cached = cache.get(key, _MISS)
+            if cached is not _MISS:
+                return cached
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._fetch(path, params) if cache is None else self._fetch_cached(cache, key, path, params)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _get_all(
+        self,
+        path: str,
+        params: dict | None = None,
+        *,
+        on_page: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        :meth:`_get` every page of a list endpoint, following ``nextOffset``
+        until it is ``None``, and merge the pages (see
+        :func:`~ais_global_fishing.records.merge_pages`).  A single page is
+        returned as it is.  *on_page* is called with each page as it
+        arrives (e.g. to keep a job lease alive).
+        """
+        params = dict(params or {})
+        page = self._get(path, params)
+        pages = [page]
+        if on_page is not None:
+            on_page(page)
+        while isinstance(page, dict) and page.get("nextOffset") is not None:
+            page = self._get(path, {**params, "offset": page["nextOffset"]})
+            pages.append(page)
+            if on_page is not None:
+                on_page(page)
+        return pages[0] if len(pages) == 1 else merge_pages(pages)
+
+    def _fetch_cached(self, cache, key: str, path: str, params: dict | None):
+        """
+        :meth:`_fetch` and store the result in *cache*.  A cache that hands
+        out claims (a :class:`~ais_global_fishing.coordination.SharedCache`)
+        makes sure only one process of the host sends the request; the
+        others wait for its result.
+        """
+        claim = getattr(cache, "claim", None)
+        if claim is None:
+            result = self._fetch(path, params)
+            cache.set(key, result)
+            return result
+        while not claim(key):
+            result = cache.wait(key, _MISS)
+            if result is not _MISS:
+                return result
+        try:
+            result = cache.get(key, _MISS)  # stored while we were claiming
+            if result is _MISS:
+                result = self._fetch(path, params)
+                cache.set(key, result)
+            return result
+        finally:
+            cache.release(key)
+
+    def _fetch(self, path: str, params: dict | None = None):
+        """
+        Send the GET request for :meth:`_get` (no coalescing), within the
+        concurrency limit of the endpoint's family.  Phase timings go to
+        :attr:`profiler` if one is attached.
+        """
         url = f"{self.base_url}{path}"
-        resp = self.session.get(url, params=params or {})
-        resp.raise_for_status()
-        return resp.json()
+        attached = self.profiler
+        profiler = attached if attached is not None and attached.sampled() else None
+        queued = time.perf_counter()
+        if self.bucket is not None:
+            self.bucket.acquire()
+        limit = self.concurrency.limit_for(path)
+        limit.acquire()
+        started = time.monotonic()
+        sent = time.perf_counter()
+        outcome = IGNORED
+        resp = None
+        try:
+            resp = self.transport.get(url, params or {})
+            received = time.perf_counter()
+            self.transfer.record(path, resp)
+            resp.raise_for_status()
+            outcome = OK
+        except requests.HTTPError as exc:
+            status = getattr(exc.response, "status_code", None)
+            if status == 429 or (isinstance(status, int) and status >= 500):
+                outcome = DROPPED
+            raise
+        except requests.RequestException:
+            outcome = DROPPED
+            raise
+        finally:
+            limit.release(time.monotonic() - started, outcome)
+            if attached is not None:
+                connect = attached.take_connect_time()
+                if profiler is not None and resp is not None and outcome != OK:
+                    profiler.record(path, resp, sent - queued, received - sent, 0.0, connect)
+        if profiler is None:
+            return resp.json()
+        result = resp.json()
+        profiler.record(path, resp, sent - queued, received - sent, time.perf_counter() - received, connect)
+        return result
+
+    def _get_filtered(
+        self,
+        path: str,
+        params: dict,
+        filters: dict[str, Optional[Iterable[str]]],
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
+    ):
+        """
+        GET *path* with comma-joined ID *filters*, splitting long ones.
+
+        Each filter is cut into groups of at most :attr:`MAX_FILTER_IDS` IDs
+        and :attr:`MAX_FILTER_CHARS` characters.  If everything fits, this is
+        a single :meth:`_get`.  Otherwise one request per combination of
+        groups is issued on up to :attr:`FILTER_WORKERS` threads and the
+        pages are merged (de-duplicated by ``id``, ordered by start time).
+
+        A failing group does not stop the others, but the result is then
+        incomplete: :class:`PartialResultError` is raised, carrying the
+        merged page of the other groups.  With ``partial_ok=True`` that page
+        is returned instead, with the failed groups under ``"errors"``
+        (``[{"params": …, "error": …}]``).  If every group fails, the first
+        error is raised.
+
+        With ``all_pages=True`` every request follows ``nextOffset`` (see
+        :meth:`_get_all`), so the result holds all matching entries.
+        """
+        get = self._get_all if all_pages else self._get
+        groups = {
+            name: joined_groups(ids, max_items=self.MAX_FILTER_IDS, max_chars=self.MAX_FILTER_CHARS)
+            for name, ids in filters.items()
+            if ids
+        }
+        groups = {name: values for name, values in groups.items() if values}
+        if all(len(values) == 1 for values in groups.values()):
+            return get(path, {**params, **{name: values[0] for name, values in groups.items()}})
+
+        combos = [dict(zip(groups, combo)) for combo in itertools.product(*groups.values())]
+        pages, errors = [], []
+        with ThreadPoolExecutor(max_workers=min(self.FILTER_WORKERS, len(combos))) as pool:
+            futures = {pool.submit(get, path, {**params, **combo}): combo for combo in combos}
+            for future in as_completed(futures):
+                try:
+                    pages.append(future.result())
+                except Exception as exc:
+                    errors.append((futures[future], exc))
+        if not pages:
+            raise errors[0][1]
+
+        merged = merge_pages(pages)
+        if errors:
+            failed = [{"params": combo, "error": str(exc)} for combo, exc in errors]
+            if not partial_ok:
+                raise PartialResultError(merged, failed)
+            merged["errors"] = failed
+        return merged
+
+    def _includes_for(
+        self, fields: Optional[Iterable[str]], includes: Optional[Iterable[str]]
+    ) -> Optional[list[str]]:
+        """
+        ``includes`` to request for a *fields* projection: only the sections
+        the fields reach into (and, if *includes* is given, only those of
+        them that it lists).
+        """
+        if not fields:
+            return None if includes is None else list(includes)
+        needed = {self.INCLUDE_SECTIONS[f.split(".")[0]] for f in fields if f.split(".")[0] in self.INCLUDE_SECTIONS}
+        if includes is not None:
+            needed &= set(includes)
+        return sorted(needed)
+
+    @staticmethod
+    def _projected(result, fields: Optional[Iterable[str]]):
+        return project_page(result, fields) if fields else result
 
     def _endpoint_exists(self, path: str) -> bool:
         """
@@ -67,7 +434,7 @@ class GFWClient:
         Helps to avoid unnecessary GETs that would otherwise raise.
         """
         url = f"{self.base_url}{path}"
-        resp = self.session.head(url, allow_redirects=True)
+        resp = self.transport.head(url)
         return resp.status_code != 404
 
     # ------------------------------------------------------------------ #
@@ -83,6 +450,7 @@ class GFWClient:
         limit: int = 20,
         match_fields: Optional[str] = None,
         binary: Optional[bool] = None,
+        fields: Optional[Iterable[str]] = None,
     ):
         """
         Flexible wrapper around ``/vessels/search``.
@@ -95,9 +463,15 @@ class GFWClient:
         ------------------
         binary : bool | None
             When *False* the server returns detailed JSON instead of binary blobs.
+        fields : iterable of str | None
+            Dotted paths to keep in every entry (e.g.
+            ``"selfReportedInfo.shipname"``).  Only the ``includes`` sections
+            the fields need are requested, and everything else is dropped
+            from the response.
         """
         if query is None and where is None:
             raise ValueError("Either 'query' or 'where' must be supplied")
+        fields = list(fields) if fields is not None else None
 
         params: dict[str, str | int] = {"limit": limit}
         if query is not None:
@@ -105,13 +479,8 @@ class GFWClient:
         if where is not None:
             params["where"] = where
 
-        if datasets:
-            for idx, ds in enumerate(datasets):
-                params[f"datasets[{idx}]"] = ds
-
-        if includes:
-            for idx, inc in enumerate(includes):
-                params[f"includes[{idx}]"] = inc
+        params.update(indexed("datasets", datasets))
+        params.update(indexed("includes", self._includes_for(fields, includes)))
 
         if match_fields:
             params["match_fields"] = match_fields
@@ -119,23 +488,27 @@ class GFWClient:
         if binary is not None:
             params["binary"] = "TRUE" if binary else "FALSE"
 
-        return self._get("/vessels/search", params)
+        return self._projected(self._get("/vessels/search", params), fields)
 
     def get_vessel_details(
         self,
         vessel_id: str,
         dataset: str = "public-global-vessel-identity:latest",
         includes: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
     ):
         """
         Retrieve a *single* vessel identity record.
 
         ``includes`` must be sent as a comma-separated string for this endpoint.
+        *fields* projects the record as in :meth:`search_vessels`.
         """
+        fields = list(fields) if fields is not None else None
         params: dict[str, str] = {"dataset": dataset}
+        includes = self._includes_for(fields, includes)
         if includes:
-            params["includes"] = ",".join(includes)
-        return self._get(f"/vessels/{vessel_id}", params)
+            params["includes"] = joined(includes)
+        return self._projected(self._get(f"/vessels/{vessel_id}", params), fields)
 
     # ---------------  bulk identity ----------------------------------- #
     def get_vessels_bulk(
@@ -146,10 +519,13 @@ class GFWClient:
         includes: Optional[Iterable[str]] = None,
         registries_info_data: Optional[str] = None,
         binary: Optional[bool] = None,
+        fields: Optional[Iterable[str]] = None,
     ):
         """
         Fetch several vessels in one call via ``/vessels``.
 
+        IDs, datasets and includes are sent sorted and de-duplicated.
+
         Parameters
         ----------
         ids
@@ -163,19 +539,14 @@ class GFWClient:
             (e.g. ``"ALL"``).
         binary
             If *True/False*, sets ``binary=TRUE/FALSE``.
+        fields
+            Dotted paths to keep in every entry (see :meth:`search_vessels`).
         """
+        fields = list(fields) if fields is not None else None
         params: dict[str, str] = {}
-
-        for idx, _id in enumerate(ids):
-            params[f"ids[{idx}]"] = _id
-
-        if datasets:
-            for idx, ds in enumerate(datasets):
-                params[f"datasets[{idx}]"] = ds
-
-        if includes:
-            for idx, inc in enumerate(includes):
-                params[f"includes[{idx}]"] = inc
+        params.update(indexed("ids", ids))
+        params.update(indexed("datasets", datasets))
+        params.update(indexed("includes", self._includes_for(fields, includes)))
 
         if registries_info_data is not None:
             params["registries-info-data"] = registries_info_data
@@ -183,7 +554,7 @@ class GFWClient:
         if binary is not None:
             params["binary"] = "TRUE" if binary else "FALSE"
 
-        return self._get("/vessels", params)
+        return self._projected(self._get("/vessels", params), fields)
 
     # ------------------------------------------------------------------ #
     # Track & trajectory
@@ -191,32 +562,28 @@ class GFWClient:
     def get_track(
         self,
         vessel_id: str,
-        start: datetime,
-        end: datetime,
+        start: TimeLike,
+        end: TimeLike,
         resolution: str = "1h",
     ):
-        """AIS track of a vessel. Raises ``FileNotFoundError`` if /track is absent."""
+        """
+        AIS track of a vessel. Raises ``FileNotFoundError`` if /track is absent.
+
+        *start* / *end* accept any :data:`~ais_global_fishing.timewindow.TimeLike`
+        value and are sent as UTC (as for every time-window method below).
+        """
+        params = {**TimeWindow.of(start, end).params(), "resolution": resolution}
         path = f"/vessels/{vessel_id}/track"
         if not self._endpoint_exists(path):
             raise FileNotFoundError(f"Track endpoint not available for vesselId '{vessel_id}'")
-
-        params = {
-            "start": start.isoformat(timespec="seconds") + "Z",
-            "end": end.isoformat(timespec="seconds") + "Z",
-            "resolution": resolution,
-        }
         return self._get(path, params)
 
-    def get_segments(self, vessel_id: str, start: datetime, end: datetime):
+    def get_segments(self, vessel_id: str, start: TimeLike, end: TimeLike):
         """Continuous-signal trajectory segments."""
+        params = TimeWindow.of(start, end).params()
         path = f"/vessels/{vessel_id}/segments"
         if not self._endpoint_exists(path):
             raise FileNotFoundError(f"Segments endpoint not available for vesselId '{vessel_id}'")
-
-        params = {
-            "start": start.isoformat(timespec="seconds") + "Z",
-            "end": end.isoformat(timespec="seconds") + "Z",
-        }
         return self._get(path, params)
 
     # ------------------------------------------------------------------ #
@@ -225,73 +592,130 @@ class GFWClient:
     def get_events(
         self,
         vessel_id: str,
-        start: datetime,
-        end: datetime,
+        start: TimeLike,
+        end: TimeLike,
         event_types: Optional[Iterable[str]] = None,
+        *,
+        all_pages: bool = False,
     ):
         """
         Events detected for *one* vessel.
-        ``event_types`` like ``["FISHING", "PORT_VISIT"]``.
+        ``event_types`` like ``["FISHING", "PORT_VISIT"]``.  With
+        ``all_pages=True`` every page is fetched (see :meth:`_get_all`).
         """
-        params = {
-            "start": start.isoformat(timespec="seconds") + "Z",
-            "end": end.isoformat(timespec="seconds") + "Z",
-        }
+        params = TimeWindow.of(start, end).params()
         if event_types:
-            params["eventType"] = ",".join(event_types)
-        return self._get(f"/vessels/{vessel_id}/events", params)
+            params["eventType"] = joined(event_types)
+        get = self._get_all if all_pages else self._get
+        return get(f"/vessels/{vessel_id}/events", params)
 
     # ---- mass event endpoints (encounters, transshipments…) ------------ #
     def _get_event_collection(
         self,
         collection_name: str,
-        start: datetime,
-        end: datetime,
+        start: TimeLike,
+        end: TimeLike,
         vessel_ids: Optional[Iterable[str]] = None,
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
+    ):
+        """
+        Events of *collection_name*; a long *vessel_ids* filter is split
+        into groups fetched concurrently (see :meth:`_get_filtered`, also
+        for *partial_ok* and *all_pages*).
+        """
+        params = TimeWindow.of(start, end).params()
+        return self._get_filtered(
+            f"/events/{collection_name}",
+            params,
+            {"vesselIds": vessel_ids},
+            partial_ok=partial_ok,
+            all_pages=all_pages,
+        )
+
+    def get_encounters(
+        self,
+        start: TimeLike,
+        end: TimeLike,
+        vessel_ids: Optional[Iterable[str]] = None,
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
     ):
-        params = {
-            "start": start.isoformat(timespec="seconds") + "Z",
-            "end": end.isoformat(timespec="seconds") + "Z",
-        }
-        if vessel_ids:
-            params["vesselIds"] = ",".join(vessel_ids)
-        return self._get(f"/events/{collection_name}", params)
-
-    def get_encounters(self, start: datetime, end: datetime, vessel_ids: Optional[Iterable[str]] = None):
         """Buque-buque encounters (possible transhipments)."""
-        return self._get_event_collection("encounters", start, end, vessel_ids)
+        return self._get_event_collection(
+            "encounters", start, end, vessel_ids, partial_ok=partial_ok, all_pages=all_pages
+        )
 
-    def get_transshipments(self, start: datetime, end: datetime, vessel_ids: Optional[Iterable[str]] = None):
+    def get_transshipments(
+        self,
+        start: TimeLike,
+        end: TimeLike,
+        vessel_ids: Optional[Iterable[str]] = None,
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
+    ):
         """Confirmed / likely transhipment events."""
-        return self._get_event_collection("transshipments", start, end, vessel_ids)
+        return self._get_event_collection(
+            "transshipments", start, end, vessel_ids, partial_ok=partial_ok, all_pages=all_pages
+        )
 
-    def get_fishing_events(self, start: datetime, end: datetime, vessel_ids: Optional[Iterable[str]] = None):
+    def get_fishing_events(
+        self,
+        start: TimeLike,
+        end: TimeLike,
+        vessel_ids: Optional[Iterable[str]] = None,
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
+    ):
         """Fishing activity events."""
-        return self._get_event_collection("fishing", start, end, vessel_ids)
+        return self._get_event_collection(
+            "fishing", start, end, vessel_ids, partial_ok=partial_ok, all_pages=all_pages
+        )
 
-    def get_loitering_events(self, start: datetime, end: datetime, vessel_ids: Optional[Iterable[str]] = None):
+    def get_loitering_events(
+        self,
+        start: TimeLike,
+        end: TimeLike,
+        vessel_ids: Optional[Iterable[str]] = None,
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
+    ):
         """Loitering events (slow movement in high-risk areas)."""
-        return self._get_event_collection("loitering", start, end, vessel_ids)
+        return self._get_event_collection(
+            "loitering", start, end, vessel_ids, partial_ok=partial_ok, all_pages=all_pages
+        )
 
     # ------------------------------------------------------------------ #
     # Ports / visits
     # ------------------------------------------------------------------ #
     def get_port_visits(
         self,
-        start: datetime,
-        end: datetime,
+        start: TimeLike,
+        end: TimeLike,
         vessel_ids: Optional[Iterable[str]] = None,
         port_ids: Optional[Iterable[str]] = None,
+        *,
+        partial_ok: bool = False,
+        all_pages: bool = False,
     ):
-        params = {
-            "start": start.isoformat(timespec="seconds") + "Z",
-            "end": end.isoformat(timespec="seconds") + "Z",
-        }
-        if vessel_ids:
-            params["vesselIds"] = ",".join(vessel_ids)
-        if port_ids:
-            params["portIds"] = ",".join(port_ids)
-        return self._get("/ports/visits", params)
+        """
+        Port visits, optionally filtered by vessels and / or ports.  Long ID
+        filters are split into groups fetched concurrently (see
+        :meth:`_get_filtered`, also for *partial_ok* and *all_pages*).
+        """
+        params = TimeWindow.of(start, end).params()
+        return self._get_filtered(
+            "/ports/visits",
+            params,
+            {"vesselIds": vessel_ids, "portIds": port_ids},
+            partial_ok=partial_ok,
+            all_pages=all_pages,
+        )
 
     # ------------------------------------------------------------------ #
     # Risk & compliance
@@ -303,6 +727,10 @@ class GFWClient:
     # ------------------------------------------------------------------ #
     # Trips
     # ------------------------------------------------------------------ #
-    def get_trips(self, vessel_id: str):
-        """Port-to-port trips detected for *vessel_id*."""
-        return self._get(f"/vessels/{vessel_id}/trips")
+    def get_trips(self, vessel_id: str, *, all_pages: bool = False):
+        """
+        Port-to-port trips detected for *vessel_id*; ``all_pages=True``
+        fetches every page (see :meth:`_get_all`).
+        """
+        get = self._get_all if all_pages else self._get
+        return get(f"/vessels/{vessel_id}/trips")
@@ -0,0 +1,331 @@
+"""
+jobs.py
+
+Resumable bulk jobs backed by an on-disk SQLite work queue.
+
+A job is a set of *units* – one ``(path, params)`` API request each – stored
+in a local SQLite file together with their status and, once fetched, their
+(zlib-compressed) JSON result.  :func:`run_jobs` drains the queue with a pool
+of worker threads.  Because both the queue and the results live on disk, a
+crashed or interrupted run simply resumes: units that finished are never
+requested again.  A claimed unit holds a lease; units whose lease ran out
+(their worker crashed or hung) are put back in the queue, while units
+leased by another process that is still running are left to it.
+
+Example
+-------
+>>> queue = JobQueue("port_visits.sqlite")
+>>> for group in vessel_groups:
+...     queue.add_windows("/ports/visits", start, end, timedelta(days=30),
+...                       params={"vesselIds": ",".join(group)})
+>>> run_jobs(client, queue, workers=8)
+>>> for unit, page in queue.results():
+...     ...
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from ._sqlite import connect, transaction
+from .canonical import Request
+from .timewindow import TimeLike, TimeWindow
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    key         TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    not_before  REAL NOT NULL DEFAULT 0,
+    error       TEXT,
+    result      BLOB,
+    seq         INTEGER,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS units_status ON units (status, not_before);
+"""
+
+
+@dataclass(frozen=True)
+class Unit:
+    """One queued API request."""
+
+    key: str
+    path: str
+    params: dict
+    attempts: int = 0
+
+
+class JobQueue:
+    """
+    SQLite-backed queue of API request units.
+
+    Parameters
+    ----------
+    path
+        Database file (created if missing).  ``":memory:"`` gives a
+        throw-away queue, mostly useful for tests.
+    max_attempts
+        A unit that failed this many times is marked ``failed`` and no
+        longer retried by :func:`run_jobs` (see :meth:`retry_failed`).
+    backoff
+        Base delay in seconds before a failed unit is retried; doubled on
+        every further attempt.
+    lease
+        Seconds a claimed unit stays reserved for its worker (see
+        :meth:`heartbeat`).  A ``running`` unit whose lease ran out is
+        claimed again.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_attempts: int = 5,
+        backoff: float = 1.0,
+        lease: float = 300.0,
+    ):
+        self.path = str(path)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._db = connect(self.path, _SCHEMA)
+        with self._lock:
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(units)")}
+            if "lease_until" not in columns:  # queue written by an older version
+                self._db.execute("ALTER TABLE units ADD COLUMN lease_until REAL")
+            # Units left 'running' by a crashed process go back to the queue;
+            # those another live process holds a lease on stay with it.
+            self._db.execute(
+                "UPDATE units SET status = ? WHERE status = ? AND COALESCE(lease_until, 0) <= ?",
+                (PENDING, RUNNING, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Planning
+    # ------------------------------------------------------------------ #
+    def add(self, path: str, params: Optional[dict] = None) -> str:
+        """
+        Queue one request and return its key.
+
+        Units are keyed by their canonical form, so adding a unit that is
+        already known – in any status, with its list parameters in any order
+        – is a no-op and re-running the planning code of a job never
+        re-queues finished work.
+        """
+        return self.add_many([(path, params or {})])[0]
+
+    def add_many(self, units: Iterable[tuple[str, dict]]) -> list[str]:
+        """Queue several ``(path, params)`` requests in one transaction."""
+        requests = [Request.of(path, params) for path, params in units]
+        rows = [(req.key, req.path, json.dumps(req.as_dict())) for req in requests]
+        with self._lock:
+            with transaction(self._db):
+                (seq,) = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM units").fetchone()
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO units (key, path, params, seq) VALUES (?, ?, ?, ?)",
+                    [(key, path, params, seq + i + 1) for i, (key, path, params) in enumerate(rows)],
+                )
+        return [key for key, _, _ in rows]
+
+    def add_windows(
+        self,
+        path: str,
+        start: TimeLike,
+        end: TimeLike,
+        step: Optional[timedelta],
+        params: Optional[dict] = None,
+    ) -> list[str]:
+        """Queue *path* once per ``step``-sized window between *start* and *end*."""
+        return self.add_many(
+            (path, {**(params or {}), **window.params()})
+            for window in TimeWindow.of(start, end).split(step)
+        )
+
+    # ------------------------------------------------------------------ #
+    # Execution
+    # ------------------------------------------------------------------ #
+    def claim(self) -> Optional[Unit]:
+        """
+        Atomically take the next runnable unit (``None`` if there is none):
+        a pending unit past its back-off, or a running one whose lease ran
+        out.  The unit is leased for :attr:`lease` seconds.
+        """
+        with self._lock:
+            with transaction(self._db, "IMMEDIATE"):
+                now = time.time()
+                row = self._db.execute(
+                    "SELECT key, path, params, attempts FROM units "
+                    "WHERE (status = ? AND not_before <= ?) OR (status = ? AND COALESCE(lease_until, 0) <= ?) "
+                    "ORDER BY seq LIMIT 1",
+                    (PENDING, now, RUNNING, now),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE units SET status = ?, lease_until = ? WHERE key = ?",
+                        (RUNNING, now + self.lease, row[0]),
+                    )
+        if row is None:
+            return None
+        key, path, params, attempts = row
+        return Unit(key, path, json.loads(params), attempts)
+
+    def heartbeat(self, key: str) -> None:
+        """Extend the lease of a running unit by another :attr:`lease` seconds."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE units SET lease_until = ? WHERE key = ? AND status = ?",
+                (time.time() + self.lease, key, RUNNING),
+            )
+
+    def complete(self, key: str, result: Any) -> None:
+        """Store *result* for *key* and mark the unit done."""
+        blob = zlib.compress(json.dumps(result, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "UPDATE units SET status = ?, result = ?, error = NULL WHERE key = ?",
+                (DONE, blob, key),
+            )
+
+    def fail(self, key: str, error: BaseException | str) -> None:
+        """Record a failed attempt; the unit is retried with back-off until ``max_attempts``."""
+        with self._lock:
+            (attempts,) = self._db.execute("SELECT attempts FROM units WHERE key = ?", (key,)).fetchone()
+            attempts += 1
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            not_before = time.time() + self.backoff * 2 ** (attempts - 1)
+            self._db.execute(
+                "UPDATE units SET status = ?, attempts = ?, not_before = ?, error = ? WHERE key = ?",
+                (status, attempts, not_before, str(error), key),
+            )
+
+    def retry_failed(self) -> int:
+        """Put units that exhausted their attempts back in the queue."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE units SET status = ?, attempts = 0, not_before = 0 WHERE status = ?",
+                (PENDING, FAILED),
+            )
+            return cur.rowcount
+
+    # ------------------------------------------------------------------ #
+    # Inspection
+    # ------------------------------------------------------------------ #
+    def counts(self) -> dict[str, int]:
+        """Number of units per status."""
+        counts = dict.fromkeys((PENDING, RUNNING, DONE, FAILED), 0)
+        with self._lock:
+            for status, n in self._db.execute("SELECT status, COUNT(*) FROM units GROUP BY status"):
+                counts[status] = n
+        return counts
+
+    def next_wakeup(self) -> Optional[float]:
+        """Seconds until the earliest backed-off pending unit becomes runnable."""
+        with self._lock:
+            (not_before,) = self._db.execute(
+                "SELECT MIN(not_before) FROM units WHERE status = ?", (PENDING,)
+            ).fetchone()
+        if not_before is None:
+            return None
+        return max(0.0, not_before - time.time())
+
+    def result(self, key: str) -> Any:
+        """Decoded result of a finished unit (``KeyError`` if not done)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM units WHERE key = ? AND status = ?", (key, DONE)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(zlib.decompress(row[0]))
+
+    def results(self) -> Iterator[tuple[Unit, Any]]:
+        """Yield ``(unit, result)`` for every finished unit, in planning order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, path, params, attempts FROM units WHERE status = ? ORDER BY seq", (DONE,)
+            ).fetchall()
+        for key, path, params, attempts in rows:
+            yield Unit(key, path, json.loads(params), attempts), self.result(key)
+
+    def errors(self) -> list[tuple[Unit, str]]:
+        """Units that exhausted their attempts, with the last error message."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, path, params, attempts, error FROM units WHERE status = ? ORDER BY seq",
+                (FAILED,),
+            ).fetchall()
+        return [(Unit(key, path, json.loads(params), attempts), error) for key, path, params, attempts, error in rows]
+
+
+def run_jobs(
+    client,
+    queue: JobQueue,
+    *,
+    workers: int = 4,
+    on_result: Optional[Callable[[Unit, Any], None]] = None,
+    poll_interval: float = 0.5,
+) -> dict[str, int]:
+    """
+    Drain *queue* with *workers* threads issuing ``client.get(path, params)``
+    for every page of each unit; the unit's lease is renewed after each
+    page, so long paged units are not claimed by another worker.
+
+    Returns the final :meth:`JobQueue.counts`.  Safe to interrupt at any
+    point: call it again on the same queue to resume.
+    """
+    if workers < 1:
+        raise ValueError("'workers' must be >= 1")
+
+    def _worker() -> None:
+        while True:
+            unit = queue.claim()
+            if unit is None:
+                counts = queue.counts()
+                if counts[PENDING] == 0 and counts[RUNNING] == 0:
+                    return
+                wakeup = queue.next_wakeup()
+                time.sleep(min(poll_interval, wakeup) if wakeup is not None else poll_interval)
+                continue
+            try:
+                result = client.get(
+                    unit.path, unit.params, all_pages=True, on_page=lambda page: queue.heartbeat(unit.key)
+                )
+            except Exception as exc:
+                queue.fail(unit.key, exc)
+                continue
+            queue.complete(unit.key, result)
+            if on_result is not None:
+                on_result(unit, result)
+
+    threads = [threading.Thread(target=_worker, name=f"gfw-job-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return queue.counts()
@@ -0,0 +1,272 @@
+"""
+kinematics.py
+
+Derived motion and anomaly flags for array-backed tracks.
+
+:func:`kinematics` turns a :class:`~ais_global_fishing.tracks.Track` into
+per-point distance, implied speed, bearing, heading change and turn rate
+with vectorised haversine and ``diff`` operations.  :func:`anomalies` flags
+
+* **jumps** – consecutive positions that imply a speed no vessel reaches
+  (*max_speed*), the signature of spoofed or corrupt AIS positions, and
+* **dark periods** – silences of at least *dark_gap* between positions.
+
+:func:`screen_fleet` does the same for many vessels: tracks are
+concatenated into batches that are each screened in one vectorised pass,
+and batches are spread over a process pool.
+
+Requires ``numpy`` (``pip install "ais-global-fishing[analytics]"``).
+
+Example
+-------
+>>> track = Track.from_geojson(client.get_track(vid, start, end), vessel_id=vid)
+>>> kinematics(track).implied_speed
+>>> anomalies(track, max_speed=40, dark_gap=timedelta(hours=6)).to_records()
+>>> screen_fleet(archive.read(v, day, next_day) for v in archive).to_records()
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from ._numpy import np
+from .cache import Seconds, _seconds
+from .tracks import Track
+
+JUMP = "jump"
+DARK = "dark"
+
+EARTH_RADIUS_NM = 3440.065
+
+# Default thresholds: faster than any fishing or carrier vessel, and the
+# gap length GFW uses for AIS-disabling events.
+DEFAULT_MAX_SPEED = 50.0  # knots
+DEFAULT_MIN_JUMP_NM = 1.0
+DEFAULT_DARK_GAP = timedelta(hours=12)
+
+# Tracks per batch handed to a pool worker by :func:`screen_fleet`.
+BATCH_SIZE = 256
+
+
+def haversine_nm(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in nautical miles (element-wise, degrees in)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bearing_deg(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Initial great-circle bearing in degrees ``[0, 360)`` (element-wise)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    y = np.sin(dlon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+@dataclass
+class Kinematics:
+    """
+    Motion derived from consecutive positions, aligned with the track's
+    points.  Values of point *i* describe the leg from point *i - 1*; they
+    are ``nan`` where undefined (first point, no movement).
+    """
+
+    times: np.ndarray
+    gap: np.ndarray  # seconds since the previous point
+    distance: np.ndarray  # nautical miles from the previous point
+    implied_speed: np.ndarray  # knots
+    bearing: np.ndarray  # degrees
+    heading_change: np.ndarray  # degrees in [-180, 180), positive = to starboard
+    turn_rate: np.ndarray  # degrees per minute
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def kinematics(track: Track) -> Kinematics:
+    """Per-point :class:`Kinematics` of *track* (sorted by time)."""
+    n = len(track)
+    gap, distance, bearing, heading, turn = (np.full(n, np.nan) for _ in range(5))
+    if n > 1:
+        lat, lon = track.lat, track.lon
+        gap[1:] = np.diff(track.times)
+        distance[1:] = haversine_nm(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        legs = bearing_deg(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        legs[distance[1:] == 0] = np.nan
+        bearing[1:] = legs
+        heading[2:] = (legs[1:] - legs[:-1] + 180.0) % 360.0 - 180.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        turn[2:] = heading[2:] / (gap[2:] / 60.0)
+        speed = distance / (gap / 3600.0)
+    return Kinematics(track.times, gap, distance, speed, bearing, heading, turn)
+
+
+@dataclass
+class Anomalies:
+    """
+    Flagged legs (columnar), one row per anomaly.
+
+    A row spans the leg from point ``start`` / (``lat``, ``lon``) to point
+    ``end`` / (``lat_end``, ``lon_end``); ``vessel`` holds integer codes into
+    ``vessel_ids``.
+    """
+
+    vessel_ids: np.ndarray
+    vessel: np.ndarray
+    kind: np.ndarray
+    start: np.ndarray  # epoch seconds
+    end: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    lat_end: np.ndarray
+    lon_end: np.ndarray
+    distance: np.ndarray  # nautical miles
+    implied_speed: np.ndarray  # knots
+
+    def __len__(self) -> int:
+        return len(self.vessel)
+
+    @classmethod
+    def concat(cls, parts: Iterable["Anomalies"]) -> "Anomalies":
+        """Join results of several batches (vessel codes are remapped)."""
+        parts = list(parts)
+        if not parts:
+            return _anomalies(np.array([], dtype=object), *([np.empty(0)] * 10))
+        offsets = np.cumsum([0] + [len(p.vessel_ids) for p in parts[:-1]])
+        return cls(
+            np.concatenate([p.vessel_ids for p in parts]),
+            np.concatenate([p.vessel + off for p, off in zip(parts, offsets)]),
+            *(np.concatenate([getattr(p, name) for p in parts]) for name in _ROW_COLUMNS[1:]),
+        )
+
+    def take(self, mask_or_index) -> "Anomalies":
+        return Anomalies(self.vessel_ids, *(getattr(self, name)[mask_or_index] for name in _ROW_COLUMNS))
+
+    def of_kind(self, kind: str) -> "Anomalies":
+        return self.take(self.kind == kind)
+
+    def duration_hours(self) -> np.ndarray:
+        return (self.end - self.start) / 3600.0
+
+    def to_records(self) -> list[dict]:
+        starts = np.datetime_as_string(self.start.astype("datetime64[s]"), unit="s")
+        ends = np.datetime_as_string(self.end.astype("datetime64[s]"), unit="s")
+        return [
+            {
+                "vesselId": self.vessel_ids[v],
+                "type": kind,
+                "start": f"{s}Z",
+                "end": f"{e}Z",
+                "lat": float(lat),
+                "lon": float(lon),
+                "latEnd": float(lat_end),
+                "lonEnd": float(lon_end),
+                "distanceNm": round(float(dist), 3),
+                "impliedSpeedKnots": round(float(speed), 2) if np.isfinite(speed) else None,
+            }
+            for v, kind, s, e, lat, lon, lat_end, lon_end, dist, speed in zip(
+                self.vessel, self.kind, starts, ends, self.lat, self.lon,
+                self.lat_end, self.lon_end, self.distance, self.implied_speed,
+            )
+        ]
+
+
+_ROW_COLUMNS = (
+    "vessel", "kind", "start", "end", "lat", "lon", "lat_end", "lon_end", "distance", "implied_speed",
+)
+
+
+def _anomalies(vessel_ids: np.ndarray, *columns: np.ndarray) -> Anomalies:
+    vessel, kind, *rest = columns
+    return Anomalies(vessel_ids, vessel.astype(np.int64), kind.astype(object), *rest)
+
+
+def _screen(
+    tracks: list[Track],
+    max_speed: float = DEFAULT_MAX_SPEED,
+    min_jump_nm: float = DEFAULT_MIN_JUMP_NM,
+    dark_gap: Seconds = DEFAULT_DARK_GAP,
+) -> Anomalies:
+    """Flag the anomalies of *tracks* in one pass over their concatenation."""
+    vessel_ids = np.array([t.vessel_id or "" for t in tracks], dtype=object)
+    lengths = np.array([len(t) for t in tracks], dtype=np.int64)
+    if lengths.sum() < 2:
+        return Anomalies.concat([])
+    vessel = np.repeat(np.arange(len(tracks)), lengths)
+    times = np.concatenate([t.times for t in tracks])
+    lat = np.concatenate([t.lat for t in tracks]).astype(np.float64)
+    lon = np.concatenate([t.lon for t in tracks]).astype(np.float64)
+
+    same = vessel[1:] == vessel[:-1]
+    gap = np.diff(times).astype(np.float64)
+    distance = haversine_nm(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(gap > 0, distance / (gap / 3600.0), np.inf)
+
+    jump = same & (distance >= min_jump_nm) & (speed > max_speed)
+    dark = same & (gap >= _seconds(dark_gap))
+    i = np.flatnonzero(jump | dark)
+    kind = np.where(jump[i], JUMP, DARK)
+    return _anomalies(
+        vessel_ids, vessel[i], kind, times[i], times[i + 1],
+        lat[i], lon[i], lat[i + 1], lon[i + 1], distance[i], speed[i],
+    )
+
+
+def anomalies(
+    track: Track,
+    *,
+    max_speed: float = DEFAULT_MAX_SPEED,
+    min_jump_nm: float = DEFAULT_MIN_JUMP_NM,
+    dark_gap: Seconds = DEFAULT_DARK_GAP,
+) -> Anomalies:
+    """
+    Jumps and dark periods of one track.
+
+    Parameters
+    ----------
+    max_speed
+        Implied speed (knots) above which a leg is a jump.
+    min_jump_nm
+        Legs shorter than this are never jumps (position jitter between
+        near-simultaneous fixes).
+    dark_gap
+        Minimum silence (seconds or ``timedelta``) reported as a dark period.
+
+    A leg can be both a jump and a dark period; it is then reported as a
+    jump.
+    """
+    return _screen([track], max_speed, min_jump_nm, dark_gap)
+
+
+def screen_fleet(
+    tracks: Iterable[Track],
+    *,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    max_speed: float = DEFAULT_MAX_SPEED,
+    min_jump_nm: float = DEFAULT_MIN_JUMP_NM,
+    dark_gap: Seconds = DEFAULT_DARK_GAP,
+) -> Anomalies:
+    """
+    :func:`anomalies` of many tracks, in batches of *batch_size* tracks over
+    a pool of *workers* processes (default: one per CPU; ``1`` screens in
+    this process).  Thresholds are those of :func:`anomalies`.
+    """
+    if batch_size < 1:
+        raise ValueError("'batch_size' must be >= 1")
+    tracks = list(tracks)
+    batches = [tracks[i : i + batch_size] for i in range(0, len(tracks), batch_size)]
+    options = (max_speed, min_jump_nm, _seconds(dark_gap))
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    if workers <= 1:
+        return Anomalies.concat(_screen(batch, *options) for batch in batches)
+    with ProcessPoolExecutor(workers) as pool:
+        n = len(batches)
+        results = pool.map(_screen, batches, [options[0]] * n, [options[1]] * n, [options[2]] * n)
+        return Anomalies.concat(list(results))
@@ -0,0 +1,719 @@
+"""
+mockserver.py
+
+Local stand-in for ``gateway.api.globalfishingwatch.org/v3``.
+
+An asyncio HTTP/1.1 server implementing the paths used by
+:class:`~ais_global_fishing.GFWClient` with deterministic synthetic data.
+It exists to tune and benchmark client throughput without touching the real
+API: it enforces a request quota with ``429 Too Many Requests``, adds
+configurable latency, and paginates list endpoints with
+``limit`` / ``offset`` / ``nextOffset`` like the real gateway.  Bodies are
+gzip-compressed for clients that accept it, and *bandwidth* simulates a
+slow link.
+
+Run it from the command line::
+
+    gfw mock-server --port 8080 --rps 20 --latency lognormal:0.08,0.4
+
+and point a client at it::
+
+    GFWClient(api_key="anything", base_url="http://127.0.0.1:8080/v3")
+
+or start it inside a test / benchmark with :func:`serve_in_thread`.
+
+Synthetic data is a pure function of the request (vessel id, time window,
+seed), so the same query always returns the same payload and time-sharded
+fetches line up with unsharded ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import math
+import random
+import re
+import threading
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from .ratelimit import TokenBucket
+from .timewindow import to_utc
+
+API_PREFIX = "/v3"
+DEFAULT_PAGE_SIZE = 1000
+COMPRESS_MIN_SIZE = 1024  # smaller bodies are sent as they are
+
+# Trips have no time filter in the API; they are generated over this range.
+TRIP_HISTORY = (datetime(2023, 1, 1, tzinfo=timezone.utc), datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+PORTS = [
+    ("ESP-VGO", "VIGO", "ESP", 42.24, -8.72),
+    ("ESP-LPA", "LAS PALMAS", "ESP", 28.14, -15.42),
+    ("PRT-LIS", "LISBOA", "PRT", 38.70, -9.14),
+    ("NOR-TOS", "TROMSO", "NOR", 69.65, 18.96),
+    ("ISL-REY", "REYKJAVIK", "ISL", 64.15, -21.94),
+    ("PER-CAL", "CALLAO", "PER", -12.05, -77.15),
+    ("CHN-ZHS", "ZHOUSHAN", "CHN", 29.98, 122.20),
+    ("MUS-PLU", "PORT LOUIS", "MUS", -20.16, 57.50),
+    ("NAM-WVB", "WALVIS BAY", "NAM", -22.95, 14.50),
+    ("THA-SKN", "SONGKHLA", "THA", 7.20, 100.60),
+]
+FLAGS = ["ESP", "PRT", "NOR", "CHN", "PER", "TWN", "KOR", "PAN", "LBR", "RUS"]
+GEAR_TYPES = ["TRAWLERS", "PURSE_SEINES", "DRIFTING_LONGLINES", "SQUID_JIGGER", "POLE_AND_LINE"]
+SHIP_TYPES = ["FISHING", "CARRIER", "CARGO", "SUPPORT"]
+COLLECTION_TYPES = {
+    "fishing": "fishing",
+    "encounters": "encounter",
+    "loitering": "loitering",
+    "transshipments": "encounter",
+    "port_visits": "port_visit",
+}
+
+_RESOLUTION_RE = re.compile(r"^(\d+)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+# ---------------------------------------------------------------------- #
+# Latency / quota
+# ---------------------------------------------------------------------- #
+def make_latency(spec: str | float | None, seed: Optional[int] = None) -> Callable[[], float]:
+    """
+    Build a latency sampler (seconds) from a spec.
+
+    ``None`` / ``0`` – no delay; a number – fixed delay;
+    ``"fixed:S"``, ``"uniform:LO,HI"``, ``"exponential:MEAN"`` or
+    ``"lognormal:MEDIAN,SIGMA"``.
+    """
+    rng = random.Random(seed)
+    if spec is None:
+        return lambda: 0.0
+    if isinstance(spec, (int, float)):
+        return lambda: float(spec)
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "exponential":
+        return lambda: rng.expovariate(1.0 / values[0])
+    if kind == "lognormal":
+        mu, sigma = math.log(values[0]), values[1]
+        return lambda: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"unknown latency spec: {spec!r}")
+
+
+@dataclass
+class ServerStats:
+    """Counters exposed as :attr:`MockGateway.stats`."""
+
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    bytes_sent: int = 0
+    by_route: dict[str, int] = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------- #
+# Synthetic data
+# ---------------------------------------------------------------------- #
+def _rng(*parts: Any) -> random.Random:
+    return random.Random(zlib.crc32("|".join(map(str, parts)).encode("utf-8")))
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _vessel_profile(vessel_id: str, seed: int) -> dict:
+    rng = _rng(seed, "vessel", vessel_id)
+    return {
+        "id": vessel_id,
+        "ssvid": str(rng.randrange(200_000_000, 775_000_000)),
+        "imo": str(rng.randrange(9_000_000, 9_999_999)),
+        "shipname": f"MOCK {vessel_id[-6:].upper()}",
+        "callsign": "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ") for _ in range(5)),
+        "flag": rng.choice(FLAGS),
+        "geartype": rng.choice(GEAR_TYPES),
+        "shiptype": rng.choices(SHIP_TYPES, weights=[6, 1, 2, 1])[0],
+        "lat0": rng.uniform(-50, 65),
+        "lon0": rng.uniform(-170, 170),
+        "phase": rng.uniform(0, 2 * math.pi),
+    }
+
+
+def _position(profile: dict, ts: float) -> tuple[float, float]:
+    """Smooth, time-continuous synthetic position of a vessel."""
+    t = ts / 86400.0
+    lat = profile["lat0"] + 3.0 * math.sin(t / 3.1 + profile["phase"])
+    lon = profile["lon0"] + 5.0 * math.cos(t / 4.7 + profile["phase"])
+    return round(max(-89.9, min(89.9, lat)), 5), round((lon + 180) % 360 - 180, 5)
+
+
+def _identity(vessel_id: str, seed: int, includes: set[str]) -> dict:
+    p = _vessel_profile(vessel_id, seed)
+    info = {
+        "id": vessel_id,
+        "ssvid": p["ssvid"],
+        "shipname": p["shipname"],
+        "nShipname": p["shipname"].replace(" ", ""),
+        "flag": p["flag"],
+        "callsign": p["callsign"],
+        "imo": p["imo"],
+        "transmissionDateFrom": "2019-01-01T00:00:00Z",
+        "transmissionDateTo": "2024-12-31T00:00:00Z",
+        "sourceCode": ["AIS"],
+    }
+    record: dict[str, Any] = {
+        "dataset": "public-global-vessel-identity:v3.0",
+        "registryInfoTotalRecords": 1,
+        "registryInfo": [{**info, "geartypes": [p["geartype"]], "lengthM": 40.0, "tonnageGt": 500.0}],
+        "combinedSourcesInfo": [
+            {
+                "vesselId": vessel_id,
+                "geartypes": [{"name": p["geartype"], "source": "COMBINATION", "yearFrom": 2019, "yearTo": 2024}],
+                "shiptypes": [{"name": p["shiptype"], "source": "COMBINATION", "yearFrom": 2019, "yearTo": 2024}],
+            }
+        ],
+        "selfReportedInfo": [info],
+    }
+    if "OWNERSHIP" in includes:
+        record["registryOwners"] = [{"name": f"{p['shipname']} FISHING CO", "flag": p["flag"], "ssvid": p["ssvid"]}]
+    if "AUTHORIZATIONS" in includes:
+        record["registryPublicAuthorizations"] = [{"sourceCode": ["ICCAT"], "dateFrom": "2020-01-01T00:00:00Z"}]
+    if "MATCH_CRITERIA" in includes:
+        record["matchCriteria"] = [{"reference": vessel_id, "source": "AIS", "latestVesselInfo": True}]
+    return record
+
+
+def _event(kind: str, vessel_id: str, seed: int, start: float, duration: float, idx: int) -> dict:
+    p = _vessel_profile(vessel_id, seed)
+    lat, lon = _position(p, start)
+    rng = _rng(seed, kind, vessel_id, int(start))
+    event: dict[str, Any] = {
+        "id": f"{zlib.crc32(f'{kind}{vessel_id}{int(start)}'.encode()):08x}{idx:04x}",
+        "type": kind,
+        "start": _iso(start),
+        "end": _iso(start + duration),
+        "position": {"lat": lat, "lon": lon},
+        "vessel": {"id": vessel_id, "name": p["shipname"], "ssvid": p["ssvid"], "flag": p["flag"], "type": p["shiptype"].lower()},
+    }
+    if kind == "encounter":
+        other = f"mock-vessel-{rng.randrange(10_000):04d}"
+        q = _vessel_profile(other, seed)
+        event["encounter"] = {
+            "vessel": {"id": other, "name": q["shipname"], "flag": q["flag"], "type": "carrier"},
+            "medianDistanceKilometers": round(rng.uniform(0.05, 0.5), 3),
+            "medianSpeedKnots": round(rng.uniform(0.1, 2.0), 2),
+        }
+    elif kind == "port_visit":
+        port_id, name, country, plat, plon = _port_for(vessel_id, seed, start)
+        anchorage = {"id": port_id, "name": name, "flag": country, "lat": plat, "lon": plon}
+        event["position"] = {"lat": plat, "lon": plon}
+        event["port_visit"] = {
+            "visitId": event["id"],
+            "confidence": "4",
+            "durationHrs": round(duration / 3600, 2),
+            "startAnchorage": anchorage,
+            "intermediateAnchorage": anchorage,
+            "endAnchorage": anchorage,
+        }
+    elif kind == "fishing":
+        event["fishing"] = {"totalDistanceKm": round(rng.uniform(5, 80), 2), "averageSpeedKnots": round(rng.uniform(1, 5), 2)}
+    elif kind == "loitering":
+        event["loitering"] = {"totalTimeHours": round(duration / 3600, 2), "averageSpeedKnots": round(rng.uniform(0, 2), 2)}
+    return event
+
+
+def _port_for(vessel_id: str, seed: int, ts: float) -> tuple:
+    return _rng(seed, "port", vessel_id, int(ts)).choice(PORTS)
+
+
+# kind -> (bucket seconds, max events per bucket, min / max duration seconds)
+_SCHEDULE = {
+    "fishing": (86400, 2, 2 * 3600, 10 * 3600),
+    "encounter": (7 * 86400, 1, 2 * 3600, 8 * 3600),
+    "loitering": (3 * 86400, 1, 3600, 6 * 3600),
+    "port_visit": (10 * 86400, 1, 12 * 3600, 72 * 3600),
+}
+
+
+def vessel_events(kind: str, vessel_id: str, seed: int, lo: float, hi: float) -> list[dict]:
+    """
+    Synthetic events of *kind* for one vessel starting in ``[lo, hi)``.
+
+    Events are laid out per fixed time bucket, so any split of a window into
+    shards yields exactly the events of the whole window.
+    """
+    bucket, max_n, dmin, dmax = _SCHEDULE[kind]
+    events = []
+    for b in range(int(lo // bucket), int(math.ceil(hi / bucket))):
+        rng = _rng(seed, "schedule", kind, vessel_id, b)
+        n = rng.randint(0, max_n)
+        for i in range(n):
+            start = b * bucket + rng.uniform(0, bucket)
+            duration = rng.uniform(dmin, dmax)
+            if lo <= start < hi:
+                events.append(_event(kind, vessel_id, seed, start, duration, i))
+    events.sort(key=lambda e: e["start"])
+    return events
+
+
+def _track(vessel_id: str, seed: int, lo: float, hi: float, resolution: str) -> dict:
+    match = _RESOLUTION_RE.match(resolution or "1h")
+    step = int(match[1]) * _UNITS[match[2]] if match else 3600
+    p = _vessel_profile(vessel_id, seed)
+    features = []
+    ts = math.ceil(lo / step) * step
+    while ts < hi:
+        lat, lon = _position(p, ts)
+        lat2, lon2 = _position(p, ts + 60)
+        course = (math.degrees(math.atan2(lon2 - lon, lat2 - lat)) + 360) % 360
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {"timestamp": _iso(ts), "speed": round(abs(math.sin(ts / 7200.0)) * 12, 2), "course": round(course, 1)},
+            }
+        )
+        ts += step
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _trips(vessel_id: str, seed: int) -> list[dict]:
+    lo, hi = (t.timestamp() for t in TRIP_HISTORY)
+    visits = vessel_events("port_visit", vessel_id, seed, lo, hi)
+    trips = []
+    for prev, nxt in zip(visits, visits[1:]):
+        a, b = prev["port_visit"]["endAnchorage"], nxt["port_visit"]["startAnchorage"]
+        trips.append(
+            {
+                "id": f"{prev['id']}-{nxt['id']}",
+                "vesselId": vessel_id,
+                "departureTime": prev["end"],
+                "arrivalTime": nxt["start"],
+                "fromPortId": a["id"],
+                "fromPortName": a["name"],
+                "fromCountry": a["flag"],
+                "toPortId": b["id"],
+                "toPortName": b["name"],
+                "toCountry": b["flag"],
+            }
+        )
+    return trips
+
+
+def _risk(vessel_id: str, seed: int) -> dict:
+    rng = _rng(seed, "risk", vessel_id)
+    return {
+        "vesselId": vessel_id,
+        "score": round(rng.random(), 3),
+        "iuuListed": rng.random() < 0.02,
+        "indicators": {
+            "encountersWithCarriers": rng.randint(0, 12),
+            "fishingInMPAHours": round(rng.uniform(0, 50), 1),
+            "gapsInAisHours": round(rng.uniform(0, 400), 1),
+            "flagChanges": rng.randint(0, 3),
+        },
+    }
+
+
+# ---------------------------------------------------------------------- #
+# Server
+# ---------------------------------------------------------------------- #
+class _GatewayError(Exception):
+    """Turned into an error response by :meth:`MockGateway._dispatch`."""
+
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+def _accepts_gzip(headers: dict) -> bool:
+    for item in headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class MockGateway:
+    """
+    Synthetic Gateway v3 server.
+
+    Parameters
+    ----------
+    host, port
+        Address to bind (``port=0`` picks a free port).
+    rps, burst
+        Token-bucket quota; requests beyond it get a 429 with ``Retry-After``.
+        ``rps=None`` disables the quota.
+    max_in_flight
+        Concurrent requests above this get a 429 as well (``None``: no limit).
+    latency
+        Spec understood by :func:`make_latency`, or a zero-argument callable.
+    error_rate
+        Probability of answering with a 500, for resilience testing.
+    fleet_size
+        Number of synthetic vessels behind collection endpoints queried
+        without ``vesselIds``.
+    page_size
+        Default ``limit`` of paginated endpoints.
+    compress
+        Gzip bodies of at least :data:`COMPRESS_MIN_SIZE` bytes for clients
+        sending ``Accept-Encoding: gzip``.
+    bandwidth
+        Link speed in bytes per second; each response is delayed by its
+        size on the wire divided by it (``None``: unlimited).
+    seed
+        Changes every generated value.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        *,
+        rps: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        latency: Any = None,
+        error_rate: float = 0.0,
+        fleet_size: int = 50,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        compress: bool = True,
+        bandwidth: Optional[float] = None,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.bucket = TokenBucket(rps, burst)
+        self.max_in_flight = max_in_flight
+        self.latency = latency if callable(latency) else make_latency(latency, seed)
+        self.error_rate = error_rate
+        self.fleet = [f"mock-vessel-{i:04d}" for i in range(fleet_size)]
+        self.page_size = page_size
+        self.compress = compress
+        self.bandwidth = bandwidth
+        self.seed = seed
+        self.stats = ServerStats()
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: list[tuple[re.Pattern, Callable[..., Any]]] = [
+            (re.compile(r"^/vessels/search$"), self._search),
+            (re.compile(r"^/vessels$"), self._bulk),
+            (re.compile(r"^/vessels/(?P<vid>[^/]+)/track$"), self._track),
+            (re.compile(r"^/vessels/(?P<vid>[^/]+)/segments$"), self._segments),
+            (re.compile(r"^/vessels/(?P<vid>[^/]+)/events$"), self._vessel_events),
+            (re.compile(r"^/vessels/(?P<vid>[^/]+)/risk$"), self._risk),
+            (re.compile(r"^/vessels/(?P<vid>[^/]+)/trips$"), self._trips),
+            (re.compile(r"^/vessels/(?P<vid>[^/]+)$"), self._details),
+            (re.compile(r"^/events/(?P<collection>[a-z_]+)$"), self._collection),
+            (re.compile(r"^/ports/visits$"), self._port_visits),
+        ]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}{API_PREFIX}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    # ------------------------------------------------------------------ #
+    # HTTP plumbing
+    # ------------------------------------------------------------------ #
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+                    # Client went away, or the server is shutting down.
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                status, body, extra = await self._dispatch(method, target, headers)
+                reason = _REASONS.get(status, "OK")
+                out = [f"HTTP/1.1 {status} {reason}", "Content-Type: application/json"]
+                if self.compress and len(body) >= COMPRESS_MIN_SIZE and _accepts_gzip(headers):
+                    body = gzip.compress(body, compresslevel=6)
+                    out.append("Content-Encoding: gzip")
+                out.append(f"Content-Length: {len(body)}")
+                out += [f"{k}: {v}" for k, v in extra.items()]
+                payload = ("\r\n".join(out) + "\r\n\r\n").encode("latin-1")
+                data = payload if method == "HEAD" else payload + body
+                if self.bandwidth:
+                    await asyncio.sleep(len(data) / self.bandwidth)
+                writer.write(data)
+                await writer.drain()
+                self.stats.bytes_sent += len(data)
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, headers: dict) -> tuple[int, bytes, dict]:
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        try:
+            if self.max_in_flight is not None and self.stats.in_flight > self.max_in_flight:
+                raise _GatewayError(429, "too many concurrent requests", {"Retry-After": "1"})
+            wait = self.bucket.take()
+            if wait is not None:
+                raise _GatewayError(429, "quota exceeded", {"Retry-After": str(max(1, math.ceil(wait)))})
+            if not headers.get("authorization", "").startswith("Bearer "):
+                raise _GatewayError(401, "missing bearer token")
+
+            delay = self.latency()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                raise _GatewayError(500, "injected server error")
+
+            url = urlsplit(target)
+            if not url.path.startswith(API_PREFIX):
+                raise _GatewayError(404, f"unknown path {url.path}")
+            path = url.path[len(API_PREFIX):]
+            params = dict(parse_qsl(url.query, keep_blank_values=True))
+            for pattern, handler in self._routes:
+                match = pattern.match(path)
+                if match:
+                    route = pattern.pattern
+                    self.stats.by_route[route] = self.stats.by_route.get(route, 0) + 1
+                    if method == "HEAD":
+                        return 200, b"", {}
+                    result = handler(params, **match.groupdict())
+                    return 200, json.dumps(result, separators=(",", ":")).encode("utf-8"), {}
+            raise _GatewayError(404, f"unknown path {path}")
+        except _GatewayError as exc:
+            if exc.status == 429:
+                self.stats.throttled += 1
+            else:
+                self.stats.errors += 1
+            body = json.dumps({"statusCode": exc.status, "error": _REASONS.get(exc.status, ""), "message": str(exc)})
+            return exc.status, body.encode("utf-8"), exc.headers
+        except (ValueError, KeyError) as exc:
+            self.stats.errors += 1
+            return 400, json.dumps({"statusCode": 400, "message": str(exc)}).encode("utf-8"), {}
+        finally:
+            self.stats.in_flight -= 1
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+    def _page(self, entries: list, params: dict) -> dict:
+        limit = int(params.get("limit", self.page_size))
+        offset = int(params.get("offset", 0))
+        chunk = entries[offset:offset + limit]
+        more = offset + limit < len(entries)
+        return {
+            "entries": chunk,
+            "limit": limit,
+            "offset": offset,
+            "nextOffset": offset + limit if more else None,
+            "total": len(entries),
+        }
+
+    @staticmethod
+    def _window(params: dict) -> tuple[float, float]:
+        if "start" not in params or "end" not in params:
+            raise _GatewayError(400, "'start' and 'end' are required")
+        lo, hi = to_utc(params["start"]).timestamp(), to_utc(params["end"]).timestamp()
+        if hi <= lo:
+            raise _GatewayError(400, "'end' must be after 'start'")
+        return lo, hi
+
+    @staticmethod
+    def _list(params: dict, name: str) -> list[str]:
+        indexed = [v for k, v in sorted(params.items()) if k.startswith(f"{name}[")]
+        if indexed:
+            return indexed
+        value = params.get(name)
+        return [v for v in value.split(",") if v] if value else []
+
+    # ------------------------------------------------------------------ #
+    # Routes
+    # ------------------------------------------------------------------ #
+    def _search(self, params: dict) -> dict:
+        text = params.get("query") or params.get("where")
+        if not text:
+            raise _GatewayError(400, "'query' or 'where' is required")
+        includes = set(self._list(params, "includes"))
+        total = 1 if text.isdigit() else 1 + zlib.crc32(text.encode()) % 40
+        ids = [f"mock-{zlib.crc32(text.encode()):08x}-{i:03d}" for i in range(total)]
+        page = self._page(ids, params)
+        page["entries"] = [_identity(vid, self.seed, includes) for vid in page["entries"]]
+        return page
+
+    def _bulk(self, params: dict) -> dict:
+        ids = self._list(params, "ids")
+        if not ids:
+            raise _GatewayError(400, "'ids' is required")
+        includes = set(self._list(params, "includes"))
+        return self._page([_identity(vid, self.seed, includes) for vid in ids], params)
+
+    def _details(self, params: dict, vid: str) -> dict:
+        return _identity(vid, self.seed, set(self._list(params, "includes")))
+
+    def _track(self, params: dict, vid: str) -> dict:
+        lo, hi = self._window(params)
+        return _track(vid, self.seed, lo, hi, params.get("resolution", "1h"))
+
+    def _segments(self, params: dict, vid: str) -> dict:
+        lo, hi = self._window(params)
+        step = 2 * 86400
+        bounds = [lo + i * step for i in range(int((hi - lo) // step) + 1)] + [hi]
+        segments = [
+            {"id": f"{vid}-{int(a)}", "start": _iso(a), "end": _iso(b)}
+            for a, b in zip(bounds, bounds[1:])
+            if b > a
+        ]
+        return {"entries": segments, "total": len(segments)}
+
+    def _vessel_events(self, params: dict, vid: str) -> dict:
+        lo, hi = self._window(params)
+        kinds = [k.lower() for k in self._list(params, "eventType")] or list(_SCHEDULE)
+        events = [e for kind in kinds if kind in _SCHEDULE for e in vessel_events(kind, vid, self.seed, lo, hi)]
+        events.sort(key=lambda e: e["start"])
+        return self._page(events, params)
+
+    def _collection_events(self, params: dict, collection: str) -> list:
+        kind = COLLECTION_TYPES.get(collection)
+        if kind is None:
+            raise _GatewayError(404, f"unknown event collection {collection!r}")
+        lo, hi = self._window(params)
+        vessels = self._list(params, "vesselIds") or self.fleet
+        events = [e for vid in vessels for e in vessel_events(kind, vid, self.seed, lo, hi)]
+        events.sort(key=lambda e: e["start"])
+        return events
+
+    def _collection(self, params: dict, collection: str) -> dict:
+        return self._page(self._collection_events(params, collection), params)
+
+    def _port_visits(self, params: dict) -> dict:
+        visits = self._collection_events(params, "port_visits")
+        ports = set(self._list(params, "portIds"))
+        if ports:
+            visits = [e for e in visits if e["port_visit"]["intermediateAnchorage"]["id"] in ports]
+        return self._page(visits, params)
+
+    def _risk(self, params: dict, vid: str) -> dict:
+        return _risk(vid, self.seed)
+
+    def _trips(self, params: dict, vid: str) -> dict:
+        return self._page(_trips(vid, self.seed), params)
+
+
+class RunningServer:
+    """Handle returned by :func:`serve_in_thread`."""
+
+    def __init__(self, gateway: MockGateway, loop: asyncio.AbstractEventLoop, thread: threading.Thread):
+        self.gateway = gateway
+        self._loop = loop
+        self._thread = thread
+
+    @property
+    def base_url(self) -> str:
+        return self.gateway.base_url
+
+    @property
+    def stats(self) -> ServerStats:
+        return self.gateway.stats
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def __enter__(self) -> "RunningServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def serve_in_thread(**options: Any) -> RunningServer:
+    """
+    Start a :class:`MockGateway` on a background thread and return once it
+    accepts connections.  Defaults to a free port on 127.0.0.1.
+    """
+    options.setdefault("port", 0)
+    gateway = MockGateway(**options)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    failure: list[BaseException] = []
+
+    def _run() -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(gateway.start())
+        except BaseException as exc:  # pragma: no cover - bind errors
+            failure.append(exc)
+            ready.set()
+            return
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            gateway.close()
+            # Let open keep-alive connections run their clean-up.
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    thread = threading.Thread(target=_run, name="gfw-mock-gateway", daemon=True)
+    thread.start()
+    ready.wait()
+    if failure:
+        raise failure[0]
+    return RunningServer(gateway, loop, thread)
+
+
+def run(**options: Any) -> None:
+    """Run a :class:`MockGateway` in the foreground until interrupted."""
+    gateway = MockGateway(**options)
+
+    async def _main() -> None:
+        await gateway.start()
+        print(f"Mock GFW gateway listening on {gateway.base_url}")
+        await gateway.serve_forever()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
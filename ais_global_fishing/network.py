@@ -0,0 +1,381 @@
+"""
+network.py
+
+Vessel encounter network built from ``get_encounters`` /
+``get_transshipments`` pages.
+
+Each encounter links two vessels.  :class:`EncounterGraph` interns vessel
+ids to dense integers and keeps the links as flat numpy arrays (both
+endpoints, start time, event type) that grow as new windows are appended.
+Queries work on a compressed sparse row (CSR) adjacency built on demand and
+cached until the next append, so years of encounters – millions of edges –
+answer k-hop, component and centrality questions with array operations
+instead of Python graph objects.
+
+Requires ``numpy`` (``pip install "ais-global-fishing[analytics]"``).
+
+Example
+-------
+>>> graph = EncounterGraph()
+>>> for window in TimeWindow.of("2020-01-01", "2025-01-01").split(timedelta(days=30)):
+...     graph.add(client.get_encounters(window.start, window.end))
+>>> graph.k_hop(["carrier-id"], k=2)            # {vessel id: hops}
+>>> graph.top(graph.pagerank(), 10)            # most central vessels
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ._numpy import np
+from .records import event_fields, page_records
+from .timeline import objects, parse_times
+from .timewindow import TimeLike, to_utc
+
+# Event types are stored as small integer codes; unknown types get new ones.
+DEFAULT_KINDS = ("encounter", "transshipment", "loitering")
+
+
+def _distinct(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct *values* and how often each occurs (sort-based ``np.unique``)."""
+    ordered = np.sort(values)
+    first = np.empty(len(ordered), dtype=bool)
+    first[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=first[1:])
+    starts = np.flatnonzero(first)
+    return ordered[starts], np.diff(np.append(starts, len(ordered)))
+
+
+class _Buffer:
+    """Append-only numpy column with amortised O(1) growth."""
+
+    def __init__(self, dtype: Any, capacity: int = 1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        need = self.size + len(values)
+        if need > len(self._data):
+            grown = np.empty(max(need, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[: self.size] = self._data[: self.size]
+            self._data = grown
+        self._data[self.size : need] = values
+        self.size = need
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[: self.size]
+
+
+class EncounterGraph:
+    """
+    Undirected multigraph of vessels linked by encounter-type events.
+
+    Parallel edges are kept (two vessels meeting ten times give ten edges),
+    so edge counts double as encounter counts.  Events are de-duplicated by
+    ``id``: an encounter that appears in the pages of both its vessels, or
+    in overlapping windows, is added once.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self._index: dict[str, int] = {}
+        self.kinds: list[str] = list(DEFAULT_KINDS)
+        self._src = _Buffer(np.int32)
+        self._dst = _Buffer(np.int32)
+        self._start = _Buffer("datetime64[s]")
+        self._kind = _Buffer(np.uint8)
+        self._rid = _Buffer(object)  # record id of every edge (None if it had none)
+        self._seen: set[str] = set()
+        self._csr: Optional[tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    # ------------------------------------------------------------------ #
+    # Building
+    # ------------------------------------------------------------------ #
+    def _intern(self, vessel_id: str) -> int:
+        idx = self._index.get(vessel_id)
+        if idx is None:
+            idx = self._index[vessel_id] = len(self.ids)
+            self.ids.append(vessel_id)
+        return idx
+
+    def _kind_code(self, kind: Optional[str]) -> int:
+        kind = (kind or "encounter").lower()
+        if kind not in self.kinds:
+            self.kinds.append(kind)
+        return self.kinds.index(kind)
+
+    def add(self, pages: Any) -> int:
+        """
+        Append the encounters of one API page (or a list of pages) and
+        return the number of new edges.  Records without two vessel ids are
+        skipped.
+        """
+        if isinstance(pages, dict):
+            pages = [pages]
+        src, dst, starts, kinds, rids = [], [], [], [], []
+        codes: dict[Optional[str], int] = {}
+        intern = self._intern
+        for page in pages:
+            for rec in page_records(page):
+                if not isinstance(rec, dict):
+                    continue
+                fields = event_fields(rec)
+                a, b = fields.vessel_id, fields.other_vessel_id
+                if not a or not b or a == b:
+                    continue
+                rid = rec.get("id")
+                if rid is not None:
+                    if rid in self._seen:
+                        continue
+                    self._seen.add(rid)
+                src.append(intern(a))
+                dst.append(intern(b))
+                starts.append(fields.start)
+                kind = rec.get("type")
+                code = codes.get(kind)
+                if code is None:
+                    code = codes[kind] = self._kind_code(kind)
+                kinds.append(code)
+                rids.append(rid)
+        if src:
+            self._src.extend(np.asarray(src, dtype=np.int32))
+            self._dst.extend(np.asarray(dst, dtype=np.int32))
+            self._start.extend(parse_times(starts))
+            self._kind.extend(np.asarray(kinds, dtype=np.uint8))
+            self._rid.extend(objects(rids))
+            self._csr = None
+        return len(src)
+
+    # ------------------------------------------------------------------ #
+    # Edge arrays
+    # ------------------------------------------------------------------ #
+    @property
+    def src(self) -> np.ndarray:
+        return self._src.values
+
+    @property
+    def dst(self) -> np.ndarray:
+        return self._dst.values
+
+    @property
+    def start(self) -> np.ndarray:
+        """Start time of every edge (``datetime64[s]``, ``NaT`` if unknown)."""
+        return self._start.values
+
+    @property
+    def kind(self) -> np.ndarray:
+        """Event type code of every edge (index into :attr:`kinds`)."""
+        return self._kind.values
+
+    @property
+    def n_vessels(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_edges(self) -> int:
+        return self._src.size
+
+    def __contains__(self, vessel_id: str) -> bool:
+        return vessel_id in self._index
+
+    def index_of(self, vessel_ids: Iterable[str]) -> np.ndarray:
+        """Node numbers of the known *vessel_ids* (unknown ones are dropped)."""
+        return np.asarray([self._index[v] for v in vessel_ids if v in self._index], dtype=np.int64)
+
+    def window(
+        self,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> "EncounterGraph":
+        """
+        Sub-graph of the edges starting in ``[start, end)`` (and of the given
+        event *kinds*).  Vessel numbering starts out as this graph's, and
+        the sub-graph knows the ids of its own edges, so :meth:`add` skips
+        them there as it does here; the two graphs are independent
+        afterwards.
+        """
+        mask = np.ones(self.n_edges, dtype=bool)
+        if start is not None:
+            mask &= self.start >= np.datetime64(to_utc(start).replace(tzinfo=None), "s")
+        if end is not None:
+            mask &= self.start < np.datetime64(to_utc(end).replace(tzinfo=None), "s")
+        if kinds is not None:
+            codes = [self.kinds.index(k.lower()) for k in kinds if k.lower() in self.kinds]
+            mask &= np.isin(self.kind, codes)
+
+        sub = EncounterGraph()
+        sub.ids, sub._index, sub.kinds = list(self.ids), dict(self._index), list(self.kinds)
+        for name in ("_src", "_dst", "_start", "_kind", "_rid"):
+            getattr(sub, name).extend(getattr(self, name).values[mask])
+        sub._seen = {rid for rid in sub._rid.values if rid is not None}
+        return sub
+
+    # ------------------------------------------------------------------ #
+    # Adjacency
+    # ------------------------------------------------------------------ #
+    def adjacency(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        CSR adjacency ``(indptr, neighbours, edge)``: the neighbours of node
+        ``i`` are ``neighbours[indptr[i]:indptr[i + 1]]`` and ``edge`` gives
+        the edge number of each entry.  Cached until the next :meth:`add`.
+        """
+        if self._csr is None:
+            n, m = self.n_vessels, self.n_edges
+            ends = np.concatenate([self.src, self.dst])
+            other = np.concatenate([self.dst, self.src])
+            edge = np.concatenate([np.arange(m), np.arange(m)])
+            order = np.argsort(ends)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(ends, minlength=n), out=indptr[1:])
+            self._csr = (indptr, other[order], edge[order])
+        return self._csr
+
+    def neighbours(self, vessel_id: str) -> list[str]:
+        """Distinct vessels that met *vessel_id*."""
+        if vessel_id not in self._index:
+            return []
+        indptr, other, _ = self.adjacency()
+        i = self._index[vessel_id]
+        return [self.ids[j] for j in _distinct(other[indptr[i] : indptr[i + 1]])[0]]
+
+    def edges_of(self, vessel_id: str) -> np.ndarray:
+        """Edge numbers of every encounter of *vessel_id*."""
+        if vessel_id not in self._index:
+            return np.empty(0, dtype=np.int64)
+        indptr, _, edge = self.adjacency()
+        i = self._index[vessel_id]
+        return np.sort(edge[indptr[i] : indptr[i + 1]])
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def hops(self, vessel_ids: Iterable[str], k: Optional[int] = None) -> np.ndarray:
+        """
+        Breadth-first hop distance of every node from the *vessel_ids*
+        (``-1`` where unreachable within *k* hops).  Each level is expanded
+        for the whole frontier at once.
+        """
+        indptr, other, _ = self.adjacency()
+        dist = np.full(self.n_vessels, -1, dtype=np.int32)
+        frontier = _distinct(self.index_of(vessel_ids))[0]
+        dist[frontier] = 0
+        level = 0
+        while frontier.size and (k is None or level < k):
+            level += 1
+            lengths = indptr[frontier + 1] - indptr[frontier]
+            # Positions of all neighbour entries of the frontier nodes.
+            offsets = np.repeat(indptr[frontier] - np.cumsum(lengths) + lengths, lengths)
+            reached = other[offsets + np.arange(lengths.sum())]
+            reached = _distinct(reached[dist[reached] < 0])[0]
+            dist[reached] = level
+            frontier = reached
+        return dist
+
+    def k_hop(self, vessel_ids: Iterable[str], k: int = 1) -> dict[str, int]:
+        """Vessels within *k* encounters of *vessel_ids*, with their distance."""
+        dist = self.hops(vessel_ids, k)
+        return {self.ids[i]: int(dist[i]) for i in np.flatnonzero(dist >= 0)}
+
+    def components(self) -> np.ndarray:
+        """
+        Connected-component label of every node (the smallest node number
+        in the component), by min-label hooking and pointer jumping.
+        """
+        labels = np.arange(self.n_vessels, dtype=np.int64)
+        src, dst = self.src.astype(np.int64), self.dst.astype(np.int64)
+        while True:
+            a, b = labels[src], labels[dst]
+            if np.array_equal(a, b):
+                return labels
+            np.minimum.at(labels, np.maximum(a, b), np.minimum(a, b))
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+
+    def component_of(self, vessel_id: str) -> list[str]:
+        """All vessels connected to *vessel_id* through any chain of encounters."""
+        if vessel_id not in self._index:
+            return []
+        labels = self.components()
+        return [self.ids[i] for i in np.flatnonzero(labels == labels[self._index[vessel_id]])]
+
+    def degree(self) -> np.ndarray:
+        """Number of distinct vessels met, per node."""
+        ends, _, _ = self._pairs()
+        return np.bincount(ends, minlength=self.n_vessels)
+
+    def _pairs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Directed distinct vessel pairs ``(a, b)`` and their encounter counts."""
+        n = np.int64(max(self.n_vessels, 1))
+        ends = np.concatenate([self.src, self.dst]).astype(np.int64)
+        other = np.concatenate([self.dst, self.src]).astype(np.int64)
+        keys, counts = _distinct(ends * n + other)
+        return keys // n, keys % n, counts
+
+    def strength(self) -> np.ndarray:
+        """Number of encounters, per node."""
+        return np.bincount(np.concatenate([self.src, self.dst]), minlength=self.n_vessels)
+
+    def pagerank(self, damping: float = 0.85, iterations: int = 100, tol: float = 1e-8) -> np.ndarray:
+        """
+        PageRank over the encounter multigraph (repeated meetings weigh
+        more), by power iteration on the distinct vessel pairs.
+        """
+        n = self.n_vessels
+        if n == 0:
+            return np.empty(0)
+        ends, other, counts = self._pairs()
+        out = np.bincount(ends, weights=counts, minlength=n)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(iterations):
+            share = np.divide(rank, out, out=np.zeros(n), where=out > 0)
+            dangling = rank[out == 0].sum()
+            spread = np.bincount(other, weights=share[ends] * counts, minlength=n)
+            new = (1 - damping) / n + damping * (spread + dangling / n)
+            if np.abs(new - rank).sum() < tol:
+                return new
+            rank = new
+        return rank
+
+    def top(self, scores: np.ndarray, n: int = 10) -> list[tuple[str, float]]:
+        """The *n* highest-scoring vessels of a per-node score array."""
+        order = np.argsort(-np.asarray(scores), kind="stable")[:n]
+        return [(self.ids[i], scores[i].item()) for i in order]
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def save(self, path: str | Path) -> None:
+        """Write the graph to a ``.npz`` file."""
+        np.savez_compressed(
+            path,
+            ids=np.asarray(self.ids, dtype=str),
+            kinds=np.asarray(self.kinds, dtype=str),
+            seen=np.asarray(sorted(self._seen), dtype=str),
+            rid=np.asarray(["" if rid is None else rid for rid in self._rid.values], dtype=str),
+            src=self.src,
+            dst=self.dst,
+            start=self.start,
+            kind=self.kind,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EncounterGraph":
+        """Read a graph written by :meth:`save`; it can be appended to."""
+        graph = cls()
+        with np.load(path) as data:
+            graph.ids = data["ids"].tolist()
+            graph._index = {vid: i for i, vid in enumerate(graph.ids)}
+            graph.kinds = data["kinds"].tolist()
+            graph._seen = set(data["seen"].tolist())
+            for name in ("src", "dst", "start", "kind"):
+                getattr(graph, f"_{name}").extend(data[name])
+            # Files written before edge ids were kept have none to restore.
+            rids = data["rid"].tolist() if "rid" in data.files else [""] * graph.n_edges
+            graph._rid.extend(objects(rid or None for rid in rids))
+        return graph
@@ -0,0 +1,365 @@
+"""
+profiling.py
+
+Per-request phase timing, stack sampling and flame-style reports.
+
+When a nightly job is slow, the question is where the time went: waiting
+for the quota or a concurrency slot, opening connections, waiting for the
+server, downloading, decoding JSON, or building models out of it.  A
+:class:`Profiler` attached to a :class:`~ais_global_fishing.GFWClient`
+times every request in these phases:
+
+==========  ==============================================================
+throttle    waiting for a token of the request quota and a concurrency slot
+connect     DNS lookup and TCP / TLS connect (only for new connections)
+ttfb        request sent → response headers received, minus *connect*
+download    reading the body, including its decompression
+decode      JSON parsing
+build       code run under :meth:`Profiler.phase` (model building etc.)
+==========  ==============================================================
+
+Requests are recorded at *sample_rate* and handed to optional hooks as
+:class:`RequestProfile` objects.  :class:`StackSampler` samples the Python
+stacks of all threads to find hot spots in post-processing code.
+:meth:`Profiler.report` prints a flame-style breakdown by endpoint family
+and phase; :func:`speedscope` exports both views to a file that
+https://www.speedscope.app opens.
+
+Example
+-------
+>>> profiler = Profiler().attach(client)
+>>> with StackSampler() as sampler:
+...     pages = client.get_fishing_events(start, end, fleet)
+...     with profiler.phase("build", "events"):
+...         tl = build_timeline([pages])
+>>> print(profiler.report())
+>>> Path("run.speedscope.json").write_text(json.dumps(speedscope(profiler, sampler)))
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .concurrency import endpoint_family
+
+PHASES = ("throttle", "connect", "ttfb", "download", "decode", "build")
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Connect time of the current thread's request, filled in by the timed
+# connection classes below and collected (and reset) by the client after
+# every request through :meth:`Profiler.take_connect_time`.
+_connects = threading.local()
+
+
+def _timed_connect(connect: Callable) -> Callable:
+    def timed(self) -> None:
+        started = time.perf_counter()
+        try:
+            connect(self)
+        finally:
+            _connects.seconds = getattr(_connects, "seconds", 0.0) + time.perf_counter() - started
+
+    return timed
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    """Phase durations (seconds) of one request."""
+
+    path: str
+    family: str
+    status: Optional[int]
+    phases: dict[str, float]
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+
+class Profiler:
+    """
+    Collects :class:`RequestProfile` records and ``build`` phases.
+
+    Parameters
+    ----------
+    sample_rate
+        Fraction of requests recorded (``1.0`` = all).  Unsampled
+        requests cost one random draw.
+    hooks
+        Callables invoked with every recorded :class:`RequestProfile`
+        (e.g. to log slow requests as they happen).
+    """
+
+    def __init__(self, sample_rate: float = 1.0, hooks: Optional[list[Callable[[RequestProfile], Any]]] = None):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("'sample_rate' must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.hooks = list(hooks or [])
+        self.requests: list[RequestProfile] = []
+        self.built: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def attach(self, client) -> "Profiler":
+        """
+        Profile the requests of *client*: set its ``profiler`` and time new
+        connections of its HTTP adapters (existing pooled connections are
+        closed so that connect times are seen).  Returns ``self``.
+        """
+        client.profiler = self
+        for adapter in getattr(getattr(client, "session", None), "adapters", {}).values():
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            manager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+            manager.clear()
+        return self
+
+    def sampled(self) -> bool:
+        """Whether the next request should be recorded."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @staticmethod
+    def take_connect_time() -> float:
+        """
+        Seconds the current thread spent connecting since the last call,
+        and reset them.  The client calls this after every request, sampled
+        or not, so that a connect is never charged to a later request.
+        """
+        seconds = getattr(_connects, "seconds", 0.0)
+        _connects.seconds = 0.0
+        return seconds
+
+    def record(
+        self,
+        path: str,
+        response: Any,
+        throttle: float,
+        fetched: float,
+        decode: float,
+        connect: float = 0.0,
+    ) -> None:
+        """
+        Record one request from the client's timings: *throttle* before
+        sending, *fetched* for the transport call, *decode* for JSON parsing
+        and *connect* from :meth:`take_connect_time`.  The header time is
+        taken from *response*.
+        """
+        elapsed = getattr(response, "elapsed", None)
+        headers = elapsed.total_seconds() if elapsed is not None else fetched
+        headers = min(headers, fetched)
+        profile = RequestProfile(
+            path,
+            endpoint_family(path),
+            getattr(response, "status_code", None),
+            {
+                "throttle": throttle,
+                "connect": min(connect, headers),
+                "ttfb": max(headers - connect, 0.0),
+                "download": fetched - headers,
+                "decode": decode,
+            },
+        )
+        with self._lock:
+            self.requests.append(profile)
+        for hook in self.hooks:
+            hook(profile)
+
+    @contextmanager
+    def phase(self, name: str = "build", family: str = "local") -> Iterator[None]:
+        """Time the block as phase *name* of *family* (default: ``build``)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.built[f"{family};{name}"] += time.perf_counter() - started
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.built.clear()
+
+    # ------------------------------------------------------------------ #
+    # Views
+    # ------------------------------------------------------------------ #
+    def breakdown(self) -> dict[str, dict[str, float]]:
+        """Seconds per endpoint family and phase, request and build phases together."""
+        totals: dict[str, dict[str, float]] = defaultdict(lambda: dict.fromkeys(PHASES, 0.0))
+        with self._lock:
+            for profile in self.requests:
+                row = totals[profile.family]
+                for name, seconds in profile.phases.items():
+                    row[name] += seconds
+            for key, seconds in self.built.items():
+                family, _, name = key.partition(";")
+                row = totals[family]
+                row[name] = row.get(name, 0.0) + seconds
+        return {family: {k: v for k, v in row.items() if v > 0} for family, row in totals.items()}
+
+    def counts(self) -> Counter:
+        """Recorded requests per endpoint family."""
+        with self._lock:
+            return Counter(p.family for p in self.requests)
+
+    def report(self, width: int = 40) -> str:
+        """
+        Flame-style text breakdown: every endpoint family and, indented, its
+        phases, with their seconds, share of the total and a bar.  Seconds
+        are summed over requests, so concurrent requests can add up to more
+        than the wall time.
+        """
+        breakdown = self.breakdown()
+        counts = self.counts()
+        total = sum(sum(row.values()) for row in breakdown.values())
+        lines = [f"{'phase':<22}{'seconds':>10}{'share':>8}  requests={sum(counts.values())}"]
+        if not total:
+            return "\n".join(lines + ["(nothing recorded)"])
+
+        def line(label: str, seconds: float) -> str:
+            bar = "█" * round(width * seconds / total)
+            return f"{label:<22}{seconds:>10.3f}{seconds / total:>8.1%}  {bar}"
+
+        lines.append(line("all", total))
+        for family, row in sorted(breakdown.items(), key=lambda item: -sum(item[1].values())):
+            label = f"  {family}" + (f" ({counts[family]})" if counts.get(family) else "")
+            lines.append(line(label, sum(row.values())))
+            for name in sorted(row, key=lambda n: -row[n]):
+                lines.append(line(f"    {name}", row[name]))
+        return "\n".join(lines)
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all other threads every *interval*
+    seconds on a daemon thread; ``stacks`` counts folded stacks
+    (``"outer;inner;leaf"``), each sample worth *interval* seconds.
+    Use as a context manager or with :meth:`start` / :meth:`stop`.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    names.append(self._frame_name(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def start(self) -> "StackSampler":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gfw-stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StackSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def top(self, n: int = 10) -> list[tuple[str, float]]:
+        """The *n* functions with the most self time: ``(name, seconds)``."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rpartition(";")[2]] += count
+        return [(name, count * self.interval) for name, count in leaves.most_common(n)]
+
+
+def speedscope(profiler: Optional[Profiler] = None, sampler: Optional[StackSampler] = None, name: str = "gfw") -> dict:
+    """
+    A speedscope document with a "requests" profile (endpoint family →
+    phase, weighted by seconds) and, if a *sampler* is given, a "stacks"
+    profile of the sampled Python stacks.
+    """
+    frames: list[dict] = []
+    index: dict[str, int] = {}
+
+    def frame(label: str) -> int:
+        if label not in index:
+            index[label] = len(frames)
+            frames.append({"name": label})
+        return index[label]
+
+    def profile(title: str, weighted: list[tuple[list[str], float]]) -> dict:
+        samples = [[frame(label) for label in stack] for stack, _ in weighted]
+        weights = [seconds for _, seconds in weighted]
+        return {
+            "type": "sampled",
+            "name": title,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }
+
+    profiles = []
+    if profiler is not None:
+        weighted = [
+            ([family, phase], seconds)
+            for family, row in profiler.breakdown().items()
+            for phase, seconds in row.items()
+        ]
+        profiles.append(profile("requests", weighted))
+    if sampler is not None:
+        weighted = [(stack.split(";"), count * sampler.interval) for stack, count in sampler.stacks.items()]
+        profiles.append(profile("stacks", weighted))
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "shared": {"frames": frames},
+        "profiles": profiles,
+        "name": name,
+        "activeProfileIndex": 0,
+        "exporter": "ais-global-fishing",
+    }
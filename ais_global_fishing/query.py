@@ -0,0 +1,402 @@
+"""
+query.py
+
+SQL over locally held API results.
+
+Questions such as "which vessels visited Spanish ports last quarter, by
+port" are one ``GROUP BY`` away once the data sits in a table, yet answering
+them from JSON pages means loading every record into Python and filtering
+with loops.  :class:`QueryStore` flattens vessel identities, events, port
+visits, trips and track points into typed, indexed SQLite tables, so that
+filters, joins and aggregations run inside the database engine: a query on
+``country = 'ESP'`` reads only the matching rows through the index and only
+the result rows are turned into Python objects.
+
+Each row also keeps the complete API record in a ``body`` column, reachable
+with SQLite's JSON functions (``json_extract(body, '$.port_visit.confidence')``)
+for fields without a column of their own.
+
+Tables
+------
+``vessels``       id, ssvid, imo, name, callsign, flag, geartype, shiptype
+``events``        id, type, vessel_id, vessel_name, flag, start, end, lat, lon,
+                  other_vessel_id (the encountered vessel)
+``port_visits``   id, vessel_id, start, end, port_id, port_name, country,
+                  lat, lon, duration_hours
+``trips``         id, vessel_id, departure, arrival, from_port_id,
+                  from_port_name, from_country, to_port_id, to_port_name,
+                  to_country
+``track_points``  vessel_id, timestamp, lat, lon, speed, course
+
+Times are ISO 8601 UTC strings (``2024-05-01T12:00:00Z``), which compare
+correctly as text: ``WHERE start >= '2024-05-01'``.
+
+Example
+-------
+>>> store = QueryStore("lake.sqlite")
+>>> store.add("port_visits", client.get_port_visits(start, end))
+>>> store.load_jobs(JobQueue("port_visits.sqlite"))
+>>> store.query(
+...     "SELECT port_name, COUNT(*) AS visits FROM port_visits "
+...     "WHERE country = ? GROUP BY port_name ORDER BY visits DESC", ("ESP",))
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+from urllib.parse import unquote
+
+from ._sqlite import connect, transaction
+from .records import event_fields, first_of, get_path, page_records, vessel_id_of
+from .timewindow import to_utc
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vessels (
+    id          TEXT PRIMARY KEY,
+    ssvid       TEXT,
+    imo         TEXT,
+    name        TEXT,
+    callsign    TEXT,
+    flag        TEXT,
+    geartype    TEXT,
+    shiptype    TEXT,
+    body        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vessels_flag ON vessels (flag);
+CREATE INDEX IF NOT EXISTS vessels_ssvid ON vessels (ssvid);
+
+CREATE TABLE IF NOT EXISTS events (
+    id              TEXT PRIMARY KEY,
+    type            TEXT,
+    vessel_id       TEXT,
+    vessel_name     TEXT,
+    flag            TEXT,
+    start           TEXT,
+    end             TEXT,
+    lat             REAL,
+    lon             REAL,
+    other_vessel_id TEXT,
+    body            TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_vessel ON events (vessel_id, start);
+CREATE INDEX IF NOT EXISTS events_type ON events (type, start);
+CREATE INDEX IF NOT EXISTS events_other ON events (other_vessel_id);
+
+CREATE TABLE IF NOT EXISTS port_visits (
+    id              TEXT PRIMARY KEY,
+    vessel_id       TEXT,
+    start           TEXT,
+    end             TEXT,
+    port_id         TEXT,
+    port_name       TEXT,
+    country         TEXT,
+    lat             REAL,
+    lon             REAL,
+    duration_hours  REAL,
+    body            TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS port_visits_vessel ON port_visits (vessel_id, start);
+CREATE INDEX IF NOT EXISTS port_visits_country ON port_visits (country, start);
+CREATE INDEX IF NOT EXISTS port_visits_port ON port_visits (port_id, start);
+
+CREATE TABLE IF NOT EXISTS trips (
+    id              TEXT PRIMARY KEY,
+    vessel_id       TEXT,
+    departure       TEXT,
+    arrival         TEXT,
+    from_port_id    TEXT,
+    from_port_name  TEXT,
+    from_country    TEXT,
+    to_port_id      TEXT,
+    to_port_name    TEXT,
+    to_country      TEXT,
+    body            TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trips_vessel ON trips (vessel_id, departure);
+CREATE INDEX IF NOT EXISTS trips_to_country ON trips (to_country, arrival);
+
+CREATE TABLE IF NOT EXISTS track_points (
+    vessel_id   TEXT NOT NULL,
+    timestamp   TEXT NOT NULL,
+    lat         REAL NOT NULL,
+    lon         REAL NOT NULL,
+    speed       REAL,
+    course      REAL,
+    PRIMARY KEY (vessel_id, timestamp)
+) WITHOUT ROWID;
+"""
+
+TABLES = ("vessels", "events", "port_visits", "trips", "track_points")
+
+# Request path of a stored job unit -> table its records belong to.
+_ROUTES = [
+    (re.compile(r"^/vessels(/search)?$"), "vessels"),
+    (re.compile(r"^/vessels/(?P<vid>[^/]+)/track$"), "track_points"),
+    (re.compile(r"^/vessels/(?P<vid>[^/]+)/events$"), "events"),
+    (re.compile(r"^/vessels/(?P<vid>[^/]+)/trips$"), "trips"),
+    (re.compile(r"^/vessels/(?P<vid>[^/]+)$"), "vessels"),
+    (re.compile(r"^/events/[a-z_]+$"), "events"),
+    (re.compile(r"^/ports/visits$"), "port_visits"),
+]
+
+
+def _iso(value: Any) -> Optional[str]:
+    """Normalise an API timestamp to ``YYYY-MM-DDTHH:MM:SSZ``."""
+    if not value:
+        return None
+    if isinstance(value, str) and len(value) >= 20 and value[10] == "T" and value.endswith("Z"):
+        return value[:19] + "Z"  # the common case: already UTC
+    return to_utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _body(rec: dict) -> str:
+    return json.dumps(rec, separators=(",", ":"), ensure_ascii=False)
+
+
+def _name_of(entries: Any) -> Any:
+    """``name`` of the first element of a ``[{"name": ...}]`` list, or the value itself."""
+    if isinstance(entries, list):
+        entries = entries[0] if entries else None
+    return entries.get("name") if isinstance(entries, dict) else entries
+
+
+def _vessel_row(rec: dict, vessel_id: Optional[str]) -> tuple:
+    info = rec
+    for key in ("selfReportedInfo", "registryInfo"):
+        if isinstance(rec.get(key), list) and rec[key]:
+            info = rec[key][0]
+            break
+    combined = rec.get("combinedSourcesInfo")
+    combined = combined[0] if isinstance(combined, list) and combined else {}
+    return (
+        rec.get("id") or info.get("id") or vessel_id,
+        first_of(info, "ssvid", "mmsi"),
+        info.get("imo"),
+        first_of(info, "shipname", "name"),
+        info.get("callsign"),
+        first_of(info, "flag", "flagState"),
+        _name_of(first_of(combined, "geartypes", default=info.get("geartypes"))) or rec.get("geartype"),
+        _name_of(combined.get("shiptypes")) or first_of(rec, "shiptype", "vesselType"),
+        _body(rec),
+    )
+
+
+def _event_row(rec: dict, vessel_id: Optional[str]) -> tuple:
+    return (
+        rec.get("id"),
+        rec.get("type"),
+        vessel_id_of(rec) or vessel_id,
+        get_path(rec, "vessel.name"),
+        get_path(rec, "vessel.flag"),
+        _iso(first_of(rec, "start", "startTime")),
+        _iso(first_of(rec, "end", "endTime")),
+        get_path(rec, "position.lat"),
+        get_path(rec, "position.lon"),
+        get_path(rec, "encounter.vessel.id"),
+        _body(rec),
+    )
+
+
+def _port_visit_row(rec: dict, vessel_id: Optional[str]) -> tuple:
+    fields = event_fields(rec)
+    position = rec.get("position")
+    position = position if isinstance(position, dict) else {}
+    return (
+        rec.get("id"),
+        fields.vessel_id or vessel_id,
+        _iso(fields.start),
+        _iso(fields.end),
+        fields.port_id,
+        fields.port_name,
+        fields.port_flag,
+        position.get("lat"),
+        position.get("lon"),
+        first_of(rec, "port_visit.durationHrs", "durationHrs"),
+        _body(rec),
+    )
+
+
+def _trip_row(rec: dict, vessel_id: Optional[str]) -> tuple:
+    return (
+        rec.get("id"),
+        vessel_id_of(rec) or vessel_id,
+        _iso(rec.get("departureTime")),
+        _iso(rec.get("arrivalTime")),
+        rec.get("fromPortId"),
+        rec.get("fromPortName"),
+        rec.get("fromCountry"),
+        rec.get("toPortId"),
+        rec.get("toPortName"),
+        rec.get("toCountry"),
+        _body(rec),
+    )
+
+
+def _point_row(feature: dict, vessel_id: Optional[str]) -> Optional[tuple]:
+    props = feature.get("properties") or {}
+    coords = get_path(feature, "geometry.coordinates")
+    vessel_id = vessel_id or feature.get("vesselId")  # per-vessel CLI exports
+    if not coords or not props.get("timestamp") or not vessel_id:
+        return None
+    return (vessel_id, _iso(props["timestamp"]), coords[1], coords[0], props.get("speed"), props.get("course"))
+
+
+_ROWS: dict[str, tuple[Callable[[dict, Optional[str]], Optional[tuple]], int]] = {
+    "vessels": (_vessel_row, 9),
+    "events": (_event_row, 11),
+    "port_visits": (_port_visit_row, 11),
+    "trips": (_trip_row, 11),
+    "track_points": (_point_row, 6),
+}
+
+
+class QueryStore:
+    """
+    SQLite database of flattened API records, queried with plain SQL.
+
+    Records are upserted by id (track points by vessel and timestamp), so
+    loading overlapping pages – or the same job results twice – never
+    duplicates rows.
+
+    Parameters
+    ----------
+    path
+        Database file (created if missing); ``":memory:"`` for a throw-away
+        store.
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db = connect(self.path, _SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "QueryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+    def add(self, table: str, pages: Any, vessel_id: Optional[str] = None) -> int:
+        """
+        Flatten the records of one API page (or a list of pages) into
+        *table* and return the number of rows written.
+
+        *vessel_id* fills in the vessel of records that do not name it –
+        track points and the results of per-vessel endpoints.
+        """
+        if table not in _ROWS:
+            raise ValueError(f"unknown table {table!r}; expected one of {', '.join(TABLES)}")
+        if isinstance(pages, dict):
+            pages = [pages]
+        to_row, _ = _ROWS[table]
+        rows = [
+            row
+            for page in pages
+            for rec in page_records(page)
+            if isinstance(rec, dict) and (row := to_row(rec, vessel_id)) is not None
+        ]
+        self._insert({table: rows})
+        return len(rows)
+
+    def _insert(self, rows: dict[str, list[tuple]]) -> None:
+        """Write the *rows* of every table in one transaction."""
+        with self._lock:
+            with transaction(self._db):
+                for table, table_rows in rows.items():
+                    placeholders = ", ".join("?" * _ROWS[table][1])
+                    self._db.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", table_rows)
+
+    def add_track(self, track: Any, vessel_id: Optional[str] = None) -> int:
+        """
+        Store track points from a ``get_track`` response or an array-backed
+        :class:`~ais_global_fishing.tracks.Track`.
+        """
+        if hasattr(track, "times"):
+            vessel_id = vessel_id or track.vessel_id
+            rows = [
+                (
+                    vessel_id,
+                    datetime.fromtimestamp(int(ts), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    float(lat),
+                    float(lon),
+                    None if sp != sp else float(sp),
+                    None if co != co else float(co),
+                )
+                for ts, lat, lon, sp, co in zip(track.times, track.lat, track.lon, track.speed, track.course)
+            ]
+            self._insert({"track_points": rows})
+            return len(rows)
+        return self.add("track_points", track, vessel_id)
+
+    def load_jobs(self, queue) -> dict[str, int]:
+        """
+        Load every finished unit of a :class:`~ais_global_fishing.jobs.JobQueue`
+        into the table matching its request path; returns rows per table.
+        Units of other endpoints (e.g. ``/risk``) are skipped.
+        """
+        counts: dict[str, int] = {}
+        for unit, result in queue.results():
+            for pattern, table in _ROUTES:
+                match = pattern.match(unit.path)
+                if match:
+                    vid = match.groupdict().get("vid")
+                    counts[table] = counts.get(table, 0) + self.add(table, result, unquote(vid) if vid else None)
+                    break
+        return counts
+
+    def load_activity(self, store) -> dict[str, int]:
+        """
+        Load the events and track points held by an
+        :class:`~ais_global_fishing.activity.ActivityStore` in one
+        transaction.
+        """
+        rows: dict[str, list[tuple]] = {"events": [], "track_points": []}
+        for vessel_id, kind, record in store.iter_records():
+            table = "track_points" if kind.startswith("track:") else "events"
+            if isinstance(record, dict) and (row := _ROWS[table][0](record, vessel_id)) is not None:
+                rows[table].append(row)
+        self._insert(rows)
+        return {table: len(table_rows) for table, table_rows in rows.items()}
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def iter_query(self, sql: str, params: Iterable[Any] = (), batch_size: int = 1000) -> Iterator[dict]:
+        """Run *sql* and stream the result rows as dicts, *batch_size* at a time."""
+        with self._lock:
+            cursor = self._db.execute(sql, tuple(params))
+            names = [col[0] for col in cursor.description or ()]
+        while True:
+            with self._lock:
+                batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            for row in batch:
+                yield dict(zip(names, row))
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> list[dict]:
+        """Run *sql* and return all result rows as dicts."""
+        return list(self.iter_query(sql, params))
+
+    def explain(self, sql: str, params: Iterable[Any] = ()) -> list[str]:
+        """SQLite's query plan for *sql* – shows which filters use an index."""
+        with self._lock:
+            rows = self._db.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params)).fetchall()
+        return [row[-1] for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Number of rows per table."""
+        with self._lock:
+            return {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
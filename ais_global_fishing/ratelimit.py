@@ -0,0 +1,107 @@
+"""
+ratelimit.py
+
+Token-bucket request quota shared by the components that pace API calls
+(the watch-list scheduler, the mock gateway, …).
+
+A bucket holds up to *burst* tokens (default: one second's worth, but at
+least one) and refills at *rate* tokens per second; every request spends
+one.  ``rate=None`` means unlimited.
+
+Example
+-------
+>>> bucket = TokenBucket(rate=120 / 60, burst=20)   # 120 requests / minute
+>>> bucket.acquire()                                # blocks until a token is free
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+def _capacity(rate: Optional[float], burst: Optional[float]) -> float:
+    """Validate *rate* and *burst* and return the bucket capacity."""
+    if rate is not None and rate < 0:
+        raise ValueError("'rate' must not be negative")
+    if burst is not None and burst < 1:
+        raise ValueError("'burst' must be >= 1, or no request could ever be served")
+    return burst if burst is not None else max(1.0, rate or 0)
+
+
+class _Bucket:
+    """
+    :meth:`take` and :meth:`acquire` of a token bucket over its own
+    ``_take`` (spend *n* tokens or return the seconds to wait), shared by
+    :class:`TokenBucket` and
+    :class:`~ais_global_fishing.coordination.SharedBucket`.
+    """
+
+    rate: Optional[float]
+    capacity: float
+
+    def _take(self, n: float) -> Optional[float]:
+        raise NotImplementedError
+
+    def take(self, n: float = 1) -> Optional[float]:
+        """Spend *n* tokens; return ``None`` on success or the seconds to wait."""
+        if not self.rate:
+            return None
+        if n > self.capacity:
+            raise ValueError(f"cannot take {n} tokens from a bucket of capacity {self.capacity}")
+        return self._take(n)
+
+    def acquire(self, n: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until *n* tokens are spent; ``False`` if *timeout* ran out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.take(n)
+            if wait is None:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class TokenBucket(_Bucket):
+    """Thread-safe token bucket."""
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = _capacity(rate, burst)
+        self.rate = rate
+        self.tokens = self.capacity
+        self._clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens that could be spent right now (``inf`` when unlimited)."""
+        if not self.rate:
+            return float("inf")
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def _take(self, n: float) -> Optional[float]:
+        with self._lock:
+            self._refill()
+            if self.tokens >= n:
+                self.tokens -= n
+                return None
+            return (n - self.tokens) / self.rate
@@ -0,0 +1,229 @@
+"""
+records.py
+
+Small helpers for pulling individual records out of Gateway v3 responses.
+
+List endpoints (``/events``, ``/ports/visits``, ``/vessels/search`` …) wrap
+their rows in an ``entries`` array, while ``/track`` answers with a GeoJSON
+``FeatureCollection``.  Callers that only care about the rows use
+:func:`page_records` instead of special-casing every endpoint.
+
+Field spellings also vary (``vessel.id`` in v3 events, ``vesselId`` in
+trips and older exports); :func:`first_of` and :func:`vessel_id_of` hide
+that, and :func:`event_fields` reads the fields most analyses need from
+an event, port visit or trip at once.  :func:`merge_pages` joins the pages of a request that was split
+into several (:class:`PartialResultError` reports the parts that failed),
+and :func:`project_page` keeps only selected fields.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, NamedTuple, Optional
+
+RECORD_KEYS = ("entries", "features")
+
+# Spellings tried by :func:`event_fields` for records not in the plain v3
+# shape.  The port of a visit is its intermediate anchorage.
+_VESSEL = ("vessel.id", "vesselId", "vessel_id", "vessel1Id")
+_START = ("start", "startTime", "departureTime")
+_END = ("end", "endTime", "arrivalTime")
+_PORT_ID = ("port_visit.intermediateAnchorage.id", "portId", "toPortId")
+_PORT_NAME = ("port_visit.intermediateAnchorage.name", "portName", "toPortName")
+_PORT_FLAG = ("port_visit.intermediateAnchorage.flag", "country", "toCountry")
+_OTHER_VESSEL = ("encounter.vessel.id", "transshipment.vessel.id", "vessel2Id", "otherVesselId")
+
+
+def page_records(page: Any) -> list:
+    """
+    Return the list of records held by a single API response *page*.
+
+    * ``{"entries": [...]}`` / ``{"features": [...]}`` → the inner list
+    * a bare list → itself
+    * any other non-empty object → a one-element list
+    """
+    if isinstance(page, list):
+        return page
+    if isinstance(page, dict):
+        for key in RECORD_KEYS:
+            rows = page.get(key)
+            if isinstance(rows, list):
+                return rows
+    return [page] if page else []
+
+
+def get_path(record: Any, path: str, default: Any = None) -> Any:
+    """
+    Look up a dotted *path* (``"vessel.id"``) in nested dicts.
+
+    Returns *default* as soon as a level is missing or not a dict.
+    """
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return default
+        value = value.get(part)
+        if value is None:
+            return default
+    return value
+
+
+def first_of(record: Any, *paths: str, default: Any = None) -> Any:
+    """Value of the first of *paths* present in *record*."""
+    for path in paths:
+        value = get_path(record, path)
+        if value is not None:
+            return value
+    return default
+
+
+def vessel_id_of(record: Any) -> Any:
+    """Vessel id of an event / port-visit / trip record, in any of its spellings."""
+    return first_of(record, "vessel.id", "vesselId", "vessel_id")
+
+
+class EventFields(NamedTuple):
+    """What :func:`event_fields` reads from a record (``None`` where absent)."""
+
+    vessel_id: Any
+    start: Any
+    end: Any
+    port_id: Any
+    port_name: Any
+    port_flag: Any
+    other_vessel_id: Any
+
+
+def event_fields(record: dict) -> EventFields:
+    """
+    Vessel, times, port (of a port visit, or the arrival port of a trip)
+    and other vessel (of an encounter) of one record.
+
+    Plain Gateway v3 events and port visits – the bulk of every page – are
+    read with direct lookups; other spellings by walking their paths.
+    """
+    vessel = record.get("vessel")
+    visit = record.get("port_visit")
+    anchorage = visit.get("intermediateAnchorage") if isinstance(visit, dict) else None
+    if isinstance(vessel, dict) and "start" in record and (visit is None or isinstance(anchorage, dict)):
+        if anchorage is not None:
+            port = anchorage.get("id"), anchorage.get("name"), anchorage.get("flag")
+        else:
+            port = record.get("portId"), record.get("portName"), record.get("country")
+        encounter = record.get("encounter")
+        other = encounter.get("vessel") if isinstance(encounter, dict) else None
+        return EventFields(
+            vessel.get("id"), record["start"], record.get("end"), *port,
+            other.get("id") if isinstance(other, dict) else first_of(record, *_OTHER_VESSEL),
+        )
+    return EventFields(
+        first_of(record, *_VESSEL),
+        first_of(record, *_START),
+        first_of(record, *_END),
+        first_of(record, *_PORT_ID),
+        first_of(record, *_PORT_NAME),
+        first_of(record, *_PORT_FLAG),
+        first_of(record, *_OTHER_VESSEL),
+    )
+
+
+def distinct_vessel_ids(items: Iterable[Any]) -> list[str]:
+    """
+    Distinct vessel ids, in first-seen order, from a mix of plain id strings,
+    records and API pages (e.g. ``get_port_visits`` results).
+    """
+    seen: dict[str, None] = {}
+    for item in items:
+        if isinstance(item, str):
+            seen.setdefault(item)
+            continue
+        for rec in page_records(item):
+            vid = rec if isinstance(rec, str) else vessel_id_of(rec)
+            if vid:
+                seen.setdefault(vid)
+    return list(seen)
+
+
+class PartialResultError(Exception):
+    """
+    Some parts of a split request failed.  ``page`` is the merged page of
+    the parts that succeeded and ``errors`` lists the failed ones as
+    ``[{"params": …, "error": …}]``.
+    """
+
+    def __init__(self, page: dict, errors: list[dict]):
+        super().__init__(f"{len(errors)} of the split requests failed: {errors[0]['error']}")
+        self.page = page
+        self.errors = errors
+
+
+def merge_pages(pages: Iterable[Any]) -> dict:
+    """
+    Merge list responses into one ``{"entries": [...], "total": n}`` page.
+
+    Entries are de-duplicated by ``id`` (an encounter shows up in the page
+    of each of its two vessels) and ordered by start time.
+    """
+    seen: set = set()
+    entries = []
+    for page in pages:
+        for rec in page_records(page):
+            rid = rec.get("id") if isinstance(rec, dict) else None
+            if rid is not None:
+                if rid in seen:
+                    continue
+                seen.add(rid)
+            entries.append(rec)
+    entries.sort(key=lambda rec: str(first_of(rec, "start", "startTime", "timestamp", default="")))
+    return {"entries": entries, "total": len(entries)}
+
+
+def field_tree(fields: Iterable[str]) -> dict:
+    """
+    Compile dotted field paths into a nested selection tree.
+
+    ``["id", "selfReportedInfo.shipname", "selfReportedInfo.flag"]`` →
+    ``{"id": None, "selfReportedInfo": {"shipname": None, "flag": None}}``
+    where ``None`` keeps the whole value.  A path also covers everything
+    below it.
+    """
+    tree: dict = {}
+    for path in fields:
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            child = node.setdefault(part, {})
+            if child is None:  # an ancestor is kept whole
+                break
+            node = child
+        else:
+            node[leaf] = None
+    return tree
+
+
+def project(value: Any, tree: Optional[dict]) -> Any:
+    """
+    Copy of *value* reduced to the fields of a :func:`field_tree`.  Lists
+    are projected element-wise, so ``registryInfo.shipname`` selects the
+    name of every registry entry.
+    """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+def project_page(page: Any, fields: Iterable[str]) -> Any:
+    """
+    Reduce every record of an API response to *fields* (dotted paths);
+    paging keys such as ``total`` and ``nextOffset`` are kept.
+    """
+    tree = field_tree(fields)
+    if isinstance(page, dict):
+        for key in RECORD_KEYS:
+            rows = page.get(key)
+            if isinstance(rows, list):
+                return {**page, key: [project(row, tree) for row in rows]}
+    return project(page, tree)
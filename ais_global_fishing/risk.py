@@ -0,0 +1,196 @@
+"""
+risk.py
+
+Bulk risk screening on top of the per-vessel ``/vessels/{id}/risk`` endpoint.
+
+:class:`RiskScreener` takes vessel ids – or whole API pages such as the
+result of ``get_port_visits`` – de-duplicates them, serves vessels scored
+recently from a :class:`~ais_global_fishing.cache.TTLCache` and fetches the
+rest concurrently under a request-rate limit.  Results are streamed back as
+:class:`RiskRow` objects as soon as they arrive, and :func:`write_table`
+renders them as CSV or JSON Lines.
+
+Example
+-------
+>>> visits = client.get_port_visits("2024-05-01", "2024-05-02")
+>>> screener = RiskScreener(client, workers=8, rps=20)
+>>> with open("screening.csv", "w") as out:
+...     write_table(screener.screen([visits]), out)
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+from .cache import TTLCache
+from .ratelimit import TokenBucket
+from .records import distinct_vessel_ids
+
+TABLE_COLUMNS = ("vesselId", "score", "iuuListed", "cached", "error")
+
+
+@dataclass(frozen=True)
+class RiskRow:
+    """Risk screening result of one vessel."""
+
+    vessel_id: str
+    score: Optional[float] = None
+    iuu_listed: Optional[bool] = None
+    indicators: dict = field(default_factory=dict)
+    cached: bool = False
+    error: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, vessel_id: str, response: dict, cached: bool = False) -> "RiskRow":
+        return cls(
+            vessel_id,
+            response.get("score"),
+            response.get("iuuListed"),
+            response.get("indicators") or {},
+            cached,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Flat table row: the fixed columns followed by the indicators."""
+        row = {
+            "vesselId": self.vessel_id,
+            "score": self.score,
+            "iuuListed": self.iuu_listed,
+            "cached": self.cached,
+            "error": self.error,
+        }
+        row.update(self.indicators)
+        return row
+
+
+@dataclass
+class ScreeningStats:
+    vessels: int = 0
+    cache_hits: int = 0
+    requests: int = 0
+    errors: int = 0
+
+
+class RiskScreener:
+    """
+    Concurrent, cached bulk wrapper around :meth:`GFWClient.get_risk`.
+
+    Parameters
+    ----------
+    client
+        The :class:`~ais_global_fishing.GFWClient` to query.
+    cache
+        Cache of risk responses by vessel id; by default a 24-hour
+        :class:`~ais_global_fishing.cache.TTLCache`.  Share one cache between
+        screeners (or runs of a long-lived service) to skip repeats.
+    workers
+        Requests in flight at once.
+    rps
+        Request-rate limit (requests per second); ``None`` for none.
+    bucket
+        Share an existing :class:`~ais_global_fishing.ratelimit.TokenBucket`
+        instead of creating one from *rps*.
+
+    Failed lookups (no permission, unknown vessel, …) are returned as rows
+    with :attr:`RiskRow.error` set and are not cached.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        cache: Optional[TTLCache] = None,
+        workers: int = 8,
+        rps: Optional[float] = None,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.client = client
+        self.cache = cache if cache is not None else TTLCache(timedelta(hours=24))
+        self.workers = max(1, workers)
+        self.bucket = bucket or TokenBucket(rps, burst=max(1.0, rps or 0))
+        self.stats = ScreeningStats()
+
+    def _fetch(self, vessel_id: str) -> RiskRow:
+        self.bucket.acquire()
+        try:
+            response = self.client.get_risk(vessel_id)
+        except Exception as exc:
+            return RiskRow(vessel_id, error=str(exc) or type(exc).__name__)
+        self.cache.set(vessel_id, response)
+        return RiskRow.from_response(vessel_id, response)
+
+    def screen(self, vessels: Iterable[Any]) -> Iterator[RiskRow]:
+        """
+        Yield one :class:`RiskRow` per distinct vessel.
+
+        *vessels* may mix vessel-id strings, records and API pages.  Cached
+        vessels come first, the rest in completion order.
+        """
+        misses = []
+        for vessel_id in distinct_vessel_ids(vessels):
+            self.stats.vessels += 1
+            response = self.cache.get(vessel_id)
+            if response is None:
+                misses.append(vessel_id)
+                continue
+            self.stats.cache_hits += 1
+            yield RiskRow.from_response(vessel_id, response, cached=True)
+
+        todo = iter(misses)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = set()
+            while True:
+                # Bounded window: memory is independent of the number of vessels.
+                for vessel_id in todo:
+                    pending.add(pool.submit(self._fetch, vessel_id))
+                    if len(pending) >= 2 * self.workers:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = future.result()
+                    self.stats.requests += 1
+                    self.stats.errors += row.error is not None
+                    yield row
+
+
+def write_table(rows: Iterable[RiskRow], out: TextIO, fmt: str = "csv") -> int:
+    """
+    Write *rows* to *out* as ``csv`` or ``jsonl`` while they stream in; return
+    the row count.
+
+    CSV columns are :data:`TABLE_COLUMNS` followed by the indicator names of
+    the first scored row.
+    """
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"unsupported table format: {fmt!r}")
+    count = 0
+    writer = None
+    held: list[dict] = []  # error rows seen before the header is known
+    for row in rows:
+        count += 1
+        record = row.as_dict()
+        if fmt == "jsonl":
+            out.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        elif writer is None and row.error is not None:
+            held.append(record)
+            continue
+        else:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=[*TABLE_COLUMNS, *row.indicators], extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(held)
+            writer.writerow(record)
+        out.flush()
+    if held and writer is None:
+        writer = csv.DictWriter(out, fieldnames=list(TABLE_COLUMNS), extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(held)
+        out.flush()
+    return count
@@ -0,0 +1,305 @@
+"""
+timeline.py
+
+Per-vessel activity timelines built from port-visit, trip and event pages.
+
+Records are flattened once into column arrays (one row per visit / trip /
+event) and everything after that – timestamp parsing, sorting, durations,
+port-to-port legs, overlap and gap detection – runs as numpy array
+operations over all vessels at once instead of per-record Python loops.
+
+Requires ``numpy`` (``pip install "ais-global-fishing[analytics]"``).
+
+Example
+-------
+>>> visits = client.get_port_visits(start, end, vessel_ids=fleet)
+>>> tl = build_timeline([visits])
+>>> tl.duration_hours()            # one float per visit
+>>> legs = tl.port_legs()          # consecutive visits → port-to-port legs
+>>> tl.overlaps(), tl.gaps(timedelta(days=30))
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Iterable, Optional
+
+from ._numpy import np
+from .records import event_fields, page_records
+from .timewindow import to_utc
+
+PORT_VISIT = "port_visit"
+TRIP = "trip"
+
+# Field paths tried in order for records not in the plain v3 shape.
+_COLUMNS = ("vid", "start", "end", "kind", "id", "pid", "pname", "country", "oid", "oname")
+
+
+def _parse_time(value: str) -> np.datetime64:
+    """One ISO 8601 string, converted to UTC; ``NaT`` if it does not parse."""
+    try:
+        return np.datetime64(to_utc(value).replace(tzinfo=None), "s")
+    except (TypeError, ValueError):
+        return np.datetime64("NaT", "s")
+
+
+def parse_times(values: Iterable[Optional[str]]) -> np.ndarray:
+    """
+    Parse ISO 8601 UTC strings into a ``datetime64[s]`` array in one pass.
+
+    The API always answers in UTC (``…Z`` / ``….000Z``); such strings are cut
+    to ``YYYY-MM-DDTHH:MM:SS`` and handed to numpy's C parser.  Missing,
+    empty and malformed values become ``NaT``: if the batch does not parse,
+    it is parsed again value by value.  The rare value carrying an explicit
+    ``±HH:MM`` offset is converted individually.
+    """
+    raw = np.asarray([v if isinstance(v, str) and v else "NaT" for v in values], dtype=str)
+    if raw.size == 0:
+        return np.empty(0, dtype="datetime64[s]")
+    try:
+        parsed = raw.astype("U19").astype("datetime64[s]")
+    except ValueError:
+        return np.array([_parse_time(str(v)) for v in raw], dtype="datetime64[s]")
+
+    offset = (np.char.rfind(raw, "+") >= 19) | (np.char.rfind(raw, "-") >= 19)
+    for idx in np.flatnonzero(offset):
+        parsed[idx] = _parse_time(str(raw[idx]))
+    return parsed
+
+
+def objects(values: Iterable[Any]) -> np.ndarray:
+    """1-d ``object`` array of *values* (numpy would nest sequences or coerce to str)."""
+    values = list(values)
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def _kind_of(record: dict, default: Optional[str]) -> str:
+    if default:
+        return default
+    if "port_visit" in record or "portName" in record:
+        return PORT_VISIT
+    if "departureTime" in record:
+        return TRIP
+    return str(record.get("type") or "event").lower()
+
+
+def _flatten(rec: dict, kind: Optional[str], vessel_id: Optional[str]) -> tuple:
+    """One timeline row (in :data:`_COLUMNS` order) from a single record."""
+    fields = event_fields(rec)
+    return (
+        fields.vessel_id or vessel_id,
+        fields.start,
+        fields.end,
+        _kind_of(rec, kind),
+        rec.get("id"),
+        fields.port_id,
+        fields.port_name,
+        fields.port_flag,
+        rec.get("fromPortId"),
+        rec.get("fromPortName"),
+    )
+
+
+@dataclass
+class Legs:
+    """Port-to-port legs (columnar), one row per leg."""
+
+    vessel_ids: np.ndarray
+    vessel: np.ndarray
+    origin_id: np.ndarray
+    origin_name: np.ndarray
+    destination_id: np.ndarray
+    destination_name: np.ndarray
+    depart: np.ndarray
+    arrive: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.vessel)
+
+    def duration_hours(self) -> np.ndarray:
+        return (self.arrive - self.depart) / np.timedelta64(1, "h")
+
+    def to_records(self) -> list[dict]:
+        return [
+            {
+                "vesselId": self.vessel_ids[v],
+                "fromPortId": oid,
+                "fromPortName": oname,
+                "toPortId": did,
+                "toPortName": dname,
+                "departureTime": str(dep) + "Z",
+                "arrivalTime": str(arr) + "Z",
+            }
+            for v, oid, oname, did, dname, dep, arr in zip(
+                self.vessel, self.origin_id, self.origin_name, self.destination_id,
+                self.destination_name, self.depart, self.arrive,
+            )
+        ]
+
+
+@dataclass
+class Timeline:
+    """
+    Column-oriented activity intervals for many vessels.
+
+    Rows are sorted by vessel, then start time.  ``vessel`` holds integer
+    codes into ``vessel_ids``.  For port visits ``port_*`` / ``country``
+    describe the port; for trips they describe the destination and
+    ``origin_*`` the departure port.
+    """
+
+    vessel_ids: np.ndarray
+    vessel: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    kind: np.ndarray
+    record_id: np.ndarray
+    port_id: np.ndarray
+    port_name: np.ndarray
+    country: np.ndarray
+    origin_id: np.ndarray
+    origin_name: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.vessel)
+
+    # ------------------------------------------------------------------ #
+    # Selection
+    # ------------------------------------------------------------------ #
+    def take(self, mask_or_index: np.ndarray) -> "Timeline":
+        """Sub-timeline of the selected rows (order preserved)."""
+        return Timeline(
+            self.vessel_ids,
+            *(getattr(self, name)[mask_or_index] for name in _ROW_COLUMNS),
+        )
+
+    def of_kind(self, kind: str) -> "Timeline":
+        return self.take(self.kind == kind)
+
+    def for_vessel(self, vessel_id: str) -> "Timeline":
+        codes = np.flatnonzero(self.vessel_ids == vessel_id)
+        if codes.size == 0:
+            return self.take(np.zeros(len(self), dtype=bool))
+        lo, hi = np.searchsorted(self.vessel, [codes[0], codes[0] + 1])
+        return self.take(slice(lo, hi))
+
+    def vessel_bounds(self) -> dict[str, tuple[int, int]]:
+        """``vessel_id -> (first_row, end_row)`` for every vessel present."""
+        codes, first = np.unique(self.vessel, return_index=True)
+        last = np.append(first[1:], len(self))
+        return {self.vessel_ids[c]: (int(a), int(b)) for c, a, b in zip(codes, first, last)}
+
+    # ------------------------------------------------------------------ #
+    # Derived quantities
+    # ------------------------------------------------------------------ #
+    def duration_hours(self) -> np.ndarray:
+        """Length of every interval in hours (``nan`` when an end is missing)."""
+        return (self.end - self.start) / np.timedelta64(1, "h")
+
+    def _same_vessel(self) -> np.ndarray:
+        return self.vessel[1:] == self.vessel[:-1]
+
+    def overlaps(self) -> np.ndarray:
+        """
+        Row indices *i* whose interval overlaps the next one of the same
+        vessel (``start[i+1] < end[i]``) – usually duplicated or conflicting
+        records.
+        """
+        return np.flatnonzero(self._same_vessel() & (self.start[1:] < self.end[:-1]))
+
+    def gaps(self, min_gap: timedelta) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Silences longer than *min_gap* between consecutive intervals of a vessel.
+
+        Returns ``(rows, gap_hours)``: the row *i* after which each gap
+        starts and its length in hours.
+        """
+        between = self.start[1:] - self.end[:-1]
+        mask = self._same_vessel() & (between > np.timedelta64(min_gap))
+        rows = np.flatnonzero(mask)
+        return rows, between[rows] / np.timedelta64(1, "h")
+
+    def port_legs(self) -> Legs:
+        """
+        Port-to-port legs from consecutive port visits of each vessel.
+
+        A leg departs at the end of one visit and arrives at the start of
+        the next one.
+        """
+        visits = self.of_kind(PORT_VISIT)
+        same = visits._same_vessel()
+        i = np.flatnonzero(same)
+        return Legs(
+            visits.vessel_ids,
+            visits.vessel[i],
+            visits.port_id[i],
+            visits.port_name[i],
+            visits.port_id[i + 1],
+            visits.port_name[i + 1],
+            visits.end[i],
+            visits.start[i + 1],
+        )
+
+    def trip_legs(self) -> Legs:
+        """The trip rows of the timeline, as :class:`Legs`."""
+        trips = self.of_kind(TRIP)
+        return Legs(
+            trips.vessel_ids, trips.vessel, trips.origin_id, trips.origin_name,
+            trips.port_id, trips.port_name, trips.start, trips.end,
+        )
+
+
+_ROW_COLUMNS = (
+    "vessel", "start", "end", "kind", "record_id", "port_id", "port_name",
+    "country", "origin_id", "origin_name",
+)
+
+
+def build_timeline(pages: Iterable[Any], kind: Optional[str] = None, vessel_id: Optional[str] = None) -> Timeline:
+    """
+    Build a :class:`Timeline` from API response pages.
+
+    Parameters
+    ----------
+    pages
+        Port-visit, trip and / or event responses (or bare record lists),
+        e.g. ``[client.get_port_visits(...), client.get_trips(vid)]``.
+    kind
+        Force the kind of every record; by default it is inferred
+        (``port_visit``, ``trip`` or the event ``type``).
+    vessel_id
+        Vessel to assign to records that do not name one (``get_trips`` and
+        ``get_events`` responses of a single vessel).
+    """
+    rows = [
+        _flatten(rec, kind, vessel_id)
+        for page in pages
+        for rec in page_records(page)
+        if isinstance(rec, dict)
+    ]
+    cols = dict(zip(_COLUMNS, map(list, zip(*rows)))) if rows else {name: [] for name in _COLUMNS}
+
+    vessel_ids, vessel = np.unique(np.asarray(cols["vid"], dtype=object).astype(str), return_inverse=True)
+    start = parse_times(cols["start"])
+    end = parse_times(cols["end"])
+    order = np.lexsort((start, vessel))
+
+    def _obj(values: list) -> np.ndarray:
+        return objects(values)[order]
+
+    return Timeline(
+        vessel_ids=vessel_ids.astype(object),
+        vessel=vessel.astype(np.int64)[order],
+        start=start[order],
+        end=end[order],
+        kind=_obj(cols["kind"]),
+        record_id=_obj(cols["id"]),
+        port_id=_obj(cols["pid"]),
+        port_name=_obj(cols["pname"]),
+        country=_obj(cols["country"]),
+        origin_id=_obj(cols["oid"]),
+        origin_name=_obj(cols["oname"]),
+    )
@@ -0,0 +1,112 @@
+"""
+timewindow.py
+
+UTC time windows for the ``start`` / ``end`` endpoints.
+
+Every time-bounded method of :class:`~ais_global_fishing.GFWClient`
+(``get_track``, ``get_segments``, ``get_events``, the event collections and
+``get_port_visits``) accepts any of
+
+* ``datetime`` – naive values are taken to be UTC, aware ones are converted
+  (``pandas.Timestamp`` is a ``datetime`` subclass and works the same way);
+* ``date`` – midnight UTC;
+* ``int`` / ``float`` – seconds since the Unix epoch;
+* ``str`` – ISO 8601, with or without a trailing ``Z``.
+
+The values are normalised once into a :class:`TimeWindow`, which renders the
+API's ``YYYY-MM-DDTHH:MM:SSZ`` parameters and splits itself into shards.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import cached_property
+from typing import Union
+
+TimeLike = Union[datetime, date, int, float, str]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_API_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def to_utc(value: TimeLike) -> datetime:
+    """Convert a supported time value to an aware UTC ``datetime``."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _EPOCH + timedelta(seconds=value)
+    if isinstance(value, str):
+        return to_utc(datetime.fromisoformat(value.strip().removesuffix("Z")))
+    raise TypeError(f"unsupported time value: {value!r}")
+
+
+def format_time(value: TimeLike) -> str:
+    """Render *value* as the API expects it: ``YYYY-MM-DDTHH:MM:SSZ`` (UTC)."""
+    return to_utc(value).strftime(_API_FORMAT)
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """
+    Half-open UTC interval ``[start, end)``.
+
+    Build one with :meth:`TimeWindow.of`, which accepts every
+    :data:`TimeLike` value and validates the order.
+    """
+
+    start: datetime
+    end: datetime
+
+    @classmethod
+    def of(cls, start: TimeLike, end: TimeLike) -> "TimeWindow":
+        lo, hi = to_utc(start), to_utc(end)
+        if hi <= lo:
+            raise ValueError("'end' must be after 'start'")
+        return cls(lo, hi)
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+    @cached_property
+    def start_param(self) -> str:
+        return self.start.strftime(_API_FORMAT)
+
+    @cached_property
+    def end_param(self) -> str:
+        return self.end.strftime(_API_FORMAT)
+
+    def params(self) -> dict[str, str]:
+        """``{"start": …, "end": …}`` query parameters for this window."""
+        return {"start": self.start_param, "end": self.end_param}
+
+    def key(self) -> str:
+        """Compact identifier, e.g. for checkpoints: ``<start>/<end>``."""
+        return f"{self.start_param}/{self.end_param}"
+
+    def split(self, step: timedelta | None) -> list["TimeWindow"]:
+        """
+        Consecutive shards of at most *step* covering the window.
+
+        Shard boundaries are computed in one pass over integer microsecond
+        offsets rather than by repeated ``datetime`` addition; the last shard
+        is truncated at :attr:`end`.  ``step=None`` returns ``[self]``.
+        """
+        if step is None:
+            return [self]
+        step_us = step // timedelta(microseconds=1)
+        if step_us <= 0:
+            raise ValueError("'step' must be positive")
+
+        total_us = self.duration // timedelta(microseconds=1)
+        bounds = list(range(0, total_us, step_us)) + [total_us]
+        base = self.start
+        return [
+            TimeWindow(base + timedelta(microseconds=lo), base + timedelta(microseconds=hi))
+            for lo, hi in zip(bounds, bounds[1:])
+        ]
@@ -0,0 +1,277 @@
+"""
+trackarchive.py
+
+Compact, memory-mapped per-vessel track archive.
+
+Years of ``get_track`` output stored as pretty-printed JSON take minutes
+and gigabytes to load back.  A :class:`TrackArchive` keeps one binary file
+per vessel instead – 16 bytes per position – laid out so that it can be
+``mmap``-ed and sliced by time without parsing:
+
+==========  ==========================  =====================================
+Section     Type                        Content
+==========  ==========================  =====================================
+header      64 bytes                    magic, version, block size, counts,
+                                        quantisation scales
+block index ``int64[n_blocks]``         epoch second of each block's 1st point
+offsets     ``uint32[n]``               seconds since the block's first point
+lat, lon    ``int32[n]`` each           degrees × ``COORD_SCALE`` (1e-6°)
+speed       ``uint16[n]``               knots × 100 (``0xFFFF`` = unknown)
+course      ``uint16[n]``               degrees × 100 (``0xFFFF`` = unknown)
+==========  ==========================  =====================================
+
+Timestamps are delta-encoded against their block's base time, so any point's
+time is ``index[i // block_size] + offsets[i]``.  A time-range query binary
+searches the block index, then the offsets of one block, and returns views
+onto the mapped columns; only the selected rows are ever decoded.
+
+Example
+-------
+>>> archive = TrackArchive("tracks/")
+>>> archive.write(Track.from_geojson(client.get_track(vid, start, end)), vid)
+>>> archive.read(vid, "2024-03-01", "2024-04-01")      # Track of March only
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import quote, unquote
+
+from ._numpy import np
+from .timewindow import TimeLike, to_utc
+from .tracks import Track
+
+MAGIC = b"GFWTRK\x00\x00"
+VERSION = 1
+SUFFIX = ".gfwt"
+DEFAULT_BLOCK_SIZE = 1024
+
+COORD_SCALE = 1e6  # int32 units per degree
+SPEED_SCALE = 100.0
+COURSE_SCALE = 100.0
+_MISSING_U16 = 0xFFFF
+
+# magic, version, block size, point count, block count, coord / speed / course scales
+_HEADER = struct.Struct("<8sIIQQddd")
+_HEADER_SIZE = 64
+
+
+def _quantise_u16(values: np.ndarray, scale: float) -> np.ndarray:
+    scaled = np.rint(np.nan_to_num(values.astype(np.float64), nan=-1.0) * scale)
+    return np.where((scaled < 0) | (scaled >= _MISSING_U16), _MISSING_U16, scaled).astype("<u2")
+
+
+def _decode_u16(values: np.ndarray, scale: float) -> np.ndarray:
+    decoded = values.astype(np.float32) / np.float32(scale)
+    decoded[values == _MISSING_U16] = np.nan
+    return decoded
+
+
+def write_track(path: str | Path, track: Track, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Write *track* (sorted by time) to *path* in the archive format and return
+    the file size.  The file is replaced atomically.
+    """
+    if block_size < 1:
+        raise ValueError("'block_size' must be positive")
+    n = len(track)
+    times = np.asarray(track.times, dtype=np.int64)
+    if n and np.any(np.diff(times) < 0):
+        raise ValueError("track must be sorted by time")
+
+    bases = times[::block_size]
+    offsets = times - np.repeat(bases, block_size)[:n]
+    columns = [
+        bases.astype("<i8"),
+        offsets.astype("<u4"),
+        np.rint(np.asarray(track.lat) * COORD_SCALE).astype("<i4"),
+        np.rint(np.asarray(track.lon) * COORD_SCALE).astype("<i4"),
+        _quantise_u16(np.asarray(track.speed), SPEED_SCALE),
+        _quantise_u16(np.asarray(track.course), COURSE_SCALE),
+    ]
+    header = _HEADER.pack(MAGIC, VERSION, block_size, n, len(bases), COORD_SCALE, SPEED_SCALE, COURSE_SCALE)
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for column in columns:
+            column.tofile(fh)
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+class TrackFile:
+    """
+    Read-only, memory-mapped view of one archived track.
+
+    Column arrays are views onto the mapping: opening a file reads only the
+    header, and the operating system pages in just the parts that a query
+    touches.  Use as a context manager or call :meth:`close`.
+    """
+
+    def __init__(self, path: str | Path, vessel_id: Optional[str] = None):
+        self.path = Path(path)
+        self.vessel_id = vessel_id
+        with self.path.open("rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self._map is None or size < _HEADER_SIZE:
+            raise ValueError(f"{self.path} is not a track archive")
+        magic, version, self.block_size, n, n_blocks, self.coord_scale, self.speed_scale, self.course_scale = (
+            _HEADER.unpack_from(self._map, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version-{VERSION} track archive")
+
+        offset = _HEADER_SIZE
+
+        def column(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            arr = np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+            offset += arr.nbytes
+            return arr
+
+        self.bases = column("<i8", n_blocks)
+        self.offsets = column("<u4", n)
+        self.lat_raw = column("<i4", n)
+        self.lon_raw = column("<i4", n)
+        self.speed_raw = column("<u2", n)
+        self.course_raw = column("<u2", n)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __enter__(self) -> "TrackFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Drop the column views and unmap the file."""
+        for name in ("bases", "offsets", "lat_raw", "lon_raw", "speed_raw", "course_raw"):
+            setattr(self, name, None)
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:  # a returned view is still alive; unmapped when it is freed
+                pass
+            self._map = None
+
+    # ------------------------------------------------------------------ #
+    # Time index
+    # ------------------------------------------------------------------ #
+    def _row(self, ts: float, side: str) -> int:
+        """Row index where epoch second *ts* would be inserted."""
+        if len(self) == 0:
+            return 0
+        # For side="left" pick the last block starting strictly before ts, so
+        # equal timestamps straddling a block boundary are all found.
+        block = max(int(np.searchsorted(self.bases, ts, side)) - 1, 0)
+        start = block * self.block_size
+        stop = min(start + self.block_size, len(self))
+        delta = ts - int(self.bases[block])
+        if delta < 0:
+            return start
+        return start + int(np.searchsorted(self.offsets[start:stop], delta, side))
+
+    def rows(self, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None) -> slice:
+        """Row range of the points with ``start <= time < end``."""
+        lo = 0 if start is None else self._row(to_utc(start).timestamp(), "left")
+        hi = len(self) if end is None else self._row(to_utc(end).timestamp(), "left")
+        return slice(lo, max(lo, hi))
+
+    def times(self, rows: slice = slice(None)) -> np.ndarray:
+        """Epoch seconds of *rows*."""
+        start, stop, _ = rows.indices(len(self))
+        blocks = np.arange(start, stop) // self.block_size
+        return self.bases[blocks] + self.offsets[start:stop].astype(np.int64)
+
+    # ------------------------------------------------------------------ #
+    # Reads
+    # ------------------------------------------------------------------ #
+    def columns(self, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None) -> dict[str, np.ndarray]:
+        """Zero-copy views of the raw (quantised) columns in the time range."""
+        rows = self.rows(start, end)
+        return {
+            "offsets": self.offsets[rows],
+            "lat": self.lat_raw[rows],
+            "lon": self.lon_raw[rows],
+            "speed": self.speed_raw[rows],
+            "course": self.course_raw[rows],
+        }
+
+    def read(self, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None) -> Track:
+        """Decode the points in ``[start, end)`` into a :class:`Track`."""
+        rows = self.rows(start, end)
+        return Track(
+            self.times(rows),
+            self.lat_raw[rows] / self.coord_scale,
+            self.lon_raw[rows] / self.coord_scale,
+            _decode_u16(self.speed_raw[rows], self.speed_scale),
+            _decode_u16(self.course_raw[rows], self.course_scale),
+            self.vessel_id,
+        )
+
+
+class TrackArchive:
+    """
+    Directory of per-vessel track files (``<vessel-id>.gfwt``).
+
+    Parameters
+    ----------
+    root
+        Archive directory (created if missing).
+    block_size
+        Points per time-index block for newly written files.
+    """
+
+    def __init__(self, root: str | Path, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.block_size = block_size
+
+    def path_for(self, vessel_id: str) -> Path:
+        return self.root / (quote(vessel_id, safe="-_.") + SUFFIX)
+
+    def __contains__(self, vessel_id: str) -> bool:
+        return self.path_for(vessel_id).exists()
+
+    def vessel_ids(self) -> list[str]:
+        return sorted(unquote(p.name[: -len(SUFFIX)]) for p in self.root.glob(f"*{SUFFIX}"))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.vessel_ids())
+
+    def open(self, vessel_id: str) -> TrackFile:
+        """Memory-map the archived track of *vessel_id*."""
+        path = self.path_for(vessel_id)
+        if not path.exists():
+            raise KeyError(vessel_id)
+        return TrackFile(path, vessel_id)
+
+    def read(self, vessel_id: str, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None) -> Track:
+        """Points of *vessel_id* in ``[start, end)``."""
+        with self.open(vessel_id) as tf:
+            return tf.read(start, end)
+
+    def write(self, track: Track, vessel_id: Optional[str] = None, *, merge: bool = True) -> int:
+        """
+        Store *track*; with *merge* (the default) it is combined with what is
+        already archived for the vessel, newer points winning on equal
+        timestamps.  Returns the number of points stored.
+        """
+        vessel_id = vessel_id or track.vessel_id
+        if not vessel_id:
+            raise ValueError("a vessel id is required")
+        if merge and vessel_id in self:
+            track = Track.concat([self.read(vessel_id), track])
+        else:
+            track = track.normalised()
+        write_track(self.path_for(vessel_id), track, self.block_size)
+        return len(track)
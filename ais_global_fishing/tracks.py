@@ -0,0 +1,139 @@
+"""
+tracks.py
+
+Array-backed vessel tracks.
+
+``get_track`` answers with a GeoJSON ``FeatureCollection`` of points – one
+Python dict per position.  :class:`Track` holds the same data as parallel
+numpy columns (epoch seconds, latitude, longitude, speed, course), which is
+what the archive, kinematics and geofence code operate on.
+
+Requires ``numpy`` (``pip install "ais-global-fishing[analytics]"``).
+
+Example
+-------
+>>> track = Track.from_geojson(client.get_track(vid, start, end), vessel_id=vid)
+>>> track.between("2024-03-01", "2024-04-01").lat
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Optional
+
+from ._numpy import np
+from .records import page_records
+from .timeline import parse_times
+from .timewindow import TimeLike, to_utc
+
+_COLUMNS = ("times", "lat", "lon", "speed", "course")
+
+
+def _float(value: Any) -> float:
+    return float("nan") if value is None else value
+
+
+@dataclass
+class Track:
+    """
+    One vessel's positions as parallel arrays, sorted by time.
+
+    ``times`` are UTC epoch seconds (``int64``); ``speed`` (knots) and
+    ``course`` (degrees) are ``float32`` with ``nan`` where unknown.
+    """
+
+    times: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    speed: np.ndarray
+    course: np.ndarray
+    vessel_id: Optional[str] = None
+
+    @classmethod
+    def empty(cls, vessel_id: Optional[str] = None) -> "Track":
+        return cls(
+            np.empty(0, np.int64), np.empty(0), np.empty(0),
+            np.empty(0, np.float32), np.empty(0, np.float32), vessel_id,
+        )
+
+    @classmethod
+    def from_geojson(cls, pages: Any, vessel_id: Optional[str] = None) -> "Track":
+        """
+        Build a track from one ``get_track`` response or a list of them
+        (e.g. the shards of a long window).  Points are sorted and
+        de-duplicated by timestamp.
+        """
+        if isinstance(pages, dict):
+            pages = [pages]
+        features = [f for page in pages for f in page_records(page) if isinstance(f, dict) and f.get("geometry")]
+        if not features:
+            return cls.empty(vessel_id)
+        props = [f.get("properties") or {} for f in features]
+        coords = np.array([f["geometry"]["coordinates"][:2] for f in features], dtype=np.float64)
+        stamps = parse_times(p.get("timestamp") for p in props)
+        track = cls(
+            stamps.astype(np.int64),
+            coords[:, 1],
+            coords[:, 0],
+            np.array([_float(p.get("speed")) for p in props], dtype=np.float32),
+            np.array([_float(p.get("course")) for p in props], dtype=np.float32),
+            vessel_id,
+        )
+        return track.take(~np.isnat(stamps)).normalised()
+
+    @classmethod
+    def concat(cls, tracks: Iterable["Track"]) -> "Track":
+        """Join several tracks of one vessel (sorted, de-duplicated by time)."""
+        tracks = list(tracks)
+        if not tracks:
+            return cls.empty()
+        joined = cls(
+            *(np.concatenate([getattr(t, name) for t in tracks]) for name in _COLUMNS),
+            tracks[0].vessel_id,
+        )
+        return joined.normalised()
+
+    def normalised(self) -> "Track":
+        """Sorted by time, later duplicates of a timestamp win."""
+        order = np.argsort(self.times, kind="stable")
+        times = self.times[order]
+        keep = np.ones(len(times), dtype=bool)
+        keep[:-1] = times[1:] != times[:-1]
+        return self.take(order[keep])
+
+    def take(self, index: Any) -> "Track":
+        """Sub-track of the selected rows (index array, mask or slice)."""
+        return replace(self, **{name: getattr(self, name)[index] for name in _COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def datetimes(self) -> np.ndarray:
+        """``times`` as ``datetime64[s]``."""
+        return self.times.astype("datetime64[s]")
+
+    def between(self, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None) -> "Track":
+        """Points with ``start <= time < end`` (a view, no copy)."""
+        lo = 0 if start is None else np.searchsorted(self.times, to_utc(start).timestamp(), "left")
+        hi = len(self) if end is None else np.searchsorted(self.times, to_utc(end).timestamp(), "left")
+        return self.take(slice(int(lo), int(hi)))
+
+    def to_geojson(self) -> dict:
+        """Back to the ``get_track`` GeoJSON shape."""
+        stamps = np.datetime_as_string(self.datetimes, unit="s")
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+                    "properties": {
+                        "timestamp": f"{ts}Z",
+                        "speed": None if np.isnan(sp) else round(float(sp), 2),
+                        "course": None if np.isnan(co) else round(float(co), 2),
+                    },
+                }
+                for ts, lat, lon, sp, co in zip(stamps, self.lat, self.lon, self.speed, self.course)
+            ],
+        }
@@ -0,0 +1,150 @@
+"""
+transfer.py
+
+Content-encoding negotiation and per-endpoint byte accounting.
+
+Large ``/events`` and ``/track`` answers are highly repetitive JSON and
+shrink five- to tenfold when compressed.  :func:`accept_encoding` builds the
+``Accept-Encoding`` header a :class:`~ais_global_fishing.GFWClient` sends:
+``gzip`` and ``deflate`` always, plus ``br`` and ``zstd`` when the optional
+codecs (``brotli`` / ``zstandard``) are installed, so that ``urllib3`` can
+decode them.  Responses are decompressed incrementally as they are read
+from the socket.
+
+:class:`TransferStats` records, per endpoint family, how many bytes came
+over the wire and how large the decoded bodies were – the numbers needed to
+judge what a slow or metered link costs.
+
+Example
+-------
+>>> client = GFWClient()
+>>> client.get_fishing_events("2024-01-01", "2024-02-01")
+>>> print(client.transfer.report())
+family          requests      wire bytes      body bytes   ratio
+events                 1         412,880       3,107,402    7.5x
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .concurrency import endpoint_family
+
+# Encodings decoded by ``urllib3`` without extra packages.
+BASE_ENCODINGS = ("gzip", "deflate")
+
+
+def _installed(*modules: str) -> bool:
+    return any(importlib.util.find_spec(name) is not None for name in modules)
+
+
+def available_encodings() -> list[str]:
+    """Content encodings this installation can decode, best first."""
+    encodings = []
+    if _installed("zstandard"):
+        encodings.append("zstd")
+    if _installed("brotli", "brotlicffi"):
+        encodings.append("br")
+    return [*encodings, *BASE_ENCODINGS]
+
+
+def accept_encoding() -> str:
+    """Value for the ``Accept-Encoding`` request header."""
+    return ", ".join(available_encodings())
+
+
+def measure(response: Any) -> Optional[tuple[int, int, str]]:
+    """
+    ``(wire bytes, body bytes, content encoding)`` of a received response,
+    or ``None`` if it has no byte body (e.g. a test double).
+
+    Wire bytes are what ``urllib3`` read from the socket; responses that
+    did not come over a socket (replayed ones) fall back to
+    ``Content-Length`` or the body size.
+    """
+    body = getattr(response, "content", None)
+    if not isinstance(body, (bytes, bytearray)):
+        return None
+    headers = getattr(response, "headers", None) or {}
+    encoding = str(headers.get("Content-Encoding") or "identity").lower()
+    wire = None
+    tell = getattr(getattr(response, "raw", None), "tell", None)
+    if callable(tell):
+        try:
+            wire = tell()
+        except Exception:
+            wire = None
+    if not isinstance(wire, int) or wire <= 0:
+        length = headers.get("Content-Length")
+        wire = int(length) if isinstance(length, str) and length.isdigit() else len(body)
+    return wire, len(body), encoding
+
+
+@dataclass
+class TransferCounter:
+    """Bytes moved for one endpoint family."""
+
+    requests: int = 0
+    wire_bytes: int = 0
+    body_bytes: int = 0
+    encodings: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ratio(self) -> float:
+        """Body bytes per wire byte (``1.0`` for uncompressed traffic)."""
+        return self.body_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+    def add(self, wire: int, body: int, encoding: str) -> None:
+        self.requests += 1
+        self.wire_bytes += wire
+        self.body_bytes += body
+        self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+
+
+class TransferStats:
+    """Thread-safe :class:`TransferCounter` per endpoint family."""
+
+    def __init__(self):
+        self._counters: dict[str, TransferCounter] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, response: Any) -> None:
+        """Account for *response* to a request of *path*."""
+        measured = measure(response)
+        if measured is None:
+            return
+        family = endpoint_family(path)
+        with self._lock:
+            self._counters.setdefault(family, TransferCounter()).add(*measured)
+
+    def by_family(self) -> dict[str, TransferCounter]:
+        with self._lock:
+            return {
+                family: TransferCounter(c.requests, c.wire_bytes, c.body_bytes, dict(c.encodings))
+                for family, c in sorted(self._counters.items())
+            }
+
+    def total(self) -> TransferCounter:
+        total = TransferCounter()
+        for counter in self.by_family().values():
+            total.requests += counter.requests
+            total.wire_bytes += counter.wire_bytes
+            total.body_bytes += counter.body_bytes
+            for encoding, n in counter.encodings.items():
+                total.encodings[encoding] = total.encodings.get(encoding, 0) + n
+        return total
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+    def report(self) -> str:
+        """Plain-text table of the counters, one line per family plus a total."""
+        rows = [*self.by_family().items(), ("total", self.total())]
+        lines = [f"{'family':<14}{'requests':>10}{'wire bytes':>16}{'body bytes':>16}{'ratio':>8}"]
+        for family, c in rows:
+            lines.append(f"{family:<14}{c.requests:>10,}{c.wire_bytes:>16,}{c.body_bytes:>16,}{c.ratio:>7.1f}x")
+        return "\n".join(lines)
@@ -0,0 +1,315 @@
+"""
+transport.py
+
+Pluggable HTTP transports underneath :meth:`GFWClient._get`.
+
+:class:`GFWClient` never talks to ``requests`` directly; it hands every
+request to a *transport* object with two methods::
+
+    transport.get(url, params)  -> response
+    transport.head(url)         -> response
+
+where *response* offers ``status_code``, ``headers``, ``content``, ``json()``
+and ``raise_for_status()`` (a ``requests.Response`` does).
+
+* :class:`SessionTransport` – the default, a ``requests.Session``.
+* :class:`ThreadLocalTransport` – thread-safe: one session per thread, all
+  drawing on one shared connection pool.
+* :class:`RecordingTransport` – wraps another transport and appends every
+  exchange to a gzip-compressed JSON Lines archive.
+* :class:`ReplayTransport` – serves an archive offline, at wire speed or
+  with recorded / injected latency, and optionally injects throttling or
+  server errors.
+
+Example
+-------
+>>> with RecordingTransport(SessionTransport(requests.Session()), "run.jsonl.gz") as rec:
+...     GFWClient(transport=rec).get_trips("…")
+>>> client = GFWClient(api_key="offline", transport=ReplayTransport("run.jsonl.gz"))
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Protocol, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .canonical import request_key
+
+Latency = Union[None, float, str, Callable[[], float]]
+
+# Response headers worth keeping in an archive.
+_KEPT_HEADERS = ("content-type", "retry-after")
+
+
+class Transport(Protocol):
+    """Interface expected by :class:`GFWClient`."""
+
+    def get(self, url: str, params: Mapping[str, Any]) -> Any: ...
+
+    def head(self, url: str) -> Any: ...
+
+
+class SessionTransport:
+    """Default transport: forwards to a ``requests.Session``."""
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+
+    def get(self, url: str, params: Mapping[str, Any]):
+        return self.session.get(url, params=params)
+
+    def head(self, url: str):
+        return self.session.head(url, allow_redirects=True)
+
+
+class ThreadLocalTransport:
+    """
+    Thread-safe transport for clients shared by worker threads.
+
+    ``requests.Session`` is not documented to be thread-safe, so each thread
+    gets its own, created on first use.  All of them – and the template
+    *session* – mount one ``HTTPAdapter``, whose ``urllib3`` pool is
+    thread-safe: N threads share one set of warm keep-alive connections of
+    up to *pool_size* per host.  Headers are read from the template on every
+    request, so changes to ``session.headers`` apply to all threads.
+    """
+
+    def __init__(self, session: requests.Session, pool_size: int = 32):
+        self.session = session
+        self.adapter = HTTPAdapter(pool_maxsize=pool_size)
+        for prefix in ("https://", "http://"):
+            session.mount(prefix, self.adapter)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers = self.session.headers
+            session.auth = self.session.auth
+            session.proxies = self.session.proxies
+            session.verify = self.session.verify
+            session.cert = self.session.cert
+            for prefix in ("https://", "http://"):
+                session.mount(prefix, self.adapter)
+        return session
+
+    def get(self, url: str, params: Mapping[str, Any]):
+        return self._session().get(url, params=params)
+
+    def head(self, url: str):
+        return self._session().head(url, allow_redirects=True)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.adapter.close()
+
+
+class RecordedResponse:
+    """Minimal ``requests.Response`` stand-in served by :class:`ReplayTransport`."""
+
+    def __init__(self, status_code: int, content: bytes = b"", headers: Optional[dict] = None, url: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}", response=self)
+
+
+def _exchange_key(method: str, url: str, params: Optional[Mapping[str, Any]]) -> str:
+    return f"{method} {request_key(urlsplit(url).path, params)}"
+
+
+class RecordingTransport:
+    """
+    Record every exchange of *inner* to *path* (gzip JSON Lines).
+
+    Records are appended, so several runs can share one archive.  Use as a
+    context manager or call :meth:`close` to flush the archive.
+    """
+
+    def __init__(self, inner: Transport, path: str | Path):
+        self.inner = inner
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._fh = gzip.open(self.path, "at", encoding="utf-8")
+
+    def __enter__(self) -> "RecordingTransport":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+    def get(self, url: str, params: Mapping[str, Any]):
+        started = time.perf_counter()
+        resp = self.inner.get(url, params)
+        self._record("GET", url, params, resp, time.perf_counter() - started)
+        return resp
+
+    def head(self, url: str):
+        started = time.perf_counter()
+        resp = self.inner.head(url)
+        self._record("HEAD", url, None, resp, time.perf_counter() - started)
+        return resp
+
+    def _record(self, method: str, url: str, params, resp, elapsed: float) -> None:
+        record: dict[str, Any] = {
+            "key": _exchange_key(method, url, params),
+            "method": method,
+            "path": urlsplit(url).path,
+            "params": dict(params or {}),
+            "status": resp.status_code,
+            "headers": {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers},
+            "elapsed": round(elapsed, 6),
+        }
+        if method == "GET":
+            body = resp.content or b""
+            try:
+                record["body"] = body.decode("utf-8")
+            except UnicodeDecodeError:
+                record["body_b64"] = base64.b64encode(body).decode("ascii")
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self._fh.write(line + "\n")
+
+
+class ReplayTransport:
+    """
+    Serve responses from an archive written by :class:`RecordingTransport`.
+
+    Parameters
+    ----------
+    path
+        Archive to replay.
+    latency
+        ``None`` (wire speed – no delay), a fixed delay in seconds,
+        ``"recorded"`` to reproduce the latency observed while recording, or
+        a zero-argument callable returning a delay (e.g.
+        ``lambda: rng.expovariate(20)``).
+    error_rate
+        Probability in ``[0, 1]`` of answering a GET with *error_status*
+        instead of the recorded response.
+    error_status
+        Status code of injected errors (``429`` comes with ``Retry-After: 1``).
+    seed
+        Seed for the error-injection RNG, for reproducible soak tests.
+
+    A request that was never recorded is answered with a 404.  A request that
+    was recorded several times is answered with the recordings in order, the
+    last one repeating.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        latency: Latency = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("'error_rate' must be between 0 and 1")
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._records: dict[str, list[dict]] = defaultdict(list)
+        self._cursor: dict[str, int] = defaultdict(int)
+        self._paths: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[record["key"]].append(record)
+                    self._paths.add(record["path"])
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._records.values())
+
+    def get(self, url: str, params: Mapping[str, Any]):
+        record = self._next(_exchange_key("GET", url, params))
+        self._sleep(record)
+        with self._lock:
+            inject = self.error_rate and self._rng.random() < self.error_rate
+        if inject:
+            headers = {"Retry-After": "1"} if self.error_status == 429 else {}
+            return RecordedResponse(self.error_status, b'{"error":"injected"}', headers, url)
+        if record is None:
+            return RecordedResponse(404, b'{"error":"not recorded"}', {}, url)
+        return self._response(record, url)
+
+    def head(self, url: str):
+        record = self._next(_exchange_key("HEAD", url, None))
+        self._sleep(record)
+        if record is not None:
+            return RecordedResponse(record["status"], b"", record.get("headers"), url)
+        # Fall back on whether anything was recorded under this path.
+        return RecordedResponse(200 if urlsplit(url).path in self._paths else 404, b"", {}, url)
+
+    def _next(self, key: str) -> Optional[dict]:
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                self.misses += 1
+                return None
+            self.hits += 1
+            idx = self._cursor[key]
+            self._cursor[key] = min(idx + 1, len(records) - 1)
+            return records[idx]
+
+    def _sleep(self, record: Optional[dict]) -> None:
+        if self.latency is None:
+            return
+        if self.latency == "recorded":
+            delay = record.get("elapsed", 0.0) if record else 0.0
+        elif callable(self.latency):
+            delay = self.latency()
+        else:
+            delay = float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+
+    @staticmethod
+    def _response(record: dict, url: str) -> RecordedResponse:
+        if "body_b64" in record:
+            content = base64.b64decode(record["body_b64"])
+        else:
+            content = record.get("body", "").encode("utf-8")
+        return RecordedResponse(record["status"], content, record.get("headers"), url)
@@ -0,0 +1,302 @@
+"""
+trips.py
+
+Local, incremental port-to-port trip segmentation for whole fleets.
+
+``get_trips`` is a per-vessel call without time bounds: fleet statistics
+cost one request per vessel and re-download every vessel's full history
+each time.  A :class:`TripBook` derives the same legs locally from port
+visits instead.  It keeps the visits of all vessels in sorted column
+arrays; :meth:`~TripBook.sync` fetches only the visits since the book's
+watermark, for the whole fleet, through one filtered ``/ports/visits``
+query, and :meth:`~TripBook.add` merges them and reports the trips that
+are new or changed.  :func:`trip_stats` then attaches track-derived
+figures (fixes, distance sailed, speeds) to any set of trips in one
+vectorised pass over array tracks.
+
+Requires ``numpy`` (``pip install "ais-global-fishing[analytics]"``).
+
+Example
+-------
+>>> book = TripBook()
+>>> book.sync(client, end="2024-04-01", start="2024-01-01", vessel_ids=fleet)
+>>> book.trips().to_records()
+>>> new = book.sync(client, end="2024-04-08")          # only last week's visits
+>>> trip_stats(new, (archive.read(v) for v in new.vessel_ids)).to_records()
+>>> book.save("visits.json")
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ._numpy import np
+from .kinematics import haversine_nm
+from .timeline import PORT_VISIT, Legs, build_timeline, objects
+from .timewindow import TimeLike, to_utc
+from .tracks import Track
+
+# Visits are re-fetched from this long before the watermark, so that
+# visits still open at the last sync are picked up once they close.
+DEFAULT_OVERLAP = timedelta(days=7)
+
+_VISIT_COLUMNS = ("vessel", "start", "end", "record_id", "port_id", "port_name", "country")
+
+
+class TripBook:
+    """
+    Port visits of many vessels and the port-to-port trips between them.
+
+    Visits are identified by their record ``id``; adding a visit that is
+    already known replaces it (an open visit that has since closed).
+    Vessel codes are stable for the life of the book, so trips returned
+    by different calls can be compared by ``(vessel, depart)``.
+    """
+
+    def __init__(self) -> None:
+        self.vessel_ids: list[str] = []
+        self._code: dict[str, int] = {}
+        self.vessel = np.empty(0, dtype=np.int64)
+        self.start = np.empty(0, dtype="datetime64[s]")
+        self.end = np.empty(0, dtype="datetime64[s]")
+        self.record_id = objects([])
+        self.port_id = objects([])
+        self.port_name = objects([])
+        self.country = objects([])
+
+    def __len__(self) -> int:
+        return len(self.vessel)
+
+    @property
+    def watermark(self) -> Optional[np.datetime64]:
+        """Start of the latest visit in the book (``None`` when empty)."""
+        return self.start.max() if len(self) else None
+
+    def _codes(self, vessel_ids: Iterable[str]) -> np.ndarray:
+        codes = []
+        for vid in vessel_ids:
+            if vid not in self._code:
+                self._code[vid] = len(self.vessel_ids)
+                self.vessel_ids.append(vid)
+            codes.append(self._code[vid])
+        return np.asarray(codes, dtype=np.int64)
+
+    # ------------------------------------------------------------------ #
+    # Updates
+    # ------------------------------------------------------------------ #
+    def add(self, pages: Iterable[Any]) -> Legs:
+        """
+        Merge port-visit pages (e.g. ``get_port_visits`` responses) into the
+        book and return the trips that start or end at a new or changed
+        visit.  Visits re-sent unchanged do not count.
+        """
+        if isinstance(pages, dict):
+            pages = [pages]
+        new = build_timeline(pages, kind=PORT_VISIT)
+        if not len(new):
+            return self.trips(np.zeros(len(self), dtype=bool))
+        vessel = self._codes(new.vessel_ids)[new.vessel]
+        record_id = objects(
+            rid if rid is not None else f"{self.vessel_ids[v]}@{s}"
+            for rid, v, s in zip(new.record_id, vessel, new.start)
+        )
+        keep = ~np.isin(self.record_id.astype(str), record_id.astype(str))
+        known = {
+            rid: (str(s), str(e), pid)
+            for rid, s, e, pid in zip(self.record_id[~keep], self.start[~keep], self.end[~keep], self.port_id[~keep])
+        }
+        changed = np.array(
+            [known.get(rid) != (str(s), str(e), pid) for rid, s, e, pid in zip(record_id, new.start, new.end, new.port_id)],
+            dtype=bool,
+        )
+
+        columns = {
+            "vessel": vessel,
+            "start": new.start,
+            "end": new.end,
+            "record_id": record_id,
+            "port_id": new.port_id,
+            "port_name": new.port_name,
+            "country": new.country,
+        }
+        for name in _VISIT_COLUMNS:
+            setattr(self, name, np.concatenate([getattr(self, name)[keep], columns[name]]))
+        fresh = np.concatenate([np.zeros(keep.sum(), dtype=bool), changed])
+
+        order = np.lexsort((self.start, self.vessel))
+        for name in _VISIT_COLUMNS:
+            setattr(self, name, getattr(self, name)[order])
+        return self.trips(fresh[order])
+
+    def sync(
+        self,
+        client: Any,
+        end: TimeLike,
+        *,
+        start: Optional[TimeLike] = None,
+        vessel_ids: Optional[Iterable[str]] = None,
+        overlap: timedelta = DEFAULT_OVERLAP,
+    ) -> Legs:
+        """
+        Fetch the port visits of *vessel_ids* (default: every vessel in the
+        book) up to *end* and :meth:`add` them.
+
+        Visits are requested from *start*, or by default from the book's
+        watermark minus *overlap* – one paged ``/ports/visits`` query for
+        the whole fleet rather than one ``get_trips`` call per vessel.  Pass
+        *start* when adding vessels whose history is older than that.
+
+        All pages are fetched before anything is added, so the book (and its
+        watermark) only moves when the fetch is complete; a failed request,
+        including a failed group of a split filter, raises and leaves the
+        book unchanged.
+        """
+        if start is None:
+            if self.watermark is None:
+                raise ValueError("start is required for the first sync of an empty TripBook")
+            start = self.watermark.item() - overlap
+        vessel_ids = list(vessel_ids) if vessel_ids is not None else list(self.vessel_ids)
+        if not vessel_ids:
+            return self.trips(np.zeros(len(self), dtype=bool))
+        start, end = to_utc(start), to_utc(end)
+        if start >= end:
+            return self.trips(np.zeros(len(self), dtype=bool))
+        return self.add([client.get_port_visits(start, end, vessel_ids=vessel_ids, all_pages=True)])
+
+    # ------------------------------------------------------------------ #
+    # Trips
+    # ------------------------------------------------------------------ #
+    def trips(self, visits: Optional[np.ndarray] = None) -> Legs:
+        """
+        Port-to-port trips: a trip departs at the end of one visit and
+        arrives at the start of the vessel's next visit.  With a boolean
+        *visits* mask, only trips touching a selected visit are returned.
+        """
+        same = self.vessel[1:] == self.vessel[:-1]
+        if visits is not None:
+            same &= visits[1:] | visits[:-1]
+        i = np.flatnonzero(same)
+        return Legs(
+            np.asarray(self.vessel_ids, dtype=object),
+            self.vessel[i],
+            self.port_id[i],
+            self.port_name[i],
+            self.port_id[i + 1],
+            self.port_name[i + 1],
+            self.end[i],
+            self.start[i + 1],
+        )
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def to_records(self) -> list[dict]:
+        """Visits as flat records that :meth:`add` reads back."""
+        return [
+            {
+                "id": rid,
+                "vesselId": self.vessel_ids[v],
+                "start": None if np.isnat(s) else f"{s}Z",
+                "end": None if np.isnat(e) else f"{e}Z",
+                "portId": pid,
+                "portName": pname,
+                "country": country,
+            }
+            for v, s, e, rid, pid, pname, country in zip(
+                self.vessel, self.start, self.end, self.record_id,
+                self.port_id, self.port_name, self.country,
+            )
+        ]
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps({"entries": self.to_records()}))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TripBook":
+        book = cls()
+        book.add([json.loads(Path(path).read_text())])
+        return book
+
+
+@dataclass
+class TripStats:
+    """
+    Track-derived figures per trip (columnar, aligned with the trips they
+    were computed for).  Speeds are in knots, distances in nautical miles;
+    trips without fixes have zero points and ``nan`` speeds.
+    """
+
+    points: np.ndarray
+    distance: np.ndarray
+    hours: np.ndarray
+    avg_speed: np.ndarray
+    max_speed: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def to_records(self) -> list[dict]:
+        return [
+            {
+                "points": int(n),
+                "distanceNm": round(float(d), 3),
+                "hours": round(float(h), 3),
+                "avgSpeedKnots": None if np.isnan(a) else round(float(a), 2),
+                "maxSpeedKnots": None if np.isnan(m) else round(float(m), 2),
+            }
+            for n, d, h, a, m in zip(self.points, self.distance, self.hours, self.avg_speed, self.max_speed)
+        ]
+
+
+def trip_stats(trips: Legs, tracks: Iterable[Track]) -> TripStats:
+    """
+    Fixes, distance sailed and speeds of each trip from array *tracks*
+    (matched to trips by ``vessel_id``; each sorted by time).
+
+    Every fix is assigned to its trip with one ``searchsorted`` over
+    ``(vessel, departure)`` keys, so many vessels and trips are handled in
+    a single pass.  Trips must not overlap within a vessel, which holds for
+    :meth:`TripBook.trips`.
+    """
+    n = len(trips)
+    depart = trips.depart.astype("datetime64[s]").astype(np.int64)
+    arrive = trips.arrive.astype("datetime64[s]").astype(np.int64)
+    valid = ~(np.isnat(trips.depart) | np.isnat(trips.arrive))
+    hours = np.where(valid, (arrive - depart) / 3600.0, np.nan)
+
+    code = {vid: i for i, vid in enumerate(trips.vessel_ids)}
+    tracks = [t for t in tracks if t.vessel_id in code and len(t)]
+    tracks.sort(key=lambda t: code[t.vessel_id])
+    lengths = np.array([len(t) for t in tracks], dtype=np.int64)
+    vessel = np.repeat(np.array([code[t.vessel_id] for t in tracks], dtype=np.int64), lengths)
+    times = np.concatenate([t.times for t in tracks]) if tracks else np.empty(0, np.int64)
+    lat = np.concatenate([t.lat for t in tracks]).astype(np.float64) if tracks else np.empty(0)
+    lon = np.concatenate([t.lon for t in tracks]).astype(np.float64) if tracks else np.empty(0)
+
+    # Trips in (vessel, depart) order; invalid ones sort first and never match.
+    keyed = np.flatnonzero(valid)
+    keyed = keyed[np.lexsort((depart[keyed], trips.vessel[keyed]))]
+    leg = np.searchsorted(
+        trips.vessel[keyed] * (1 << 32) + depart[keyed], vessel * (1 << 32) + times, side="right"
+    ) - 1
+    hit = leg >= 0
+    leg = np.where(hit, keyed[np.maximum(leg, 0)], -1)
+    hit &= (trips.vessel[np.maximum(leg, 0)] == vessel) & (times <= arrive[np.maximum(leg, 0)])
+    leg[~hit] = -1
+
+    points = np.bincount(leg[hit], minlength=n)[:n]
+    step = hit[1:] & (leg[1:] == leg[:-1])
+    dist = haversine_nm(lat[:-1][step], lon[:-1][step], lat[1:][step], lon[1:][step])
+    gap = (times[1:][step] - times[:-1][step]) / 3600.0
+    owner = leg[1:][step]
+    distance = np.bincount(owner, weights=dist, minlength=n)[:n]
+    max_speed = np.full(n, -np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.maximum.at(max_speed, owner, np.where(gap > 0, dist / gap, 0.0))
+        avg_speed = np.where(points > 1, distance / hours, np.nan)
+    max_speed[np.isinf(max_speed)] = np.nan
+    return TripStats(points.astype(np.int64), distance, hours, avg_speed, max_speed)
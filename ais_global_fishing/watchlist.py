@@ -0,0 +1,294 @@
+"""
+watchlist.py
+
+Quota-aware polling of watch-listed vessels.
+
+:class:`WatchScheduler` keeps every watched vessel in a priority queue
+ordered by when it is next due.  Each :meth:`~WatchScheduler.tick` takes
+the vessels that are due, ranks them by staleness × risk and refreshes as
+many as the request budget allows.  Refreshes are batched: one
+``/events/<collection>`` request with a ``vesselIds`` filter covers up to
+*batch_size* vessels.  Events not seen before for a vessel are reported as
+:class:`Change` notifications.
+
+Example
+-------
+>>> scheduler = WatchScheduler(client, budget_per_minute=60, on_change=alert)
+>>> for vid in high_risk:
+...     scheduler.watch(vid, every=timedelta(hours=1), risk=5)
+>>> for vid in others:
+...     scheduler.watch(vid, every=timedelta(days=1))
+>>> scheduler.run()                     # until interrupted
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Iterable, Optional, TextIO
+
+from .ratelimit import TokenBucket
+from .records import first_of, page_records, vessel_id_of
+from .timewindow import to_utc
+
+DEFAULT_COLLECTIONS = ("fishing", "encounters", "loitering")
+
+
+@dataclass
+class Watch:
+    """Polling state of one watched vessel."""
+
+    vessel_id: str
+    every: float
+    risk: float = 1.0
+    due: float = 0.0
+    last_checked: Optional[float] = None
+    failures: int = 0
+    # event id -> event start (epoch seconds) of events already reported
+    seen: dict[str, float] = field(default_factory=dict)
+
+    def urgency(self, now: float) -> float:
+        """Staleness in units of the refresh interval, weighted by risk."""
+        if self.last_checked is None:
+            return float("inf")
+        return self.risk * (now - self.last_checked) / self.every
+
+
+@dataclass(frozen=True)
+class Change:
+    """A newly seen event of a watched vessel."""
+
+    vessel_id: str
+    collection: str
+    event: dict
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    errors: int = 0
+    refreshed: int = 0
+    changes: int = 0
+
+
+class WatchScheduler:
+    """
+    Refresh watched vessels within a fixed request budget.
+
+    Parameters
+    ----------
+    client
+        :class:`~ais_global_fishing.GFWClient` (or anything with
+        ``_get_event_collection``).
+    budget_per_minute
+        API requests the scheduler may spend per minute (token bucket with a
+        one-minute burst).
+    batch_size
+        Vessels per ``vesselIds`` filter.
+    collections
+        Event collections polled for every batch.
+    lookback
+        Window fetched for a vessel's first refresh; also how long event ids
+        are remembered.
+    overlap
+        How far before the previous refresh a window starts, so late events
+        are still caught.
+    on_change
+        Called with each :class:`Change`.
+    notify_initial
+        Report the events found by a vessel's first refresh (off by default:
+        they are history, not news).
+    clock
+        Epoch-seconds clock (``time.time``); injectable for tests.
+    bucket
+        Share an existing :class:`~ais_global_fishing.ratelimit.TokenBucket`
+        instead of creating one from *budget_per_minute*.
+    log
+        Where failed refreshes are reported (``None`` to stay silent); the
+        vessels of a failed batch are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        budget_per_minute: float = 60,
+        batch_size: int = 50,
+        collections: Iterable[str] = DEFAULT_COLLECTIONS,
+        lookback: timedelta = timedelta(days=7),
+        overlap: timedelta = timedelta(hours=6),
+        on_change: Optional[Callable[[Change], None]] = None,
+        notify_initial: bool = False,
+        clock: Callable[[], float] = time.time,
+        bucket: Optional[TokenBucket] = None,
+        log: Optional[TextIO] = sys.stderr,
+    ):
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be at least 1")
+        self.client = client
+        self.batch_size = batch_size
+        self.collections = tuple(collections)
+        self.lookback = lookback.total_seconds()
+        self.overlap = overlap.total_seconds()
+        self.on_change = on_change
+        self.notify_initial = notify_initial
+        self.clock = clock
+        self.bucket = bucket or TokenBucket(budget_per_minute / 60.0, burst=budget_per_minute)
+        if self.bucket.rate and self.bucket.capacity < len(self.collections):
+            raise ValueError(
+                f"a batch needs {len(self.collections)} requests but the budget holds at most "
+                f"{self.bucket.capacity:g}; raise the budget or poll fewer collections"
+            )
+        self.log = log
+        self.stats = SchedulerStats()
+        self._watches: dict[str, Watch] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Watch list
+    # ------------------------------------------------------------------ #
+    def watch(self, vessel_id: str, every: timedelta = timedelta(days=1), risk: float = 1.0) -> None:
+        """
+        Add *vessel_id* (or update its interval / risk); it is due at once
+        when new, and an updated interval applies from its last refresh.
+        """
+        with self._lock:
+            current = self._watches.get(vessel_id)
+            if current is not None:
+                current.every, current.risk = every.total_seconds(), risk
+                if current.last_checked is not None and not current.failures:
+                    due = current.last_checked + current.every
+                    if due != current.due:
+                        current.due = due
+                        self._push(current)
+                return
+            w = self._watches[vessel_id] = Watch(vessel_id, every.total_seconds(), risk, due=self.clock())
+            self._push(w)
+
+    def unwatch(self, vessel_id: str) -> None:
+        with self._lock:
+            self._watches.pop(vessel_id, None)
+
+    def __len__(self) -> int:
+        return len(self._watches)
+
+    def __contains__(self, vessel_id: str) -> bool:
+        return vessel_id in self._watches
+
+    def _push(self, w: Watch) -> None:
+        heapq.heappush(self._heap, (w.due, next(self._seq), w.vessel_id))
+
+    def next_due(self) -> Optional[float]:
+        """Epoch time at which the next vessel becomes due."""
+        with self._lock:
+            while self._heap:
+                due, _, vid = self._heap[0]
+                w = self._watches.get(vid)
+                if w is not None and w.due == due:
+                    return due
+                heapq.heappop(self._heap)  # stale entry
+        return None
+
+    # ------------------------------------------------------------------ #
+    # Polling
+    # ------------------------------------------------------------------ #
+    def _take_due(self, now: float) -> list[Watch]:
+        """Pop the due vessels the budget allows, most urgent first."""
+        with self._lock:
+            due: list[Watch] = []
+            while self._heap and self._heap[0][0] <= now:
+                when, _, vid = heapq.heappop(self._heap)
+                w = self._watches.get(vid)
+                if w is not None and w.due == when:
+                    due.append(w)
+
+            due.sort(key=lambda w: w.urgency(now), reverse=True)
+            batches = int(min(self.bucket.available, 1e9) // max(len(self.collections), 1))
+            chosen, deferred = due[: batches * self.batch_size], due[batches * self.batch_size :]
+            for w in deferred:
+                self._push(w)
+        return chosen
+
+    def tick(self) -> list[Change]:
+        """Refresh the vessels that are due (within budget); return the changes."""
+        now = self.clock()
+        chosen = self._take_due(now)
+        # Vessels with similar history share a window and hence a request.
+        chosen.sort(key=lambda w: w.last_checked or 0.0)
+        changes: list[Change] = []
+        for i in range(0, len(chosen), self.batch_size):
+            changes.extend(self._refresh(chosen[i : i + self.batch_size], now))
+        return changes
+
+    def _refresh(self, batch: list[Watch], now: float) -> list[Change]:
+        earliest = min((w.last_checked for w in batch if w.last_checked is not None), default=None)
+        start = now - self.lookback if earliest is None else max(earliest - self.overlap, now - self.lookback)
+        by_id = {w.vessel_id: w for w in batch}
+
+        pages = []
+        try:
+            for collection in self.collections:
+                self.bucket.acquire()
+                self.stats.requests += 1
+                page = self.client._get_event_collection(
+                    collection, start, now, vessel_ids=list(by_id), all_pages=True
+                )
+                pages.append((collection, page))
+        except Exception as exc:
+            self.stats.errors += 1
+            if self.log is not None:
+                print(f"[failed] refresh of {len(batch)} vessels: {exc}", file=self.log)
+            with self._lock:
+                for w in batch:
+                    w.failures += 1
+                    w.due = now + min(w.every, 60.0 * 2 ** (w.failures - 1))
+                    if w.vessel_id in self._watches:
+                        self._push(w)
+            return []
+
+        changes: list[Change] = []
+        for collection, page in pages:
+            for event in page_records(page):
+                if not isinstance(event, dict) or not event.get("id"):
+                    continue
+                for vid in {vessel_id_of(event), first_of(event, "encounter.vessel.id")}:
+                    w = by_id.get(vid)
+                    if w is None or event["id"] in w.seen:
+                        continue
+                    w.seen[event["id"]] = to_utc(event["start"]).timestamp() if event.get("start") else now
+                    if w.last_checked is not None or self.notify_initial:
+                        changes.append(Change(vid, collection, event))
+
+        horizon = now - self.lookback - self.overlap
+        with self._lock:
+            for w in batch:
+                w.seen = {eid: ts for eid, ts in w.seen.items() if ts >= horizon}
+                w.last_checked, w.failures = now, 0
+                w.due = now + w.every
+                if w.vessel_id in self._watches:
+                    self._push(w)
+        self.stats.refreshed += len(batch)
+        self.stats.changes += len(changes)
+
+        if self.on_change is not None:
+            for change in changes:
+                self.on_change(change)
+        return changes
+
+    def run(self, stop: Optional[threading.Event] = None, idle: float = 5.0) -> None:
+        """Poll until *stop* is set (or forever), sleeping while nothing is due."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.tick()
+            nxt = self.next_due()
+            wait = idle if nxt is None else min(idle, max(nxt - self.clock(), 0.0))
+            if self.bucket.rate:
+                wait = max(wait, min(idle, 1.0 / self.bucket.rate))
+            stop.wait(wait)
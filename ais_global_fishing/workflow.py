@@ -0,0 +1,256 @@
+"""
+workflow.py
+
+Declarative fetch plans for per-vessel analysis workflows.
+
+Scripts such as ``examples/example_usage.py`` walk the same chain every
+time – search → details → track → events → trips – each call waiting for
+the previous one, although only the search is a real dependency.  A
+:class:`Workflow` states the *products* wanted per vessel instead; its
+:meth:`~Workflow.run` plans the request graph and executes it on a thread
+pool:
+
+* every request whose inputs are known is issued at once,
+* the per-vessel requests of a search are issued as soon as that search
+  answers, not after all searches, and
+* requests go through the client's cache and in-flight de-duplication, so
+  repeated or overlapping plans cost nothing extra.
+
+End-to-end latency is therefore bounded by the critical path (one search
+plus the slowest product of a vessel) instead of the sum of all requests.
+:meth:`~Workflow.warm` runs a plan only to fill the client's cache ahead
+of the analysis that reads it.
+
+Example
+-------
+>>> flow = Workflow([DETAILS, TRACK, EVENTS, TRIPS], start="2024-03-01", end="2024-03-08")
+>>> result = flow.run(client, queries=["368045130"], vessel_ids=known_ids)
+>>> result.vessels[vid][TRACK]
+>>> result.elapsed, result.critical_path
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from .records import first_of, page_records
+from .timewindow import TimeLike
+
+SEARCH = "search"
+DETAILS = "details"
+TRACK = "track"
+EVENTS = "events"
+PORT_VISITS = "port_visits"
+TRIPS = "trips"
+RISK = "risk"
+
+PRODUCTS = (DETAILS, TRACK, EVENTS, PORT_VISITS, TRIPS, RISK)
+# Products that need the workflow's time window.
+WINDOWED = (TRACK, EVENTS, PORT_VISITS)
+
+DEFAULT_DATASETS = ("public-global-vessel-identity:latest",)
+
+
+@dataclass(frozen=True)
+class Step:
+    """
+    One request of a plan: *product* of vessel *target*, or the search for
+    query *target*.  *after* names the query a vessel was found by.
+    """
+
+    product: str
+    target: str
+    after: Optional[str] = None
+
+
+@dataclass
+class WorkflowResult:
+    """
+    Products by vessel id (``vessels[vid][product]``), the vessel ids each
+    query resolved to, and the error message of every failed step.
+
+    ``elapsed`` is the wall time of the run and ``critical_path`` the
+    longest chain of dependent request times in it – the lower bound the
+    run is measured against.
+    """
+
+    vessels: dict[str, dict[str, Any]] = field(default_factory=dict)
+    searches: dict[str, list[str]] = field(default_factory=dict)
+    errors: dict[Step, str] = field(default_factory=dict)
+    requests: int = 0
+    elapsed: float = 0.0
+    critical_path: float = 0.0
+
+
+def search_ids(page: Any, limit: Optional[int] = None) -> list[str]:
+    """Vessel ids of the first *limit* entries of a ``search_vessels`` page."""
+    ids = []
+    for entry in page_records(page)[:limit]:
+        info = entry.get("selfReportedInfo") if isinstance(entry, dict) else None
+        vid = info[0].get("id") if isinstance(info, list) and info and isinstance(info[0], dict) else None
+        vid = vid or first_of(entry, "id", "vesselId")
+        if vid:
+            ids.append(vid)
+    return ids
+
+
+class Workflow:
+    """
+    Products to fetch for every vessel of a run.  List products (events,
+    port visits, trips) are fetched with all of their pages.
+
+    Parameters
+    ----------
+    products
+        Any of :data:`PRODUCTS`.
+    start, end
+        Time window of the track, event and port-visit products.
+    resolution
+        Track resolution (see :meth:`GFWClient.get_track`).
+    event_types
+        Event types of the events product (default: all).
+    datasets
+        Identity datasets searched for queries.
+    matches
+        Search hits per query that become vessels of the run.
+    """
+
+    def __init__(
+        self,
+        products: Iterable[str],
+        *,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None,
+        resolution: str = "1h",
+        event_types: Optional[Iterable[str]] = None,
+        datasets: Iterable[str] = DEFAULT_DATASETS,
+        matches: int = 1,
+    ):
+        self.products = tuple(dict.fromkeys(products))
+        unknown = [p for p in self.products if p not in PRODUCTS]
+        if unknown:
+            raise ValueError(f"unknown products {unknown}; choose from {list(PRODUCTS)}")
+        if any(p in WINDOWED for p in self.products) and (start is None or end is None):
+            raise ValueError(f"start and end are required for {[p for p in self.products if p in WINDOWED]}")
+        self.start = start
+        self.end = end
+        self.resolution = resolution
+        self.event_types = list(event_types) if event_types else None
+        self.datasets = list(datasets)
+        self.matches = matches
+
+    def plan(self, vessel_ids: Iterable[str] = (), queries: Iterable[str] = ()) -> list[Step]:
+        """
+        The steps known before running: one per product of each vessel id
+        and one search per query.  The product steps of searched vessels
+        are added during :meth:`run`, once their search answers.
+        """
+        steps = [Step(SEARCH, q) for q in dict.fromkeys(queries)]
+        steps += [Step(p, vid) for vid in dict.fromkeys(vessel_ids) for p in self.products]
+        return steps
+
+    def _call(self, client, step: Step) -> Any:
+        target = step.target
+        if step.product == SEARCH:
+            return client.search_vessels(query=target, datasets=self.datasets, limit=self.matches)
+        if step.product == DETAILS:
+            return client.get_vessel_details(target)
+        if step.product == TRACK:
+            return client.get_track(target, self.start, self.end, resolution=self.resolution)
+        if step.product == EVENTS:
+            return client.get_events(target, self.start, self.end, event_types=self.event_types, all_pages=True)
+        if step.product == PORT_VISITS:
+            return client.get_port_visits(self.start, self.end, vessel_ids=[target], all_pages=True)
+        if step.product == TRIPS:
+            return client.get_trips(target, all_pages=True)
+        return client.get_risk(target)
+
+    def _timed(self, client, step: Step) -> tuple[Any, Optional[Exception], float]:
+        started = time.perf_counter()
+        try:
+            value, error = self._call(client, step), None
+        except Exception as exc:
+            value, error = None, exc
+        return value, error, time.perf_counter() - started
+
+    def run(
+        self,
+        client,
+        vessel_ids: Iterable[str] = (),
+        queries: Iterable[str] = (),
+        *,
+        workers: int = 8,
+        keep: bool = True,
+    ) -> WorkflowResult:
+        """
+        Execute the plan for *vessel_ids* and the vessels found by *queries*
+        with up to *workers* requests in flight.
+
+        Failed steps are reported in :attr:`WorkflowResult.errors` and do
+        not stop the run; a failed search simply adds no vessels.  With
+        ``keep=False`` responses are not retained (see :meth:`warm`).
+        Share *client* between threads safely by creating it with
+        ``thread_safe=True``.
+        """
+        if workers < 1:
+            raise ValueError("'workers' must be >= 1")
+        result = WorkflowResult()
+        scheduled: set[tuple[str, str]] = set()
+        search_time: dict[str, float] = {}
+        began = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending: dict = {}
+
+            def submit(steps: Iterable[Step]) -> None:
+                for step in steps:
+                    if step.product != SEARCH:
+                        if (step.target, step.product) in scheduled:
+                            continue
+                        scheduled.add((step.target, step.product))
+                        result.vessels.setdefault(step.target, {})
+                    pending[pool.submit(self._timed, client, step)] = step
+
+            submit(self.plan(vessel_ids, queries))
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = pending.pop(future)
+                    value, error, seconds = future.result()
+                    result.requests += 1
+                    if error is not None:
+                        result.errors[step] = str(error) or type(error).__name__
+                    if step.product == SEARCH:
+                        found = search_ids(value, self.matches) if error is None else []
+                        result.searches[step.target] = found
+                        search_time[step.target] = seconds
+                        submit(Step(p, vid, step.target) for vid in found for p in self.products)
+                        continue
+                    if error is None and keep:
+                        result.vessels[step.target][step.product] = value
+                    chain = seconds + search_time.get(step.after, 0.0)
+                    result.critical_path = max(result.critical_path, chain)
+
+        result.critical_path = max([result.critical_path, *search_time.values()])
+        result.elapsed = time.perf_counter() - began
+        return result
+
+    def warm(
+        self,
+        client,
+        vessel_ids: Iterable[str] = (),
+        queries: Iterable[str] = (),
+        *,
+        workers: int = 8,
+    ) -> WorkflowResult:
+        """
+        Run the plan only to fill *client*'s cache, so that a later
+        analysis making the same calls is answered locally.  Responses are
+        not retained; the result reports requests, errors and timings.
+        """
+        if getattr(client, "cache", None) is None:
+            raise ValueError("warming needs a client with a cache")
+        return self.run(client, vessel_ids, queries, workers=workers, keep=False)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+benchmark_fields.py
+
+Measure what a ``fields=`` projection saves on identity look-ups: bytes on
+the wire (as counted by ``client.transfer``), the decoded body, JSON decode
+time and the size of what the caller keeps.  Runs
+against the local mock gateway, so no API key or quota is needed.
+
+Run with:
+    uv run python examples/benchmark_fields.py
+"""
+
+import json
+import time
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.mockserver import serve_in_thread
+
+IDS = [f"mock-vessel-{i:04d}" for i in range(200)]
+ALL_SECTIONS = ["OWNERSHIP", "AUTHORIZATIONS", "MATCH_CRITERIA"]
+FIELDS = [
+    "selfReportedInfo.id",
+    "selfReportedInfo.shipname",
+    "selfReportedInfo.flag",
+    "combinedSourcesInfo.geartypes.name",
+]
+ROUNDS = 20
+
+
+class CountingTransport:
+    """Wraps a transport and keeps the raw body of the last response."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.body = b""
+
+    def get(self, url, params):
+        resp = self.inner.get(url, params)
+        self.body = resp.content
+        return resp
+
+    def head(self, url):
+        return self.inner.head(url)
+
+
+def measure(client, transport, **options):
+    client.transfer.reset()
+    result = client.get_vessels_bulk(IDS, **options)
+    wire = client.transfer.total().wire_bytes
+    body = transport.body
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        json.loads(body)
+    decode_ms = (time.perf_counter() - started) / ROUNDS * 1000
+    return wire, len(body), decode_ms, len(json.dumps(result))
+
+
+def main():
+    with serve_in_thread(port=0) as server:
+        client = GFWClient(api_key="benchmark", base_url=server.base_url)
+        transport = client.transport = CountingTransport(client.transport)
+
+        full = measure(client, transport, includes=ALL_SECTIONS)
+        lean = measure(client, transport, includes=ALL_SECTIONS, fields=FIELDS)
+
+    print(f"{len(IDS)} vessels, fields: {', '.join(FIELDS)}\n")
+    print(f"{'':14}{'full':>12}{'fields=':>12}{'saved':>8}")
+    for label, a, b, fmt in (
+        ("wire bytes", full[0], lean[0], "{:>12,}"),
+        ("decoded bytes", full[1], lean[1], "{:>12,}"),
+        ("decode (ms)", full[2], lean[2], "{:>12.2f}"),
+        ("kept bytes", full[3], lean[3], "{:>12,}"),
+    ):
+        print(f"{label:14}{fmt.format(a)}{fmt.format(b)}{1 - b / a:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ from collections import Counter
 from tabulate import tabulate
 
 from ais_global_fishing import GFWClient
+from ais_global_fishing.timeline import build_timeline
 
 
 def main():
@@ -63,25 +64,16 @@ def main():
             table_data = []
             headers = ["Port Name", "Country", "Start Date", "End Date", "Duration (hours)"]
             
-            for visit in visit_entries:
-                port_name = visit.get("portName", "Unknown")
-                country = visit.get("country", "Unknown")
-                start_time = visit.get("startTime", "Unknown")
-                end_time = visit.get("endTime", "Unknown")
-                
-                # Calculate duration in hours if timestamps are available
-                duration = "Unknown"
-                if isinstance(start_time, str) and isinstance(end_time, str):
-                    try:
-                        start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                        end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                        duration_hours = round((end_dt - start_dt).total_seconds() / 3600, 1)
-                        duration = f"{duration_hours} hours"
-                    except:
-                        pass
-                
-                table_data.append([port_name, country, start_time, end_time, duration])
-            
+            # Parse all timestamps at once; missing / malformed ones become NaT
+            timeline = build_timeline([vessel_visits], vessel_id=vessel_id)
+            durations = timeline.duration_hours().round(1)
+
+            for name, country, start, end, hours in zip(
+                timeline.port_name, timeline.country, timeline.start, timeline.end, durations
+            ):
+                duration = "Unknown" if hours != hours else f"{hours} hours"
+                table_data.append([name or "Unknown", country or "Unknown", start, end, duration])
+
             print("\nPort visits for this vessel:")
             print(tabulate(table_data, headers=headers, tablefmt="grid"))
             
@@ -160,25 +152,15 @@ def main():
             table_data = []
             headers = ["From Port", "To Port", "Departure", "Arrival", "Duration (days)"]
             
-            for trip in trip_entries:
-                from_port = trip.get("fromPortName", "Unknown")
-                to_port = trip.get("toPortName", "Unknown")
-                departure = trip.get("departureTime", "Unknown")
-                arrival = trip.get("arrivalTime", "Unknown")
-                
-                # Calculate duration in days if timestamps are available
-                duration = "Unknown"
-                if isinstance(departure, str) and isinstance(arrival, str):
-                    try:
-                        departure_dt = datetime.fromisoformat(departure.replace('Z', '+00:00'))
-                        arrival_dt = datetime.fromisoformat(arrival.replace('Z', '+00:00'))
-                        duration_days = round((arrival_dt - departure_dt).total_seconds() / 86400, 1)
-                        duration = f"{duration_days} days"
-                    except:
-                        pass
-                
-                table_data.append([from_port, to_port, departure, arrival, duration])
-            
+            legs = build_timeline([trips], vessel_id=vessel_id).trip_legs()
+            days = (legs.duration_hours() / 24).round(1)
+
+            for from_port, to_port, departure, arrival, duration in zip(
+                legs.origin_name, legs.destination_name, legs.depart, legs.arrive, days
+            ):
+                duration = "Unknown" if duration != duration else f"{duration} days"
+                table_data.append([from_port or "Unknown", to_port or "Unknown", departure, arrival, duration])
+
             print("\nTrips for this vessel:")
             print(tabulate(table_data[:5], headers=headers, tablefmt="grid"))
             print(f"(Showing 5 of {len(trip_entries)} trips)")
@@ -32,6 +32,7 @@ def main():
         datasets=["public-global-vessel-identity:latest"],
         binary=False,
         limit=3,
+        fields=["registryInfo.shipname", "name"],  # only what is printed below
     )
     print(f"Found {len(res_flag.get('entries', []))} Chinese vessels (showing first 3):")
     
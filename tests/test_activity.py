@@ -0,0 +1,138 @@
+"""
+Tests for the incremental activity cache.
+"""
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ais_global_fishing import mockserver
+from ais_global_fishing.activity import ActivityCache, ActivityStore, merge_intervals, missing_intervals
+from ais_global_fishing.timewindow import to_utc
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeClient:
+    """
+    Serves the mock gateway's synthetic events / tracks and logs every
+    window.  Events come in pages of *page_size*; only the first one unless
+    ``all_pages=True``.
+    """
+
+    def __init__(self, page_size=3):
+        self.calls = []
+        self.page_size = page_size
+
+    def get_events(self, vessel_id, start, end, event_types=None, *, all_pages=False):
+        self.calls.append(("events", start, end))
+        lo, hi = to_utc(start).timestamp(), to_utc(end).timestamp()
+        kinds = [k.lower() for k in event_types] if event_types else ["fishing", "port_visit"]
+        entries = [e for k in kinds for e in mockserver.vessel_events(k, vessel_id, 7, lo, hi)]
+        if all_pages or len(entries) <= self.page_size:
+            return {"entries": entries, "total": len(entries), "nextOffset": None}
+        return {"entries": entries[: self.page_size], "total": len(entries), "nextOffset": self.page_size}
+
+    def get_track(self, vessel_id, start, end, resolution="1h"):
+        self.calls.append(("track", start, end))
+        return mockserver._track(vessel_id, 7, to_utc(start).timestamp(), to_utc(end).timestamp(), resolution)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def setup():
+    client, clock = FakeClient(), Clock(T0 + timedelta(days=30))
+    return client, clock, ActivityCache(client, overlap=timedelta(hours=6), clock=clock)
+
+
+class TestActivity:
+    """Test suite for ActivityStore and ActivityCache."""
+
+    def test_interval_helpers(self):
+        """Intervals merge when touching; gaps are what is left of the query."""
+        assert merge_intervals([(5, 7), (0, 2), (2, 3)]) == [(0, 3), (5, 7)]
+        assert missing_intervals(0, 10, [(2, 3), (5, 7)]) == [(0, 2), (3, 5), (7, 10)]
+        assert missing_intervals(4, 6, [(0, 10)]) == []
+
+    def test_repeat_query_is_served_locally(self, setup):
+        """A second identical query does not hit the API and returns the same data."""
+        client, clock, cache = setup
+        first = cache.events("v1", T0, T0 + timedelta(days=30))
+        second = cache.events("v1", T0, T0 + timedelta(days=30))
+
+        assert first == second
+        assert first["total"] > client.page_size
+        assert first["total"] == client.get_events("v1", T0, T0 + timedelta(days=30), all_pages=True)["total"]
+        assert len(client.calls) == 2
+
+    def test_trailing_window_fetches_only_delta(self, setup):
+        """Polling a moving window fetches from (previous end - overlap) to now."""
+        client, clock, cache = setup
+        cache.events("v1", clock.now - timedelta(days=30), clock.now)
+
+        clock.now += timedelta(minutes=5)
+        polled = cache.events("v1", clock.now - timedelta(days=30), clock.now)
+
+        _, start, end = client.calls[-1]
+        assert end - start == timedelta(hours=6, minutes=5)
+        direct = client.get_events("v1", clock.now - timedelta(days=30), clock.now, all_pages=True)
+        assert sorted(e["id"] for e in polled["entries"]) == sorted(e["id"] for e in direct["entries"])
+
+    def test_refetched_records_are_replaced(self, setup):
+        """Records inside the overlap are upserted, not duplicated."""
+        client, clock, cache = setup
+        cache.track("v1", T0, clock.now)
+        held = len(cache.track("v1", T0, clock.now)["features"])
+
+        clock.now += timedelta(hours=2)
+        features = cache.track("v1", T0, clock.now)["features"]
+
+        assert len(features) == held + 2
+        stamps = [f["properties"]["timestamp"] for f in features]
+        assert stamps == sorted(set(stamps))
+
+    def test_coverage_stops_at_now(self, setup):
+        """Windows reaching into the future are only marked covered up to now."""
+        client, clock, cache = setup
+        cache.events("v1", T0, clock.now + timedelta(days=1))
+
+        assert cache.store.coverage("v1", "events:*") == [(T0.timestamp(), clock.now.timestamp())]
+        cache.events("v1", T0, clock.now + timedelta(days=1))
+        assert len(client.calls) == 2
+
+    def test_kinds_are_separate(self, setup):
+        """Different event-type filters keep separate coverage."""
+        client, clock, cache = setup
+        cache.events("v1", T0, T0 + timedelta(days=10), event_types=["FISHING"])
+        cache.events("v1", T0, T0 + timedelta(days=10), event_types=["FISHING", "PORT_VISIT"])
+        cache.events("v1", T0, T0 + timedelta(days=10), event_types=["PORT_VISIT", "FISHING"])
+
+        assert len(client.calls) == 2
+
+    def test_store_persists(self, tmp_path):
+        """Coverage and records survive reopening the database."""
+        path = tmp_path / "activity.sqlite"
+        with ActivityStore(path) as store:
+            store.merge("v1", "events:*", (0.0, 10.0), [("e1", 5.0, {"id": "e1"})])
+        with ActivityStore(path) as store:
+            assert store.coverage("v1", "events:*") == [(0.0, 10.0)]
+            assert store.records("v1", "events:*", 0.0, 10.0) == [{"id": "e1"}]
+            store.invalidate("v1")
+            assert store.missing("v1", "events:*", 0.0, 10.0) == [(0.0, 10.0)]
+
+    def test_failed_merge_rolls_back(self):
+        """A failing write leaves nothing behind and the store usable."""
+        store = ActivityStore()
+        with pytest.raises(sqlite3.IntegrityError):
+            store.merge("v1", "events:*", (0.0, 10.0), [("e1", 5.0, {"id": "e0"}), ("e2", None, {"id": "e2"})])
+        assert store.coverage("v1", "events:*") == []
+        assert store.records("v1", "events:*", 0.0, 10.0) == []
+        store.merge("v1", "events:*", (0.0, 10.0), [("e1", 5.0, {"id": "e1"})])
+        assert store.records("v1", "events:*", 0.0, 10.0) == [{"id": "e1"}]
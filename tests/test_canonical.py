@@ -0,0 +1,55 @@
+"""
+Tests for the canonical request encoding.
+"""
+from datetime import datetime, timedelta, timezone
+
+from ais_global_fishing.canonical import Request, canonical_params, format_time, joined_groups, request_key
+
+
+class TestCanonical:
+    """Test suite for canonical_params and request keys."""
+
+    def test_indexed_lists_sorted_and_deduplicated(self):
+        """ids[i] / includes[i] are re-indexed in sorted order."""
+        params = {"ids[0]": "b", "ids[1]": "a", "ids[2]": "b", "includes[0]": "OWNERSHIP"}
+
+        assert canonical_params(params) == {"ids[0]": "a", "ids[1]": "b", "includes[0]": "OWNERSHIP"}
+
+    def test_joined_lists_sorted_and_deduplicated(self):
+        """Comma-joined filters are normalised too."""
+        assert canonical_params({"eventType": "PORT_VISIT,FISHING,FISHING"}) == {
+            "eventType": "FISHING,PORT_VISIT"
+        }
+
+    def test_joined_groups_respect_limits(self):
+        """Groups are canonical and bounded by item count and length."""
+        ids = [f"v{i:02d}" for i in range(10)] + ["v00"]
+
+        assert joined_groups(ids, max_items=4, max_chars=100) == [
+            "v00,v01,v02,v03", "v04,v05,v06,v07", "v08,v09",
+        ]
+        assert joined_groups(ids, max_items=100, max_chars=8) == [
+            "v00,v01", "v02,v03", "v04,v05", "v06,v07", "v08,v09",
+        ]
+        assert joined_groups(["much-too-long"], max_items=5, max_chars=4) == ["much-too-long"]
+        assert joined_groups(None, max_items=5, max_chars=4) == []
+
+    def test_timestamps_normalised_to_utc(self):
+        """Offsets, naive values and the broken '+00:00Z' form agree."""
+        cet = timezone(timedelta(hours=1))
+        expected = "2024-01-01T00:00:00Z"
+
+        assert format_time(datetime(2024, 1, 1)) == expected
+        assert format_time(datetime(2024, 1, 1, 1, tzinfo=cet)) == expected
+        assert format_time("2024-01-01T00:00:00+00:00Z") == expected
+        assert format_time("2024-01-01T00:00:00Z") == expected
+
+    def test_equal_queries_share_a_key(self):
+        """Semantically equal requests hash the same, different ones do not."""
+        a = request_key("/vessels", {"ids[0]": "v2", "ids[1]": "v1", "binary": "FALSE"})
+        b = request_key("/vessels", {"binary": "FALSE", "ids[0]": "v1", "ids[1]": "v2"})
+        c = request_key("/vessels", {"ids[0]": "v1"})
+
+        assert a == b
+        assert a != c
+        assert Request.of("/vessels", {"ids[0]": "v1"}) == Request.of("/vessels", {"ids[0]": "v1", "ids[1]": "v1"})
@@ -2,6 +2,8 @@
 Tests for the CLI functionality.
 """
 import argparse
+import json
+from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -27,6 +29,154 @@ class TestCLI:
         subparser_choices = subparsers[0].choices
         assert "search" in subparser_choices
         assert "details" in subparser_choices
+        for name in ("track", "events", "port-visits", "encounters", "trips", "risk"):
+            assert name in subparser_choices
+
+    def test_track_export_shards_and_resumes(self, tmp_path, capsys):
+        """The track command shards the window and resumes from its checkpoint."""
+        mock_client = MagicMock()
+        mock_client.get_track.return_value = {"features": [{"type": "Feature"}]}
+        output = tmp_path / "track.jsonl"
+        argv = [
+            "track", "v1", "--start", "2024-01-01", "--end", "2024-03-01",
+            "--shard-days", "30", "-o", str(output),
+        ]
+
+        with patch("ais_global_fishing.__main__.GFWClient", return_value=mock_client):
+            args = build_parser().parse_args(argv)
+            args.func(args)
+
+            assert mock_client.get_track.call_count == 2
+            rows = [json.loads(line) for line in output.read_text().splitlines()]
+            assert rows == [{"type": "Feature", "vesselId": "v1"}] * 2
+
+            args = build_parser().parse_args(argv + ["--resume"])
+            args.func(args)
+
+        assert mock_client.get_track.call_count == 2
+        assert len(output.read_text().splitlines()) == 2
+        assert "2 skipped" in capsys.readouterr().err
+
+    def test_shard_days_must_not_be_negative(self, capsys):
+        """A negative or non-numeric --shard-days is a usage error, 0 a single shard."""
+        argv = ["track", "v1", "--start", "2024-01-01", "--end", "2024-03-01", "--shard-days"]
+        for bad in ("-1", "x"):
+            with pytest.raises(SystemExit) as exc:
+                build_parser().parse_args(argv + [bad])
+            assert exc.value.code == 2
+        assert "--shard-days" in capsys.readouterr().err
+        assert build_parser().parse_args(argv + ["0"]).shard_days == 0
+
+    def test_port_visits_command(self, tmp_path):
+        """port-visits forwards the window and filters to the client."""
+        mock_client = MagicMock()
+        mock_client.get_port_visits.return_value = {"entries": [{"id": "pv1"}]}
+        output = tmp_path / "visits.jsonl"
+
+        with patch("ais_global_fishing.__main__.GFWClient", return_value=mock_client):
+            args = build_parser().parse_args([
+                "port-visits", "--start", "2024-01-01", "--end", "2024-01-15",
+                "--vessel", "v1", "--port", "p1", "-o", str(output),
+            ])
+            args.func(args)
+
+        mock_client.get_port_visits.assert_called_once_with(
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 15, tzinfo=timezone.utc),
+            ["v1"],
+            ["p1"],
+            all_pages=True,
+        )
+        assert json.loads(output.read_text()) == {"id": "pv1"}
+
+    def test_resume_drops_partial_shard(self, tmp_path):
+        """Output after the last checkpointed shard is truncated on --resume."""
+        mock_client = MagicMock()
+        mock_client.get_trips.side_effect = lambda vid, all_pages: {"entries": [{"id": f"{vid}-t1"}]}
+        output = tmp_path / "trips.jsonl"
+        argv = ["trips", "v1", "v2", "-o", str(output), "--workers", "1"]
+
+        with patch("ais_global_fishing.__main__.GFWClient", return_value=mock_client):
+            args = build_parser().parse_args(argv)
+            args.func(args)
+            # Simulate a crash while v2 was being written: forget it, keep half a line.
+            checkpoint = tmp_path / "trips.jsonl.checkpoint"
+            checkpoint.write_text(checkpoint.read_text().splitlines()[0] + "\n")
+            with output.open("a") as fh:
+                fh.write('{"id": "v2-')
+
+            args = build_parser().parse_args(argv + ["--resume"])
+            args.func(args)
+
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted(row["id"] for row in rows) == ["v1-t1", "v2-t1"]
+
+    def test_risk_command_reads_exports(self, tmp_path, capsys):
+        """risk takes ids from a port-visits export, de-duplicated, as CSV."""
+        mock_client = MagicMock()
+        mock_client.get_risk.side_effect = lambda vid: {"score": 0.1, "iuuListed": False, "indicators": {}}
+        export = tmp_path / "visits.jsonl"
+        export.write_text('{"id": "pv1", "vessel": {"id": "v1"}}\n{"id": "pv2", "vessel": {"id": "v1"}}\n')
+        output = tmp_path / "risk.csv"
+
+        with patch("ais_global_fishing.__main__.GFWClient", return_value=mock_client):
+            args = build_parser().parse_args(["risk", "v2", "--input", str(export), "-o", str(output)])
+            args.func(args)
+
+        assert sorted(c.args[0] for c in mock_client.get_risk.call_args_list) == ["v1", "v2"]
+        assert output.read_text().splitlines()[0] == "vesselId,score,iuuListed,cached,error"
+        assert "2 vessels screened" in capsys.readouterr().err
+
+    def test_sql_command(self, tmp_path, capsys):
+        """sql loads an export and writes the query result as CSV."""
+        export = tmp_path / "visits.jsonl"
+        export.write_text(
+            '{"id": "pv1", "vessel": {"id": "v1"}, "start": "2024-05-01T00:00:00.000Z", "portName": "VIGO", "country": "ESP"}\n'
+            '{"id": "pv2", "vessel": {"id": "v2"}, "start": "2024-05-02T00:00:00.000Z", "portName": "BREST", "country": "FRA"}\n'
+        )
+        database = str(tmp_path / "lake.sqlite")
+
+        args = build_parser().parse_args(["sql", database, "--load", f"port_visits={export}"])
+        args.func(args)
+        args = build_parser().parse_args(["sql", database, "SELECT vessel_id, port_name FROM port_visits WHERE country = 'ESP'"])
+        args.func(args)
+
+        captured = capsys.readouterr()
+        assert captured.out.splitlines() == ["vessel_id,port_name", "v1,VIGO"]
+        assert "2 rows loaded into port_visits" in captured.err
+
+    def test_profile_command(self, tmp_path, capsys):
+        """`profile` runs a sub-command and reports where its time went."""
+        from ais_global_fishing.gfw_client_lib import GFWClient
+        from ais_global_fishing.mockserver import serve_in_thread
+
+        output, profile = tmp_path / "trips.jsonl", tmp_path / "run.speedscope.json"
+        with serve_in_thread(latency="fixed:0.02") as server:
+            make = lambda: GFWClient(api_key="test", base_url=server.base_url)  # noqa: E731
+            with patch("ais_global_fishing.__main__.GFWClient", side_effect=make):
+                argv = ["profile", "--speedscope", str(profile), "--", "trips", "v1", "v2", "-o", str(output)]
+                args = build_parser().parse_args(argv)
+                args.func(args)
+
+        err = capsys.readouterr().err
+        assert "trips v1 v2 -o" in err and "vessels/trips (2)" in err and "ttfb" in err
+        assert "\n  trips " in err and "build" in err
+        assert len(output.read_text().splitlines()) > 0
+        document = json.loads(profile.read_text())
+        assert document["profiles"][0]["name"] == "requests"
+
+        with pytest.raises(SystemExit):
+            args = build_parser().parse_args(["profile"])
+            args.func(args)
+
+    def test_profile_reports_failed_workload(self, capsys):
+        """The report is printed even when the workload raises."""
+        with patch("ais_global_fishing.__main__.GFWClient", side_effect=RuntimeError("no key")):
+            args = build_parser().parse_args(["profile", "--", "trips", "v1"])
+            with pytest.raises(RuntimeError):
+                args.func(args)
+
+        assert "trips v1:" in capsys.readouterr().err
 
     def test_cmd_search_success(self, capsys):
         """Test successful search command."""
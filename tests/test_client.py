@@ -1,7 +1,10 @@
 """
 Tests for the GFWClient class.
 """
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -9,6 +12,7 @@ import requests
 from requests.exceptions import HTTPError
 
 from ais_global_fishing import GFWClient
+from ais_global_fishing.records import PartialResultError
 
 
 class TestGFWClient:
@@ -139,10 +143,131 @@ class TestGFWClient:
         call_args = mock_session.get.call_args
         assert "/vessels/vessel1" in call_args[0][0]
         # Check that the includes parameter was properly formatted
+        # (comma-joined in canonical, sorted order)
         params = call_args[1]['params']
-        assert params['includes'] == 'OWNERSHIP,AUTHORIZATIONS'
+        assert params['includes'] == 'AUTHORIZATIONS,OWNERSHIP'
         assert result == expected_result
 
+    def test_get_vessels_bulk_canonical_order(self, client):
+        """IDs and includes are sorted and de-duplicated."""
+        client_obj, mock_session = client
+
+        client_obj.get_vessels_bulk(["v2", "v1", "v2"], includes=["OWNERSHIP", "MATCH_CRITERIA"])
+
+        params = mock_session.get.call_args[1]['params']
+        assert params == {
+            "ids[0]": "v1",
+            "ids[1]": "v2",
+            "includes[0]": "MATCH_CRITERIA",
+            "includes[1]": "OWNERSHIP",
+        }
+
+    def test_concurrent_identical_requests_are_coalesced(self, client):
+        """Two threads asking the same question share one HTTP call."""
+        client_obj, mock_session = client
+        release = threading.Event()
+
+        def slow_get(url, params):
+            release.wait(5)
+            response = MagicMock()
+            response.json.return_value = {"entries": []}
+            return response
+
+        mock_session.get.side_effect = slow_get
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(client_obj.get_events, "v1", datetime(2024, 1, 1), datetime(2024, 2, 1), ["FISHING", "PORT_VISIT"])
+            time.sleep(0.05)
+            second = pool.submit(client_obj.get_events, "v1", datetime(2024, 1, 1), datetime(2024, 2, 1), ["PORT_VISIT", "FISHING"])
+            time.sleep(0.05)
+            release.set()
+            assert first.result() is second.result()
+
+        assert mock_session.get.call_count == 1
+
+    def test_long_id_filters_are_split_and_merged(self, client):
+        """Large vesselIds filters become several requests merged in time order."""
+        client_obj, mock_session = client
+        client_obj.MAX_FILTER_IDS = 2
+
+        def fake_get(url, params):
+            ids = params["vesselIds"].split(",")
+            response = MagicMock()
+            response.json.return_value = {
+                "entries": [
+                    {"id": "shared", "start": "2024-01-01T00:00:00Z"},
+                    *({"id": vid, "start": f"2024-01-0{9 - int(vid[1])}T00:00:00Z"} for vid in ids),
+                ]
+            }
+            return response
+
+        mock_session.get.side_effect = fake_get
+        result = client_obj.get_encounters("2024-01-01", "2024-02-01", vessel_ids=["v5", "v1", "v3", "v2", "v4"])
+
+        sent = sorted(call[1]["params"]["vesselIds"] for call in mock_session.get.call_args_list)
+        assert sent == ["v1,v2", "v3,v4", "v5"]
+        assert [e["id"] for e in result["entries"]] == ["shared", "v5", "v4", "v3", "v2", "v1"]
+        assert result["total"] == 6
+
+    def test_split_filter_isolates_group_errors(self, client):
+        """A failing group raises with the other groups' data, or is reported on opt-in."""
+        client_obj, mock_session = client
+        client_obj.MAX_FILTER_IDS = 1
+
+        def fake_get(url, params):
+            response = MagicMock()
+            if params["vesselIds"] == "bad":
+                response.raise_for_status.side_effect = HTTPError("414 Client Error")
+            response.json.return_value = {"entries": [{"id": params["vesselIds"], "start": "2024-01-01T00:00:00Z"}]}
+            return response
+
+        mock_session.get.side_effect = fake_get
+        with pytest.raises(PartialResultError) as raised:
+            client_obj.get_port_visits("2024-01-01", "2024-02-01", vessel_ids=["good", "bad"])
+        assert [e["id"] for e in raised.value.page["entries"]] == ["good"]
+        assert raised.value.errors == [{"params": {"vesselIds": "bad"}, "error": "414 Client Error"}]
+
+        result = client_obj.get_port_visits("2024-01-01", "2024-02-01", vessel_ids=["good", "bad"], partial_ok=True)
+        assert [e["id"] for e in result["entries"]] == ["good"]
+        assert result["errors"] == raised.value.errors
+
+        with pytest.raises(HTTPError):
+            client_obj.get_port_visits("2024-01-01", "2024-02-01", vessel_ids=["bad"])
+
+    def test_fields_projection(self, client):
+        """fields= narrows the requested includes and prunes every entry."""
+        client_obj, mock_session = client
+        mock_session.get.return_value.json.return_value = {
+            "entries": [
+                {
+                    "selfReportedInfo": [{"id": "v1", "shipname": "A", "ssvid": "1"}],
+                    "registryOwners": [{"name": "OWNER", "flag": "ESP"}],
+                    "registryInfo": [{"imo": "9"}],
+                }
+            ],
+            "total": 1,
+            "nextOffset": None,
+        }
+
+        result = client_obj.search_vessels(
+            query="A",
+            includes=["OWNERSHIP", "MATCH_CRITERIA"],
+            fields=["selfReportedInfo.shipname", "registryOwners.name"],
+        )
+
+        params = mock_session.get.call_args[1]["params"]
+        assert [v for k, v in params.items() if k.startswith("includes")] == ["OWNERSHIP"]
+        assert result == {
+            "entries": [{"selfReportedInfo": [{"shipname": "A"}], "registryOwners": [{"name": "OWNER"}]}],
+            "total": 1,
+            "nextOffset": None,
+        }
+
+        client_obj.get_vessel_details("v1", includes=["OWNERSHIP"], fields=["selfReportedInfo"])
+        assert "includes" not in mock_session.get.call_args[1]["params"]
+
+        lazy = client_obj.search_vessels(query="A", fields=(f for f in ["registryOwners.flag"]))
+        assert lazy["entries"] == [{"registryOwners": [{"flag": "ESP"}]}]
+
     def test_get_track(self, client):
         """Test get_track method."""
         client_obj, mock_session = client
@@ -172,6 +297,20 @@ class TestGFWClient:
         assert params['resolution'] == '2h'
         assert result == expected_result
 
+    def test_timezone_aware_window_encoding(self, client):
+        """Aware datetimes are converted to UTC and never sent as '+00:00Z'."""
+        client_obj, mock_session = client
+        cet = timezone(timedelta(hours=1))
+
+        client_obj.get_port_visits(
+            start=datetime(2024, 1, 1, 1, tzinfo=cet),
+            end=datetime(2024, 1, 31, tzinfo=timezone.utc),
+        )
+
+        params = mock_session.get.call_args[1]['params']
+        assert params['start'] == '2024-01-01T00:00:00Z'
+        assert params['end'] == '2024-01-31T00:00:00Z'
+
     def test_get_track_endpoint_not_found(self, client):
         """Test get_track when endpoint does not exist."""
         client_obj, mock_session = client
@@ -186,3 +325,80 @@ class TestGFWClient:
                 start=start,
                 end=end
             )
+
+
+class TestSharedClient:
+    """Test suite for sharing one client between worker threads."""
+
+    def test_cache_serves_repeats(self):
+        """With a cache, a repeated request is answered without the transport."""
+        from ais_global_fishing.cache import TTLCache
+        from tests.test_transport import FakeTransport
+
+        transport = FakeTransport()
+        client = GFWClient(api_key="test", transport=transport, cache=TTLCache(60))
+        first = client.get_trips("v1")
+        assert client.get_trips("v1") is first
+        assert transport.calls == 1
+
+        fresh = client.clone(cache=None).get_trips("v1")
+        assert fresh["n"] == 2
+        assert client.get_trips("v1") is first
+
+    def test_bucket_paces_requests(self):
+        """Every request spends a token of the shared bucket."""
+        from ais_global_fishing.ratelimit import TokenBucket
+        from tests.test_transport import FakeTransport
+
+        bucket = TokenBucket(1000, burst=3)
+        client = GFWClient(api_key="test", transport=FakeTransport(), bucket=bucket)
+        for vessel in ("a", "b", "c"):
+            client.get_trips(vessel)
+        assert bucket.available < 1
+        assert client.clone().bucket is bucket
+
+    def test_clone_shares_state(self):
+        """Clones share session, limits and counters; a new base URL gets its own in-flight table."""
+        client = GFWClient(api_key="test")
+        same = client.clone()
+        assert same.session is client.session
+        assert same.concurrency is client.concurrency
+        assert same.transfer is client.transfer
+        assert same._inflight is client._inflight
+
+        staging = client.clone(base_url="http://staging.example/v3")
+        assert staging.base_url == "http://staging.example/v3"
+        assert client.base_url == GFWClient.DEFAULT_BASE_URL
+        assert staging._inflight is not client._inflight
+
+    def test_dotenv_loaded_once(self):
+        """The .env file is read by the first client only."""
+        from ais_global_fishing import gfw_client_lib
+
+        with patch.object(gfw_client_lib, "_LOADED_DOTENV", set()), \
+             patch("ais_global_fishing.gfw_client_lib.load_dotenv") as load, \
+             patch("ais_global_fishing.gfw_client_lib.os.getenv", return_value="env_key"):
+            GFWClient()
+            GFWClient()
+        load.assert_called_once()
+
+    def test_thread_safe_client_against_mock(self):
+        """One thread-safe client serves many threads over one connection pool."""
+        from ais_global_fishing.mockserver import serve_in_thread
+        from ais_global_fishing.transport import ThreadLocalTransport
+
+        with serve_in_thread(latency="fixed:0.01") as server:
+            client = GFWClient(api_key="test", base_url=server.base_url, thread_safe=True)
+            assert isinstance(client.transport, ThreadLocalTransport)
+            sessions = set()
+
+            def work(i):
+                sessions.add(id(client.transport._session()))
+                return client.get_vessel_details(f"mock-vessel-{i % 20:04d}")["selfReportedInfo"][0]["id"]
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                ids = list(pool.map(work, range(80)))
+
+        assert ids == [f"mock-vessel-{i % 20:04d}" for i in range(80)]
+        assert 1 < len(sessions) <= 8
+        assert client.transfer.total().requests <= 80
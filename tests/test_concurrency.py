@@ -0,0 +1,160 @@
+"""
+Tests for the adaptive concurrency limiter.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.concurrency import (
+    DROPPED,
+    IGNORED,
+    AdaptiveConcurrency,
+    AdaptiveLimit,
+    endpoint_family,
+)
+from ais_global_fishing.mockserver import serve_in_thread
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveLimit:
+    """Test suite for AdaptiveLimit."""
+
+    def _saturate(self, limit, latency=0.1, rounds=1):
+        """Run *rounds* full windows of successful requests."""
+        for _ in range(rounds):
+            n = limit.limit
+            for _ in range(n):
+                assert limit.acquire(timeout=0)
+            for _ in range(n):
+                limit.release(latency)
+
+    def test_additive_increase_when_saturated(self):
+        """About one more slot per window of successes while the limit is used."""
+        limit = AdaptiveLimit(4, max_limit=10)
+        self._saturate(limit, rounds=3)
+        assert 5 <= limit.limit <= 7
+
+        self._saturate(limit, rounds=50)
+        assert limit.limit == 10
+
+    def test_no_increase_when_idle(self):
+        """Successes below the limit say nothing about spare capacity."""
+        limit = AdaptiveLimit(4)
+        for _ in range(100):
+            limit.acquire()
+            limit.release(0.1)
+        assert limit.limit == 4
+
+    def test_multiplicative_decrease_once_per_round_trip(self):
+        clock = Clock()
+        limit = AdaptiveLimit(20, backoff=0.5, clock=clock)
+        self._saturate(limit, latency=1.0)
+        clock.now = 10
+
+        for _ in range(5):  # one burst of rejections
+            limit.acquire()
+            limit.release(1.0, DROPPED)
+        assert limit.limit == 10
+        assert limit.stats.decreases == 1
+
+        clock.now = 12
+        limit.acquire()
+        limit.release(1.0, DROPPED)
+        assert limit.limit == 5
+
+    def test_latency_growth_backs_off(self):
+        clock = Clock()
+        limit = AdaptiveLimit(16, tolerance=2.0, clock=clock)
+        self._saturate(limit, latency=0.1)
+        for step in range(20):
+            clock.now += 1
+            limit.acquire()
+            limit.release(1.0)
+        assert limit.limit < 16
+
+    def test_ignored_and_bounds(self):
+        limit = AdaptiveLimit(2, min_limit=2, max_limit=8)
+        for _ in range(10):
+            limit.acquire()
+            limit.release(0.1, IGNORED)
+            limit.acquire()
+            limit.release(0.1, DROPPED)
+        assert limit.limit == 2
+        with pytest.raises(ValueError):
+            AdaptiveLimit(4, min_limit=5, max_limit=3)
+
+    def test_acquire_blocks_at_limit(self):
+        limit = AdaptiveLimit(1)
+        assert limit.acquire()
+        assert not limit.acquire(timeout=0.01)
+
+        threading.Timer(0.05, limit.release, args=(0.05,)).start()
+        assert limit.acquire(timeout=2)
+
+
+class TestAdaptiveConcurrency:
+    """Test suite for AdaptiveConcurrency and its use by GFWClient."""
+
+    def test_endpoint_family(self):
+        assert endpoint_family("/vessels/abc/track") == "vessels/track"
+        assert endpoint_family("/vessels/abc") == "vessels/details"
+        assert endpoint_family("/vessels/search") == "vessels/search"
+        assert endpoint_family("/events/fishing") == endpoint_family("/events/encounters") == "events"
+        assert endpoint_family("/ports/visits") == "ports"
+
+    def test_limits_per_family(self):
+        concurrency = AdaptiveConcurrency(3)
+        assert concurrency.limit_for("/vessels/a/track") is concurrency.limit_for("/vessels/b/track")
+        assert concurrency.limit_for("/events/fishing") is not concurrency.limit_for("/vessels/a/track")
+        assert concurrency.limits() == {"events": 3, "vessels/track": 3}
+
+    def test_client_reports_throttling(self):
+        """A 429 lowers the family's limit; a 404 leaves it alone."""
+        def respond(status):
+            response = MagicMock()
+            response.raise_for_status.side_effect = requests.HTTPError(response=MagicMock(status_code=status))
+            return response
+
+        transport = MagicMock()
+        concurrency = AdaptiveConcurrency(10)
+        client = GFWClient(api_key="test", transport=transport, concurrency=concurrency)
+
+        transport.get.return_value = respond(404)
+        with pytest.raises(requests.HTTPError):
+            client.get_risk("v1")
+        assert concurrency.limits() == {"vessels/risk": 10}
+
+        transport.get.return_value = respond(429)
+        with pytest.raises(requests.HTTPError):
+            client.get_risk("v1")
+        assert concurrency.limits()["vessels/risk"] < 10
+        assert concurrency.limit_for("/vessels/v1/risk").in_flight == 0
+
+    def test_converges_below_server_capacity(self):
+        """Against a gateway that rejects more than 4 concurrent requests, most requests succeed."""
+        with serve_in_thread(port=0, max_in_flight=4, latency="fixed:0.02") as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+
+            def fetch(i):
+                try:
+                    client.get_risk(f"v{i}")
+                    return True
+                except requests.HTTPError:
+                    return False
+
+            with ThreadPoolExecutor(16) as pool:
+                ok = sum(pool.map(fetch, range(200)))
+
+        assert ok > 150
+        assert client.concurrency.limits()["vessels/risk"] <= 5
@@ -0,0 +1,161 @@
+"""
+Tests for the cache and quota shared between processes.
+"""
+import multiprocessing
+import pickle
+import threading
+
+import pytest
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.coordination import SharedBucket, SharedCache
+from ais_global_fishing.mockserver import serve_in_thread
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _details(args):
+    """Worker: look up vessel identities through a client on the shared cache."""
+    base_url, db, vessel_ids = args
+    client = GFWClient(api_key="test", base_url=base_url, cache=SharedCache(db, ttl=60))
+    return [client.get_vessel_details(vid)["selfReportedInfo"][0]["id"] for vid in vessel_ids]
+
+
+class TestSharedCache:
+    """Test suite for SharedCache."""
+
+    def test_visible_across_connections(self, tmp_path):
+        """Entries written through one instance are read through another."""
+        db = tmp_path / "shared.sqlite"
+        a, b = SharedCache(db, ttl=60), SharedCache(db, ttl=60)
+        a.set("k", {"entries": [1, 2]})
+        assert b.get("k") == {"entries": [1, 2]}
+        assert "k" in b and len(b) == 1
+        assert b.pop("k") == {"entries": [1, 2]}
+        assert a.get("k", "missing") == "missing"
+        assert (a.misses, b.hits) == (1, 2)
+
+    def test_expiry(self, tmp_path):
+        """Entries vanish after their ttl."""
+        clock = Clock()
+        cache = SharedCache(tmp_path / "shared.sqlite", ttl=10, clock=clock)
+        cache.set("short", 1, ttl=1)
+        cache.set("long", 2)
+        clock.now += 5
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+        assert cache.expire() == 1
+
+    def test_maxsize(self, tmp_path):
+        """A bounded cache drops its oldest entries."""
+        clock = Clock()
+        cache = SharedCache(tmp_path / "shared.sqlite", ttl=60, maxsize=10, clock=clock)
+        for i in range(64):
+            clock.now += 0.001
+            cache.set(str(i), i)
+        assert len(cache) == 10
+        assert cache.get("63") == 63
+        assert cache.get("0") is None
+
+    def test_claims(self, tmp_path):
+        """One holder per key; released or lapsed claims can be taken again."""
+        clock = Clock()
+        db = tmp_path / "shared.sqlite"
+        a = SharedCache(db, ttl=60, lease=5, clock=clock)
+        b = SharedCache(db, ttl=60, lease=5, clock=clock)
+        assert a.claim("k")
+        assert not b.claim("k")
+        a.release("k")
+        assert b.claim("k")
+        clock.now += 6
+        assert a.claim("k")
+
+    def test_wait_returns_stored_value(self, tmp_path):
+        """A waiter gets the value stored by the claim holder."""
+        db = tmp_path / "shared.sqlite"
+        owner, waiter = SharedCache(db, ttl=60), SharedCache(db, ttl=60)
+        assert owner.claim("k")
+
+        def finish():
+            owner.set("k", [1, 2, 3])
+            owner.release("k")
+
+        timer = threading.Timer(0.05, finish)
+        timer.start()
+        assert waiter.wait("k", "gone") == [1, 2, 3]
+        timer.join()
+        assert waiter.wait("other", "gone") == "gone"
+
+    def test_pickles_by_path(self, tmp_path):
+        """A pickled cache reopens the same file."""
+        cache = SharedCache(tmp_path / "shared.sqlite", ttl=60)
+        cache.set("k", "v")
+        clone = pickle.loads(pickle.dumps(cache))
+        assert clone.get("k") == "v"
+
+    def test_keyed_by_gateway(self, tmp_path):
+        """Clients of different gateways sharing a file each get their own answers."""
+        db = tmp_path / "shared.sqlite"
+        with serve_in_thread() as first, serve_in_thread() as second:
+            for server in (first, second, first):
+                client = GFWClient(api_key="test", base_url=server.base_url, cache=SharedCache(db, ttl=60))
+                client.get_vessel_details("mock-vessel-0001")
+            assert (first.stats.requests, second.stats.requests) == (1, 1)
+
+
+class TestSharedBucket:
+    """Test suite for SharedBucket."""
+
+    def test_one_quota_for_all(self, tmp_path):
+        """Instances on the same file spend from one bucket."""
+        clock = Clock()
+        db = tmp_path / "shared.sqlite"
+        a = SharedBucket(db, rate=1, burst=5, clock=clock)
+        b = SharedBucket(db, rate=1, burst=5, clock=clock)
+        assert all(a.take() is None for _ in range(3))
+        assert all(b.take() is None for _ in range(2))
+        assert a.take() == pytest.approx(1.0)
+        clock.now += 2
+        assert b.available == pytest.approx(2.0)
+        assert SharedBucket(db, rate=1, burst=5, name="other", clock=clock).available == 5
+
+    def test_slow_rate_holds_one_token(self, tmp_path):
+        """Below one token per second the bucket still holds one whole token."""
+        clock = Clock()
+        bucket = SharedBucket(tmp_path / "shared.sqlite", rate=0.5, clock=clock)
+        assert bucket.capacity == 1.0
+        assert bucket.take() is None
+        assert bucket.take() == pytest.approx(2.0)
+        with pytest.raises(ValueError):
+            bucket.take(2)
+        with pytest.raises(ValueError):
+            SharedBucket(tmp_path / "shared.sqlite", rate=2, burst=0.5)
+
+    def test_unlimited(self, tmp_path):
+        """rate=None never blocks."""
+        bucket = SharedBucket(tmp_path / "shared.sqlite", rate=None)
+        assert bucket.take(100) is None
+        assert bucket.available == float("inf")
+
+
+class TestAcrossProcesses:
+    """End-to-end: worker processes against the mock gateway."""
+
+    def test_requests_sent_once_per_host(self, tmp_path):
+        """Processes asking for the same vessels send each request once."""
+        vessel_ids = [f"mock-vessel-{i:04d}" for i in range(10)]
+        with serve_in_thread(latency="fixed:0.05") as server:
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(4) as pool:
+                jobs = [(server.base_url, str(tmp_path / "shared.sqlite"), vessel_ids)] * 4
+                results = pool.map(_details, jobs)
+            requests = server.stats.by_route
+
+        assert results == [vessel_ids] * 4
+        assert sum(requests.values()) == len(vessel_ids)
@@ -0,0 +1,83 @@
+"""
+Tests for the sharded export helpers.
+"""
+import io
+import json
+from ais_global_fishing.export import Checkpoint, Shard, run_export
+from ais_global_fishing.records import page_records
+
+
+class TestRunExport:
+    """Test suite for run_export and Checkpoint."""
+
+    def test_page_records(self):
+        """Entries, features and bare lists are all recognised."""
+        assert page_records({"entries": [1, 2]}) == [1, 2]
+        assert page_records({"type": "FeatureCollection", "features": [3]}) == [3]
+        assert page_records([4]) == [4]
+        assert page_records({}) == []
+
+    def test_streams_records_with_tag(self):
+        """Every record is written as one JSON line, tagged per shard."""
+        out = io.StringIO()
+        shards = [
+            Shard("a", lambda: {"entries": [{"id": 1}, {"id": 2}]}, tag={"vesselId": "v1"}),
+            Shard("b", lambda: {"entries": [{"id": 3}]}),
+        ]
+
+        stats = run_export(shards, out, workers=2)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert stats.written == 2
+        assert stats.records == 3
+        assert sorted(r["id"] for r in rows) == [1, 2, 3]
+        assert all(r["vesselId"] == "v1" for r in rows if r["id"] in (1, 2))
+
+    def test_failed_shard_is_not_checkpointed(self, tmp_path):
+        """Failures are reported and retried on the next run."""
+        def boom():
+            raise RuntimeError("503")
+
+        checkpoint = Checkpoint(tmp_path / "out.checkpoint")
+        stats = run_export(
+            [Shard("ok", lambda: {"entries": [{"id": 1}]}), Shard("bad", boom)],
+            io.StringIO(),
+            checkpoint=checkpoint,
+            log=None,
+        )
+        checkpoint.close()
+
+        assert [key for key, _ in stats.failed] == ["bad"]
+        reloaded = Checkpoint(tmp_path / "out.checkpoint")
+        assert "ok" in reloaded
+        assert "bad" not in reloaded
+
+    def test_partial_page_counts_as_failed(self, tmp_path):
+        """A page with failed parts is neither written nor checkpointed."""
+        out = io.StringIO()
+        checkpoint = Checkpoint(tmp_path / "out.checkpoint")
+        partial = {"entries": [{"id": 1}], "errors": [{"params": {"vesselIds": "v2"}, "error": "503"}]}
+        stats = run_export([Shard("part", lambda: partial)], out, checkpoint=checkpoint, log=None)
+
+        assert stats.written == 0 and out.getvalue() == ""
+        assert [key for key, _ in stats.failed] == ["part"]
+        assert "part" not in checkpoint
+
+    def test_resume_skips_completed_shards(self, tmp_path):
+        """Shards recorded in the checkpoint are never fetched again."""
+        (tmp_path / "out.checkpoint").write_text("a\n")
+        calls = []
+
+        def fetch(key):
+            calls.append(key)
+            return {"entries": [{"id": key}]}
+
+        stats = run_export(
+            [Shard("a", lambda: fetch("a")), Shard("b", lambda: fetch("b"))],
+            io.StringIO(),
+            checkpoint=Checkpoint(tmp_path / "out.checkpoint"),
+        )
+
+        assert calls == ["b"]
+        assert stats.skipped == 1
+        assert stats.written == 1
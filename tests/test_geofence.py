@@ -0,0 +1,163 @@
+"""
+Tests for the geofence engine.
+"""
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ais_global_fishing.geofence import ZoneSet  # noqa: E402
+from ais_global_fishing.tracks import Track  # noqa: E402
+
+T0 = 1_704_067_200  # 2024-01-01T00:00:00Z
+
+ZONES = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"code": "EEZ-A", "label": "Square EEZ"},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [
+                    [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+                    [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]],  # hole
+                ],
+            },
+        },
+        {
+            "type": "Feature",
+            "properties": {"code": "MPA-1"},
+            "geometry": {"type": "Polygon", "coordinates": [[[5, 5], [15, 5], [5, 15]]]},  # unclosed ring
+        },
+        {
+            "type": "Feature",
+            "properties": {"code": "MULTI"},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [[[20, 0], [22, 0], [22, 2], [20, 2], [20, 0]]],
+                    [[[30, 0], [32, 0], [32, 2], [30, 2], [30, 0]]],
+                ],
+            },
+        },
+        {"type": "Feature", "properties": {"code": "POINT"}, "geometry": {"type": "Point", "coordinates": [1, 1]}},
+    ],
+}
+
+
+def point_in_polygon(x, y, rings):
+    """Reference even-odd test."""
+    inside = False
+    for ring in rings:
+        for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+    return inside
+
+
+@pytest.fixture(scope="module")
+def zones():
+    return ZoneSet.from_geojson(ZONES, id_field="code", name_field="label")
+
+
+class TestZoneSet:
+    """Test suite for loading and point classification."""
+
+    def test_loading(self, zones, tmp_path):
+        """Polygon features become zones; other geometries are skipped."""
+        assert [z.id for z in zones.zones] == ["EEZ-A", "MPA-1", "MULTI"]
+        assert zones.zones[0].name == "Square EEZ"
+        assert zones.zones[1].name == "MPA-1"
+        path = tmp_path / "zones.geojson"
+        path.write_text(json.dumps(ZONES))
+        assert len(ZoneSet.from_geojson(path, id_field="code")) == 3
+
+    def test_locate(self, zones):
+        """Holes, overlapping zones and multi-polygons."""
+        lat = [1, 5, 8, 6, 1, 1, 1, -1, np.nan]
+        lon = [1, 5, 8, 12, 21, 31, 25, 3, 1]
+        points, codes = zones.locate(lat, lon)
+        assert list(zip(points.tolist(), codes.tolist())) == [(0, 0), (1, 1), (2, 0), (2, 1), (3, 1), (4, 2), (5, 2)]
+        assert zones.first_zone(lat, lon).tolist() == [0, 1, 0, 1, 2, 2, -1, -1, -1]
+        assert zones.contains("MPA-1", lat, lon).tolist() == [False, True, True, True, False, False, False, False, False]
+        with pytest.raises(KeyError):
+            zones.code_of("nope")
+
+    def test_matches_reference(self):
+        """Random points in a detailed polygon agree with a plain ray cast."""
+        rng = np.random.default_rng(3)
+        angle = np.sort(rng.uniform(0, 2 * np.pi, 400))
+        radius = 5 + np.sin(4 * angle) + 0.3 * rng.random(400)
+        ring = np.column_stack([radius * np.cos(angle), radius * np.sin(angle)]).tolist()
+        zone_set = ZoneSet.from_geojson([{"type": "Feature", "properties": {"id": "z"}, "geometry": {"type": "Polygon", "coordinates": [ring]}}])
+        lat, lon = rng.uniform(-7, 7, 3000), rng.uniform(-7, 7, 3000)
+        expected = [point_in_polygon(x, y, [ring]) for x, y in zip(lon, lat)]
+        assert zone_set.contains("z", lat, lon).tolist() == expected
+
+    def test_batches(self, zones, monkeypatch):
+        """Small candidate batches give the same answer."""
+        rng = np.random.default_rng(0)
+        lat, lon = rng.uniform(-2, 16, 500), rng.uniform(-2, 34, 500)
+        expected = zones.locate(lat, lon)
+        monkeypatch.setattr("ais_global_fishing.geofence.BATCH_PAIRS", 7)
+        for got, want in zip(zones.locate(lat, lon), expected):
+            assert got.tolist() == want.tolist()
+
+    def test_shapefile_needs_pyshp(self, tmp_path):
+        """Without pyshp, reading a shapefile explains what to install."""
+        try:
+            import shapefile  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError, match="pyshp"):
+                ZoneSet.from_shapefile(tmp_path / "zones.shp")
+        else:
+            pytest.skip("pyshp is installed")
+
+
+class TestVisits:
+    """Test suite for zone visits and events."""
+
+    def make_track(self, vessel_id, lat, lon, step=3600):
+        n = len(lat)
+        nan = np.full(n, np.nan, dtype=np.float32)
+        return Track(T0 + np.arange(n, dtype=np.int64) * step, np.asarray(lat, float), np.asarray(lon, float), nan, nan, vessel_id)
+
+    def test_entries_exits_dwell(self, zones):
+        """Runs of fixes inside a zone become visits."""
+        # v1: outside → EEZ-A for 3 fixes → outside → EEZ-A until the end
+        v1 = self.make_track("v1", [-1, 1, 2, 3, -1, 1, 2], [1, 1, 1, 1, 1, 1, 1])
+        # v2: starts inside MULTI, leaves
+        v2 = self.make_track("v2", [1, 1, 5], [21, 21, 25])
+        visits = zones.visits([v1, v2])
+        records = visits.to_records()
+        assert [(r["vesselId"], r["zoneId"]) for r in records] == [("v1", "EEZ-A"), ("v1", "EEZ-A"), ("v2", "MULTI")]
+        first, second, third = records
+        assert first["enter"] == "2024-01-01T01:00:00Z" and first["exit"] == "2024-01-01T04:00:00Z"
+        assert first["dwellHours"] == 3 and first["points"] == 3 and first["entered"]
+        assert second["exit"] is None and second["dwellHours"] == 1
+        assert not third["entered"] and third["dwellHours"] == 2
+
+        summary = visits.summary()
+        assert summary["EEZ-A"] == {"visits": 2, "entries": 2, "exits": 1, "vessels": 1, "dwellHours": 4.0}
+        assert summary["MULTI"]["entries"] == 0 and summary["MULTI"]["exits"] == 1
+        assert "MPA-1" not in summary
+
+    def test_no_tracks(self, zones):
+        """No tracks, no visits."""
+        assert len(zones.visits([])) == 0
+        assert zones.visits([]).summary() == {}
+
+    def test_events(self, zones):
+        """Event positions are matched to every zone containing them."""
+        page = {
+            "entries": [
+                {"id": "e1", "type": "fishing", "start": "2024-01-01T00:00:00Z", "vessel": {"id": "v1"}, "position": {"lat": 8, "lon": 8}},
+                {"id": "e2", "type": "fishing", "vessel": {"id": "v2"}, "position": {"lat": 50, "lon": 50}},
+                {"id": "e3", "type": "port_visit", "vessel": {"id": "v3"}, "position": {}},
+            ]
+        }
+        rows = zones.events(page)
+        assert [(r["eventId"], r["zoneId"]) for r in rows] == [("e1", "EEZ-A"), ("e1", "MPA-1")]
+        assert rows[0]["vesselId"] == "v1" and rows[0]["zoneName"] == "Square EEZ"
@@ -0,0 +1,122 @@
+"""
+Tests for the SQLite-backed job queue.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.jobs import DONE, FAILED, PENDING, RUNNING, JobQueue, run_jobs
+from ais_global_fishing.mockserver import serve_in_thread
+
+
+class TestJobQueue:
+    """Test suite for JobQueue and run_jobs."""
+
+    def test_add_windows_plans_one_unit_per_window(self, tmp_path):
+        """Windows are formatted like the client's own time parameters."""
+        with JobQueue(tmp_path / "jobs.sqlite") as queue:
+            keys = queue.add_windows(
+                "/ports/visits", datetime(2024, 1, 1), datetime(2024, 3, 1), timedelta(days=30),
+                params={"vesselIds": "v1,v2"},
+            )
+            unit = queue.claim()
+
+        assert len(keys) == 2
+        assert unit.path == "/ports/visits"
+        assert unit.params == {
+            "vesselIds": "v1,v2",
+            "start": "2024-01-01T00:00:00Z",
+            "end": "2024-01-31T00:00:00Z",
+        }
+
+    def test_run_jobs_stores_results(self, tmp_path):
+        """Every unit is fetched once and its result kept on disk."""
+        client = MagicMock()
+        client.get.side_effect = lambda path, params, **kwargs: {"entries": [params["n"]]}
+
+        with JobQueue(tmp_path / "jobs.sqlite") as queue:
+            queue.add_many(("/events/fishing", {"n": n}) for n in range(5))
+            counts = run_jobs(client, queue, workers=3)
+            results = [page["entries"][0] for _, page in queue.results()]
+
+        assert counts[DONE] == 5
+        assert results == [0, 1, 2, 3, 4]
+        assert client.get.call_count == 5
+
+    def test_paged_units_are_fetched_whole(self, tmp_path):
+        """Every page of a unit is stored, renewing its lease after each page."""
+        fleet = [f"mock-vessel-{i:04d}" for i in range(10)]
+        with serve_in_thread(page_size=20) as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+            with JobQueue(tmp_path / "jobs.sqlite") as queue:
+                params = {"start": "2023-01-01", "end": "2024-06-01", "vesselIds": ",".join(fleet)}
+                key = queue.add("/ports/visits", params)
+                queue.heartbeat = MagicMock(wraps=queue.heartbeat)
+                assert run_jobs(client, queue, workers=1)[DONE] == 1
+                page = queue.result(key)
+                pages = server.stats.requests
+
+        assert page["total"] == len(page["entries"]) > 20
+        assert pages == -(-page["total"] // 20)
+        assert queue.heartbeat.call_count == pages
+
+    def test_resume_never_refetches_done_units(self, tmp_path):
+        """Re-planning and re-running a finished job issues no requests."""
+        db = tmp_path / "jobs.sqlite"
+        client = MagicMock()
+        client.get.return_value = {"entries": []}
+
+        with JobQueue(db) as queue:
+            queue.add("/vessels/v1/trips")
+            run_jobs(client, queue)
+
+        with JobQueue(db) as queue:
+            queue.add("/vessels/v1/trips")
+            queue.add("/vessels/v2/trips")
+            run_jobs(client, queue)
+
+        assert [c.args[0] for c in client.get.call_args_list] == ["/vessels/v1/trips", "/vessels/v2/trips"]
+
+    def test_crashed_running_units_are_requeued(self, tmp_path):
+        """A unit whose lease ran out is pending again on reopen."""
+        db = tmp_path / "jobs.sqlite"
+        queue = JobQueue(db, lease=0)
+        queue.add("/vessels/v1/risk")
+        assert queue.claim() is not None
+        queue.close()
+
+        with JobQueue(db) as queue:
+            assert queue.counts()[PENDING] == 1
+
+    def test_leased_units_stay_with_their_worker(self, tmp_path):
+        """Opening the queue elsewhere leaves units with a live lease alone."""
+        db = tmp_path / "jobs.sqlite"
+        with JobQueue(db) as first:
+            first.add("/vessels/v1/risk")
+            unit = first.claim()
+            first.heartbeat(unit.key)
+
+            with JobQueue(db) as second:
+                assert second.counts()[RUNNING] == 1
+                assert second.claim() is None
+
+            with JobQueue(db, lease=0) as impatient:
+                impatient.heartbeat(unit.key)  # lease now ends immediately
+                assert impatient.claim() == unit
+
+    def test_failures_retry_then_give_up(self, tmp_path):
+        """Transient errors are retried; persistent ones end up 'failed'."""
+        client = MagicMock()
+        client.get.side_effect = [RuntimeError("503"), {"ok": True}, RuntimeError("404"), RuntimeError("404")]
+
+        with JobQueue(tmp_path / "jobs.sqlite", max_attempts=2, backoff=0) as queue:
+            flaky = queue.add("/a")
+            queue.add("/b")
+            counts = run_jobs(client, queue, workers=1, poll_interval=0.01)
+
+            assert counts[DONE] == 1
+            assert counts[FAILED] == 1
+            assert queue.result(flaky) == {"ok": True}
+            (unit, error), = queue.errors()
+            assert unit.path == "/b"
+            assert error == "404"
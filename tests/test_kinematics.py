@@ -0,0 +1,138 @@
+"""
+Tests for track kinematics and anomaly screening.
+"""
+import json
+from datetime import timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ais_global_fishing.kinematics import (  # noqa: E402
+    DARK,
+    JUMP,
+    Anomalies,
+    anomalies,
+    bearing_deg,
+    haversine_nm,
+    kinematics,
+    screen_fleet,
+)
+from ais_global_fishing.tracks import Track  # noqa: E402
+
+T0 = 1_704_067_200  # 2024-01-01T00:00:00Z
+
+
+def make_track(lat, lon, times=None, vessel_id="v1"):
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if times is None:
+        times = T0 + np.arange(len(lat)) * 600
+    n = len(lat)
+    nan = np.full(n, np.nan, dtype=np.float32)
+    return Track(np.asarray(times, dtype=np.int64), lat, lon, nan, nan.copy(), vessel_id)
+
+
+class TestGeometry:
+    """Test suite for the distance and bearing helpers."""
+
+    def test_haversine(self):
+        """One degree of latitude is 60 nautical miles."""
+        assert haversine_nm(0, 0, 1, 0) == pytest.approx(60.04, abs=0.01)
+        assert haversine_nm([0, 10], [0, 10], [0, 10], [0, 10]).tolist() == [0, 0]
+
+    def test_bearing(self):
+        """North, east, south and west."""
+        result = bearing_deg([0, 0, 1, 0], [0, 0, 0, 1], [1, 0, 0, 0], [0, 1, 0, 0])
+        assert result == pytest.approx([0, 90, 180, 270])
+
+
+class TestKinematics:
+    """Test suite for kinematics()."""
+
+    def test_straight_then_turn(self):
+        """Speed, bearing and a right-angle turn to starboard."""
+        # 10-minute steps of 0.02° north (1.2 nm → 7.2 kn), then east.
+        track = make_track([0, 0.02, 0.04, 0.04], [0, 0, 0, 0.02])
+        k = kinematics(track)
+        assert len(k) == 4
+        assert np.isnan(k.gap[0]) and np.isnan(k.implied_speed[0])
+        assert k.gap[1:].tolist() == [600, 600, 600]
+        assert k.implied_speed[1:] == pytest.approx([7.2, 7.2, 7.2], abs=0.01)
+        assert k.bearing[1:] == pytest.approx([0, 0, 90], abs=0.01)
+        assert k.heading_change[2:] == pytest.approx([0, 90], abs=0.01)
+        assert k.turn_rate[3] == pytest.approx(9.0, abs=0.01)
+
+    def test_stationary_and_short(self):
+        """No bearing without movement; one point has nothing to derive."""
+        k = kinematics(make_track([1, 1], [2, 2]))
+        assert k.distance[1] == 0 and np.isnan(k.bearing[1])
+        assert np.isnan(kinematics(make_track([1], [2])).gap).all()
+
+    @pytest.mark.filterwarnings("error")
+    def test_duplicate_timestamp_turn(self):
+        """A turn between fixes sharing a timestamp has an infinite rate, silently."""
+        times = T0 + np.array([0, 600, 600])
+        k = kinematics(make_track([0, 0.02, 0.02], [0, 0, 0.02], times))
+        assert k.heading_change[2] == pytest.approx(90, abs=0.01)
+        assert np.isinf(k.turn_rate[2]) and np.isinf(k.implied_speed[2])
+
+
+class TestAnomalies:
+    """Test suite for anomalies() and screen_fleet()."""
+
+    def test_jump_and_dark_period(self):
+        """A spoofed position gives two jumps; a long silence a dark period."""
+        lat = [0, 0.02, 5.0, 0.06, 0.08, 0.10]
+        times = T0 + np.array([0, 600, 1200, 1800, 2400, 2400 + 13 * 3600])
+        found = anomalies(make_track(lat, [0] * 6, times))
+        assert found.kind.tolist() == [JUMP, JUMP, DARK]
+        assert found.implied_speed[0] > 50
+        assert found.duration_hours()[2] == pytest.approx(13)
+        records = found.to_records()
+        assert records[0]["vesselId"] == "v1"
+        assert records[0]["start"] == "2024-01-01T00:10:00Z"
+        assert records[2]["type"] == DARK
+
+    def test_thresholds(self):
+        """Thresholds decide what counts as a jump or a dark period."""
+        times = T0 + np.array([0, 600, 600 + 7 * 3600])
+        track = make_track([0, 0.5, 0.5], [0, 0, 0], times)  # 30 nm in 10 min = 180 kn
+        assert len(anomalies(track)) == 1
+        assert len(anomalies(track, max_speed=200)) == 0
+        assert anomalies(track, dark_gap=timedelta(hours=6)).kind.tolist() == [JUMP, DARK]
+        assert len(anomalies(track, min_jump_nm=50)) == 0
+
+    def test_duplicate_timestamp_jump(self):
+        """A jump without elapsed time has no implied speed in its record."""
+        times = T0 + np.array([0, 600, 600, 1200])
+        found = anomalies(make_track([0, 0, 5, 5], [0, 0, 0, 0], times))
+        assert found.kind.tolist() == [JUMP]
+        assert np.isinf(found.implied_speed[0])
+        record = found.to_records()[0]
+        assert record["impliedSpeedKnots"] is None
+        json.dumps(record, allow_nan=False)
+
+    def test_legs_never_cross_vessels(self):
+        """The last point of one vessel and the first of the next are not a leg."""
+        a = make_track([0, 0.01], [0, 0], vessel_id="a")
+        b = make_track([40, 40.01], [0, 0], vessel_id="b")
+        assert len(screen_fleet([a, b], workers=1)) == 0
+
+    def test_fleet_batches_and_pool(self):
+        """Batched and pooled screening agree with per-track screening."""
+        rng = np.random.default_rng(1)
+        tracks = []
+        for i in range(9):
+            lat = 10 + np.cumsum(rng.normal(0, 0.001, 50))
+            if i % 3 == 0:
+                lat[25] += 2
+            tracks.append(make_track(lat, np.zeros(50), vessel_id=f"v{i}"))
+
+        expected = Anomalies.concat(anomalies(t) for t in tracks).to_records()
+        assert screen_fleet(tracks, workers=1, batch_size=2).to_records() == expected
+        assert screen_fleet(tracks, workers=2, batch_size=4).to_records() == expected
+        assert sorted(set(r["vesselId"] for r in expected)) == ["v0", "v3", "v6"]
+        assert len(screen_fleet([], workers=1)) == 0
+        with pytest.raises(ValueError, match="batch_size"):
+            screen_fleet(tracks, workers=1, batch_size=0)
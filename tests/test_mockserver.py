@@ -0,0 +1,112 @@
+"""
+Tests for the local mock gateway.
+"""
+import pytest
+import requests
+from requests.exceptions import HTTPError
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.mockserver import make_latency, serve_in_thread
+from ais_global_fishing.timewindow import TimeWindow
+
+
+@pytest.fixture(scope="module")
+def server():
+    """A quota-free mock gateway shared by the tests of this module."""
+    with serve_in_thread(page_size=100) as srv:
+        yield srv
+
+
+@pytest.fixture
+def gfw(server):
+    return GFWClient(api_key="test", base_url=server.base_url)
+
+
+class TestMockGateway:
+    """Test suite for MockGateway."""
+
+    def test_client_paths(self, gfw):
+        """Every client endpoint is served."""
+        assert gfw.search_vessels(query="BOYANG", limit=3)["entries"]
+        assert gfw.get_vessel_details("v1")["selfReportedInfo"][0]["id"] == "v1"
+        assert len(gfw.get_vessels_bulk(["v1", "v2"])["entries"]) == 2
+        assert len(gfw.get_track("v1", "2024-01-01", "2024-01-02", resolution="1h")["features"]) == 24
+        assert gfw.get_segments("v1", "2024-01-01", "2024-01-10")["entries"]
+        assert gfw.get_events("v1", "2024-01-01", "2024-02-01", ["FISHING"])["entries"]
+        assert gfw.get_encounters("2024-01-01", "2024-03-01")["entries"]
+        assert gfw.get_port_visits("2024-01-01", "2024-03-01", vessel_ids=["v1"])["entries"]
+        assert "score" in gfw.get_risk("v1")
+        assert gfw.get_trips("v1")["entries"]
+
+    def test_data_is_deterministic_and_shardable(self, gfw):
+        """Sharded windows return exactly the events of the whole window."""
+        window = TimeWindow.of("2024-01-01", "2024-02-01")
+        whole = gfw.get_fishing_events(window.start, window.end, ["v1", "v2"])["entries"]
+        sharded = [
+            e
+            for shard in window.split(window.duration / 3)
+            for e in gfw.get_fishing_events(shard.start, shard.end, ["v1", "v2"])["entries"]
+        ]
+
+        assert sorted(e["id"] for e in whole) == sorted(e["id"] for e in sharded)
+
+    def test_pagination(self, gfw):
+        """limit / offset / nextOffset behave like the gateway's."""
+        first = gfw._get("/events/fishing", {**TimeWindow.of("2024-01-01", "2024-06-01").params(), "limit": 10})
+        second = gfw._get(
+            "/events/fishing",
+            {**TimeWindow.of("2024-01-01", "2024-06-01").params(), "limit": 10, "offset": first["nextOffset"]},
+        )
+
+        assert len(first["entries"]) == 10
+        assert first["nextOffset"] == 10
+        assert first["total"] > 20
+        assert first["entries"][-1]["start"] <= second["entries"][0]["start"]
+
+    def test_port_filter_before_pagination(self, gfw):
+        """portIds narrows the visits before they are paged."""
+        window = TimeWindow.of("2023-01-01", "2024-06-01").params()
+        port = gfw._get("/ports/visits", {**window, "limit": 1})["entries"][0]["port_visit"]["intermediateAnchorage"]["id"]
+        page = gfw._get("/ports/visits", {**window, "portIds": port, "limit": 5})
+        every = gfw.get_port_visits("2023-01-01", "2024-06-01", port_ids=[port], all_pages=True)
+
+        assert len(page["entries"]) == min(5, page["total"])
+        assert page["total"] == len(every["entries"])
+        assert {e["port_visit"]["intermediateAnchorage"]["id"] for e in every["entries"]} == {port}
+
+    def test_includes_are_honoured(self, gfw):
+        """Optional sections are only present when requested."""
+        plain = gfw.get_vessel_details("v1")
+        owned = gfw.get_vessel_details("v1", includes=["OWNERSHIP"])
+
+        assert "registryOwners" not in plain
+        assert owned["registryOwners"]
+
+    def test_missing_token_is_401(self, server):
+        """Requests without a bearer token are rejected."""
+        resp = requests.get(f"{server.base_url}/vessels/v1/risk")
+
+        assert resp.status_code == 401
+
+    def test_quota_returns_429(self):
+        """Requests beyond the token bucket are throttled with Retry-After."""
+        with serve_in_thread(rps=1, burst=1) as srv:
+            gfw = GFWClient(api_key="test", base_url=srv.base_url)
+            gfw.get_risk("v1")
+            with pytest.raises(HTTPError) as excinfo:
+                gfw.get_risk("v1")
+
+            assert excinfo.value.response.status_code == 429
+            assert excinfo.value.response.headers["Retry-After"] == "1"
+            assert srv.stats.throttled == 1
+
+    @pytest.mark.parametrize("spec", ["fixed:0.1", "uniform:0.05,0.15", "exponential:0.1", "lognormal:0.1,0.5", 0.1])
+    def test_latency_specs(self, spec):
+        """All latency distributions produce non-negative delays."""
+        sample = make_latency(spec, seed=1)
+
+        assert all(sample() >= 0 for _ in range(100))
+
+    def test_unknown_latency_spec(self):
+        with pytest.raises(ValueError):
+            make_latency("pareto:1")
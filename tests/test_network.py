@@ -0,0 +1,117 @@
+"""
+Tests for the encounter network.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ais_global_fishing import mockserver
+from ais_global_fishing.network import EncounterGraph
+from ais_global_fishing.timewindow import to_utc
+
+
+def _enc(eid, a, b, start="2024-01-01T00:00:00.000Z", kind="encounter"):
+    return {"id": eid, "type": kind, "start": start, "vessel": {"id": a}, "encounter": {"vessel": {"id": b}}}
+
+
+# a - b - c - d   e - f   (and b meets c twice)
+EDGES = [("1", "a", "b"), ("2", "b", "c"), ("3", "c", "d"), ("4", "e", "f"), ("5", "c", "b")]
+
+
+@pytest.fixture
+def graph():
+    g = EncounterGraph()
+    g.add({"entries": [_enc(*edge) for edge in EDGES]})
+    return g
+
+
+class TestEncounterGraph:
+    """Test suite for EncounterGraph."""
+
+    def test_add_interns_and_dedupes(self, graph):
+        """Vessels are numbered once; an event seen again is not re-added."""
+        assert (graph.n_vessels, graph.n_edges) == (6, 5)
+        assert graph.add([{"entries": [_enc("1", "a", "b"), _enc("6", "a", "e")]}]) == 1
+        assert graph.n_edges == 6
+        assert graph.neighbours("a") == ["b", "e"]
+
+    def test_legacy_fields(self):
+        g = EncounterGraph()
+        g.add([{"id": "x", "vessel1Id": "p", "vessel2Id": "q", "startTime": "2024-01-01T00:00:00Z"}])
+        assert g.neighbours("q") == ["p"]
+
+    def test_k_hop(self, graph):
+        assert graph.k_hop(["a"], k=1) == {"a": 0, "b": 1}
+        assert graph.k_hop(["a"], k=2) == {"a": 0, "b": 1, "c": 2}
+        assert graph.k_hop(["a", "e"], k=5) == {"a": 0, "b": 1, "c": 2, "d": 3, "e": 0, "f": 1}
+        assert graph.k_hop(["unknown"]) == {}
+
+    def test_components(self, graph):
+        labels = graph.components()
+        assert len(set(labels.tolist())) == 2
+        assert sorted(graph.component_of("d")) == ["a", "b", "c", "d"]
+
+    def test_centrality(self, graph):
+        """Degree counts distinct partners, strength counts meetings."""
+        by_id = dict(zip(graph.ids, graph.degree().tolist()))
+        assert by_id == {"a": 1, "b": 2, "c": 2, "d": 1, "e": 1, "f": 1}
+        assert dict(zip(graph.ids, graph.strength().tolist()))["c"] == 3
+
+        rank = graph.pagerank()
+        assert rank.sum() == pytest.approx(1.0)
+        assert {vid for vid, _ in graph.top(rank, 2)} == {"b", "c"}
+
+    def test_window_and_kinds(self):
+        g = EncounterGraph()
+        g.add([
+            _enc("1", "a", "b", "2024-01-05T00:00:00.000Z"),
+            _enc("2", "a", "c", "2024-02-05T00:00:00.000Z", kind="transshipment"),
+        ])
+        assert g.window("2024-02-01", "2024-03-01").neighbours("a") == ["c"]
+        assert g.window(kinds=["ENCOUNTER"]).neighbours("a") == ["b"]
+
+    def test_window_is_independent(self):
+        """Adding to a window leaves the parent graph's vessels and kinds alone."""
+        g = EncounterGraph()
+        g.add([_enc("1", "a", "b", "2024-01-05T00:00:00.000Z")])
+        kinds = list(g.kinds)
+        sub = g.window("2024-01-01", "2024-02-01")
+        sub.add([_enc("2", "a", "z", "2024-01-06T00:00:00.000Z", kind="rendezvous")])
+
+        assert sub.neighbours("a") == ["b", "z"]
+        assert g.n_vessels == 2 and "z" not in g.ids and g.kinds == kinds
+
+    def test_window_skips_its_own_encounters(self, tmp_path):
+        """Re-adding a page to a window adds only encounters outside it, also after a reload."""
+        page = {"entries": [
+            _enc("1", "a", "b", "2024-01-05T00:00:00.000Z"),
+            _enc("2", "a", "c", "2024-02-05T00:00:00.000Z"),
+        ]}
+        g = EncounterGraph()
+        g.add(page)
+        g.save(tmp_path / "graph.npz")
+
+        for graph in (g, EncounterGraph.load(tmp_path / "graph.npz")):
+            sub = graph.window("2024-01-01", "2024-02-01")
+            assert sub.add(page) == 1
+            assert sub.n_edges == 2 and sub.neighbours("a") == ["b", "c"]
+
+    def test_incremental_matches_bulk(self, tmp_path):
+        """Appending window by window, saving and reloading gives the bulk result."""
+        lo, hi = to_utc("2024-01-01").timestamp(), to_utc("2024-07-01").timestamp()
+        pages = [
+            {"entries": mockserver.vessel_events("encounter", f"mock-vessel-{i:04d}", 0, lo, hi)}
+            for i in range(30)
+        ]
+        bulk = EncounterGraph()
+        bulk.add(pages)
+
+        incremental = EncounterGraph()
+        incremental.add(pages[:10])
+        incremental.save(tmp_path / "graph.npz")
+        incremental = EncounterGraph.load(tmp_path / "graph.npz")
+        incremental.add(pages[10:])
+        incremental.add(pages[:5])  # re-delivered window: no new edges
+
+        assert incremental.n_edges == bulk.n_edges
+        assert sorted(incremental.component_of("mock-vessel-0003")) == sorted(bulk.component_of("mock-vessel-0003"))
@@ -0,0 +1,125 @@
+"""
+Tests for request profiling and stack sampling.
+"""
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.mockserver import serve_in_thread
+from ais_global_fishing.profiling import PHASES, Profiler, StackSampler, speedscope
+
+
+def response(elapsed, status=200):
+    resp = MagicMock(status_code=status)
+    resp.elapsed = timedelta(seconds=elapsed)
+    return resp
+
+
+class TestProfiler:
+    """Test suite for Profiler."""
+
+    def test_phases_from_timings(self):
+        """Header time splits the transport call into ttfb and download."""
+        seen = []
+        profiler = Profiler(hooks=[seen.append])
+        profiler.record("/vessels/v1/track", response(0.3), throttle=0.1, fetched=0.5, decode=0.05)
+
+        (profile,) = profiler.requests
+        assert seen == [profile]
+        assert profile.family == "vessels/track" and profile.status == 200
+        assert profile.phases == pytest.approx(
+            {"throttle": 0.1, "connect": 0.0, "ttfb": 0.3, "download": 0.2, "decode": 0.05}
+        )
+        assert profile.total == pytest.approx(0.65)
+
+    def test_build_phase_and_report(self):
+        """Build phases join the breakdown; the report ranks by time."""
+        profiler = Profiler()
+        profiler.record("/events/fishing", response(0.2), 0.0, 0.2, 0.1)
+        with profiler.phase("build", "events"):
+            time.sleep(0.01)
+
+        breakdown = profiler.breakdown()
+        assert set(breakdown["events"]) == {"ttfb", "decode", "build"}
+        assert set(breakdown["events"]) <= set(PHASES)
+        report = profiler.report().splitlines()
+        assert report[1].startswith("all")
+        assert report[2].strip().startswith("events (1)")
+        assert report[3].strip().startswith("ttfb")
+
+        profiler.reset()
+        assert "nothing recorded" in profiler.report()
+
+    def test_sample_rate(self):
+        """Sampling skips requests; the rate is validated."""
+        assert not Profiler(sample_rate=0.0).sampled()
+        assert Profiler().sampled()
+        with pytest.raises(ValueError):
+            Profiler(sample_rate=2)
+
+    def test_attached_client(self):
+        """A profiled client records every request it sends, with connects."""
+        with serve_in_thread(latency="fixed:0.02") as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+            profiler = Profiler().attach(client)
+            client.get_trips("v1")
+            client.get_risk("v1")
+            with pytest.raises(Exception):
+                client._get("/events/nope")  # 4xx answers are recorded too
+
+        assert [(p.family, p.status) for p in profiler.requests] == [
+            ("vessels/trips", 200), ("vessels/risk", 200), ("events", 404),
+        ]
+        first = profiler.requests[0].phases
+        assert first["connect"] > 0
+        assert first["ttfb"] >= 0.015
+        assert sum(p.phases["connect"] for p in profiler.requests[1:2]) < first["connect"]
+
+    def test_unsampled_connects_are_not_carried_over(self):
+        """A connect made by an unsampled request is not charged to the next one."""
+        with serve_in_thread() as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+            profiler = Profiler(sample_rate=0.0).attach(client)
+            client.get_trips("v1")  # opens the connection, not recorded
+            profiler.sample_rate = 1.0
+            client.get_risk("v1")
+
+        (request,) = profiler.requests
+        assert request.phases["connect"] == 0.0
+
+
+class TestSampling:
+    """Test suite for StackSampler and the speedscope export."""
+
+    def test_stack_sampler(self):
+        """Busy code shows up in the sampled stacks."""
+
+        def spin(seconds):
+            end = time.perf_counter() + seconds
+            while time.perf_counter() < end:
+                pass
+
+        with StackSampler(interval=0.002) as sampler:
+            spin(0.1)
+        assert sampler.samples > 0
+        assert any("spin" in name for name, _ in sampler.top(3))
+
+    def test_speedscope_document(self):
+        """Both profiles share one frame table."""
+        profiler = Profiler()
+        profiler.record("/ports/visits", response(0.1), 0.0, 0.3, 0.0)
+        sampler = StackSampler(interval=0.01)
+        sampler.stacks.update({"main;load;parse": 3, "main;load": 1})
+
+        document = speedscope(profiler, sampler, name="job")
+        frames = [f["name"] for f in document["shared"]["frames"]]
+        requests, stacks = document["profiles"]
+        assert document["name"] == "job"
+        assert requests["type"] == "sampled" and requests["unit"] == "seconds"
+        assert [[frames[i] for i in s] for s in requests["samples"]] == [["ports", "ttfb"], ["ports", "download"]]
+        assert requests["weights"] == pytest.approx([0.1, 0.2])
+        assert stacks["endValue"] == pytest.approx(0.04)
+        assert [frames[i] for i in stacks["samples"][0]] == ["main", "load", "parse"]
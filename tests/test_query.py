@@ -0,0 +1,94 @@
+"""
+Tests for the SQL query store.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from ais_global_fishing import mockserver
+from ais_global_fishing.activity import ActivityStore
+from ais_global_fishing.jobs import JobQueue
+from ais_global_fishing.query import QueryStore
+
+LO = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+HI = datetime(2024, 4, 1, tzinfo=timezone.utc).timestamp()
+FLEET = [f"mock-vessel-{i:04d}" for i in range(20)]
+
+
+def _visits():
+    entries = [e for vid in FLEET for e in mockserver.vessel_events("port_visit", vid, 1, LO, HI)]
+    return {"entries": entries, "total": len(entries)}
+
+
+class TestQueryStore:
+    """Test suite for QueryStore."""
+
+    def test_port_visits_by_country(self):
+        """SQL answers the same as a Python filter over the records."""
+        page = _visits()
+        store = QueryStore()
+        assert store.add("port_visits", page) == len(page["entries"])
+
+        country = page["entries"][0]["port_visit"]["intermediateAnchorage"]["flag"]
+        expected = sum(e["port_visit"]["intermediateAnchorage"]["flag"] == country for e in page["entries"])
+        rows = store.query("SELECT COUNT(*) AS n FROM port_visits WHERE country = ?", (country,))
+        assert rows == [{"n": expected}]
+
+    def test_filters_use_indexes(self):
+        """Country and vessel filters are pushed down to an index, not scanned."""
+        store = QueryStore()
+        plan = " ".join(store.explain("SELECT * FROM port_visits WHERE country = 'ESP' AND start >= '2024-02'"))
+        assert "USING INDEX port_visits_country" in plan
+        plan = " ".join(store.explain("SELECT * FROM events WHERE vessel_id = 'v1'"))
+        assert "USING INDEX events_vessel" in plan
+
+    def test_upsert_and_times(self):
+        """Re-loading the same records replaces them; times are normalised."""
+        store = QueryStore()
+        store.add("port_visits", _visits())
+        store.add("port_visits", _visits())
+        assert store.counts()["port_visits"] == len(_visits()["entries"])
+
+        (row,) = store.query("SELECT start FROM port_visits ORDER BY start LIMIT 1")
+        assert len(row["start"]) == 20 and row["start"].endswith("Z")
+
+    def test_json_body(self):
+        """Fields without a column are reachable through json_extract."""
+        store = QueryStore()
+        store.add("port_visits", _visits())
+        rows = store.query("SELECT DISTINCT json_extract(body, '$.port_visit.confidence') AS c FROM port_visits")
+        assert rows == [{"c": "4"}]
+
+    def test_identities_and_join(self):
+        store = QueryStore()
+        store.add("vessels", {"entries": [mockserver._identity(vid, 1, set()) for vid in FLEET]})
+        store.add("port_visits", _visits())
+
+        rows = store.query(
+            "SELECT v.name, COUNT(*) AS n FROM port_visits p JOIN vessels v ON v.id = p.vessel_id "
+            "GROUP BY v.id ORDER BY v.id LIMIT 1"
+        )
+        assert rows[0]["name"] == "MOCK L-0000"
+
+    def test_load_jobs_and_activity(self, tmp_path):
+        """Job results and activity-cache records land in their tables."""
+        queue = JobQueue(":memory:")
+        visits_key = queue.add("/ports/visits", {"start-date": "2024-01-01"})
+        track_key = queue.add("/vessels/v%2F1/track", {})
+        queue.add("/vessels/v1/risk", {})
+        for key, result in ((visits_key, _visits()), (track_key, mockserver._track("x", 1, LO, LO + 86400, "1h"))):
+            queue.complete(key, result)
+
+        store = QueryStore(tmp_path / "lake.sqlite")
+        counts = store.load_jobs(queue)
+        assert counts == {"port_visits": len(_visits()["entries"]), "track_points": 24}
+        assert store.query("SELECT DISTINCT vessel_id FROM track_points") == [{"vessel_id": "v/1"}]
+
+        activity = ActivityStore()
+        event = mockserver.vessel_events("fishing", "v2", 1, LO, LO + 86400 * 3)[0]
+        activity.merge("v2", "events:*", None, [(event["id"], LO, event)])
+        assert store.load_activity(activity) == {"events": 1, "track_points": 0}
+
+    def test_unknown_table(self):
+        with pytest.raises(ValueError):
+            QueryStore().add("nope", [])
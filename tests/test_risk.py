@@ -0,0 +1,127 @@
+"""
+Tests for bulk risk screening and the TTL cache.
+"""
+import csv
+import io
+import threading
+
+import pytest
+from requests.exceptions import HTTPError
+
+from ais_global_fishing.cache import TTLCache
+from ais_global_fishing.risk import RiskScreener, write_table
+
+
+class FakeClient:
+    """get_risk with a call counter; ids starting with 'x' fail."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_risk(self, vessel_id):
+        with self._lock:
+            self.calls.append(vessel_id)
+        if vessel_id.startswith("x"):
+            raise HTTPError("403 Client Error")
+        return {"vesselId": vessel_id, "score": 0.5, "iuuListed": False, "indicators": {"flagChanges": 1}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+VISITS = {
+    "entries": [
+        {"id": "pv1", "vessel": {"id": "v1"}},
+        {"id": "pv2", "vessel": {"id": "v2"}},
+        {"id": "pv3", "vessel": {"id": "v1"}},
+    ]
+}
+
+
+class TestRiskScreener:
+    """Test suite for RiskScreener and write_table."""
+
+    def test_deduplicates_and_caches(self):
+        """Each vessel is fetched once; a second screening is served from cache."""
+        client = FakeClient()
+        screener = RiskScreener(client, workers=4)
+
+        rows = list(screener.screen([VISITS, "v2", "v3"]))
+        assert sorted(r.vessel_id for r in rows) == ["v1", "v2", "v3"]
+        assert sorted(client.calls) == ["v1", "v2", "v3"]
+
+        again = list(screener.screen(["v3", "v1"]))
+        assert [r.cached for r in again] == [True, True]
+        assert len(client.calls) == 3
+        assert screener.stats.cache_hits == 2
+
+    def test_errors_are_rows_and_not_cached(self):
+        """Failed lookups come back as rows with an error and are retried later."""
+        client = FakeClient()
+        screener = RiskScreener(client)
+
+        (row,) = screener.screen(["x1"])
+        assert row.error == "403 Client Error"
+        assert row.score is None
+        list(screener.screen(["x1"]))
+        assert client.calls == ["x1", "x1"]
+        assert screener.stats.errors == 2
+
+    def test_many_vessels_bounded_window(self):
+        """Thousands of vessels stream through without losing any."""
+        screener = RiskScreener(FakeClient(), workers=8)
+
+        assert len(list(screener.screen(f"v{i}" for i in range(2000)))) == 2000
+
+    def test_write_table_csv(self):
+        """CSV has the fixed columns plus indicators; early errors are kept."""
+        screener = RiskScreener(FakeClient(), workers=1)
+        out = io.StringIO()
+
+        assert write_table(screener.screen(["x1", "v1"]), out) == 2
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert rows[0]["vesselId"] == "x1" and rows[0]["error"] == "403 Client Error"
+        assert rows[1]["flagChanges"] == "1"
+
+    def test_write_table_rejects_unknown_format(self):
+        with pytest.raises(ValueError):
+            write_table([], io.StringIO(), fmt="xml")
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+
+    def test_expiry(self):
+        """Entries vanish after their ttl."""
+        clock = Clock()
+        cache = TTLCache(10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=100)
+
+        assert cache.get("a") == 1 and "a" in cache
+        clock.now = 10
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_lru_bound(self):
+        """The least recently used entry is evicted when full."""
+        cache = TTLCache(60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_invalid_ttl(self):
+        with pytest.raises(ValueError):
+            TTLCache(0)
@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark for the package and the ``gfw`` CLI.
+
+Each check runs in a fresh interpreter so that modules imported by other
+tests do not hide a regression.
+"""
+import ast
+import subprocess
+import sys
+
+# Cumulative ``-X importtime`` budget for ``ais_global_fishing.__main__``
+# (microseconds).  Loading ``requests`` alone costs several times this.
+IMPORT_BUDGET_US = 50_000
+
+HEAVY_MODULES = ("requests", "dotenv", "urllib3", "ais_global_fishing.gfw_client_lib")
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _loaded_heavy_modules(code: str) -> list[str]:
+    probe = code + f"\nimport sys; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    return ast.literal_eval(_run(probe).stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Test suite for lazy imports and start-up time."""
+
+    def test_package_import_is_lazy(self):
+        """Importing the package does not load the HTTP stack."""
+        assert _loaded_heavy_modules("import ais_global_fishing") == []
+
+    def test_parse_args_is_lazy(self):
+        """Building the parser and parsing a command line loads nothing heavy."""
+        code = (
+            "from ais_global_fishing.__main__ import build_parser\n"
+            "build_parser().parse_args(['details', 'vessel1'])"
+        )
+        assert _loaded_heavy_modules(code) == []
+
+    def test_help_is_lazy(self):
+        """``gfw --help`` exits before any client code is imported."""
+        code = (
+            "import sys\n"
+            "from ais_global_fishing.__main__ import build_parser\n"
+            "try:\n"
+            "    build_parser().parse_args(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass"
+        )
+        assert _loaded_heavy_modules(code) == []
+
+    def test_client_still_importable(self):
+        """Accessing GFWClient triggers the real import."""
+        assert "requests" in _loaded_heavy_modules("from ais_global_fishing import GFWClient")
+
+    def test_import_time_budget(self):
+        """Cold import of the CLI module stays within IMPORT_BUDGET_US."""
+        module = "ais_global_fishing.__main__"
+        result = _run(f"import {module}", "-X", "importtime")
+        timings = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            cumulative = cumulative.strip()
+            if cumulative.isdigit():
+                timings[name.strip()] = int(cumulative)
+
+        assert timings[module] < IMPORT_BUDGET_US, (
+            f"{module} took {timings[module]} us to import (budget {IMPORT_BUDGET_US} us)"
+        )
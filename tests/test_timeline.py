@@ -0,0 +1,130 @@
+"""
+Tests for the vectorised vessel timelines.
+"""
+from datetime import timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ais_global_fishing.records import EventFields, event_fields  # noqa: E402
+from ais_global_fishing.timeline import PORT_VISIT, TRIP, build_timeline, parse_times  # noqa: E402
+
+
+def _visit(vessel, port, name, start, end):
+    """Port visit in the Gateway v3 shape."""
+    return {
+        "id": f"{vessel}-{start}",
+        "type": "port_visit",
+        "start": start,
+        "end": end,
+        "vessel": {"id": vessel},
+        "port_visit": {"intermediateAnchorage": {"id": port, "name": name, "flag": "ESP"}},
+    }
+
+
+VISITS = {
+    "entries": [
+        _visit("v2", "p1", "VIGO", "2024-01-01T00:00:00.000Z", "2024-01-02T00:00:00.000Z"),
+        _visit("v1", "p2", "CADIZ", "2024-01-10T00:00:00Z", "2024-01-10T12:00:00Z"),
+        _visit("v1", "p1", "VIGO", "2024-01-01T00:00:00Z", "2024-01-03T00:00:00Z"),
+        _visit("v1", "p3", "BILBAO", "2024-03-01T00:00:00Z", "2024-03-02T00:00:00Z"),
+        _visit("v2", "p2", "CADIZ", "2024-01-01T12:00:00Z", "2024-01-04T00:00:00Z"),
+    ]
+}
+
+
+class TestTimeline:
+    """Test suite for build_timeline and Timeline."""
+
+    def test_parse_times(self):
+        """Z suffixes, fractions, offsets and missing values are handled."""
+        parsed = parse_times(["2024-01-01T00:00:00.000Z", "2024-01-01T02:00:00+02:00", None, ""])
+
+        assert parsed[0] == np.datetime64("2024-01-01T00:00:00")
+        assert parsed[1] == np.datetime64("2024-01-01T00:00:00")
+        assert np.isnat(parsed[2]) and np.isnat(parsed[3])
+
+    def test_malformed_times_become_nat(self):
+        """One bad value costs only its own row, not the whole batch."""
+        parsed = parse_times(["2024-01-01T00:00:00Z", "not a time", "2024-13-01T00:00:00Z", "2024-01-01T02:00:00+02:00"])
+
+        assert parsed[0] == parsed[3] == np.datetime64("2024-01-01T00:00:00")
+        assert np.isnat(parsed[1]) and np.isnat(parsed[2])
+
+    def test_port_from_intermediate_anchorage(self):
+        """Fast path and fallback read the port from the same anchorage."""
+        visit = _visit("v1", "p1", "VIGO", "2024-01-01T00:00:00Z", None)
+        visit["port_visit"]["startAnchorage"] = {"id": "p0", "name": "OUTER", "flag": "ESP"}
+        nested = {**visit, "vessel": None, "vesselId": "v1"}  # not the plain shape
+        tl = build_timeline([{"entries": [visit, nested]}])
+
+        assert list(tl.port_id) == ["p1", "p1"]
+
+    def test_event_fields_spellings(self):
+        """v3 records, flat port fields and trips are read alike."""
+        encounter = {"start": "s", "end": "e", "vessel": {"id": "v1"}, "encounter": {"vessel": {"id": "v2"}}}
+        flat = {"start": "s", "vessel": {"id": "v1"}, "portId": "p1", "portName": "VIGO", "country": "ESP"}
+        trip = {"vesselId": "v1", "departureTime": "s", "arrivalTime": "e", "toPortId": "p2", "toPortName": "CADIZ"}
+
+        assert event_fields(encounter) == EventFields("v1", "s", "e", None, None, None, "v2")
+        assert event_fields(flat) == EventFields("v1", "s", None, "p1", "VIGO", "ESP", None)
+        assert event_fields(trip) == EventFields("v1", "s", "e", "p2", "CADIZ", None, None)
+
+    def test_sorted_per_vessel_with_durations(self):
+        """Rows are grouped by vessel and ordered by start time."""
+        tl = build_timeline([VISITS])
+
+        assert len(tl) == 5
+        assert list(tl.for_vessel("v1").port_name) == ["VIGO", "CADIZ", "BILBAO"]
+        assert list(tl.for_vessel("v1").duration_hours()) == [48.0, 12.0, 24.0]
+        assert tl.vessel_bounds() == {"v1": (0, 3), "v2": (3, 5)}
+        assert set(tl.kind) == {PORT_VISIT}
+
+    def test_port_legs(self):
+        """Consecutive visits of one vessel become legs; vessels never mix."""
+        legs = build_timeline([VISITS]).port_legs()
+
+        records = legs.to_records()
+        assert [(r["vesselId"], r["fromPortName"], r["toPortName"]) for r in records] == [
+            ("v1", "VIGO", "CADIZ"),
+            ("v1", "CADIZ", "BILBAO"),
+            ("v2", "VIGO", "CADIZ"),
+        ]
+        assert records[0]["departureTime"] == "2024-01-03T00:00:00Z"
+        assert list(legs.duration_hours()) == [168.0, 1212.0, -12.0]
+
+    def test_overlaps_and_gaps(self):
+        """Overlapping visits and long silences are found per vessel."""
+        tl = build_timeline([VISITS])
+
+        assert list(tl.overlaps()) == [3]
+        rows, hours = tl.gaps(timedelta(days=30))
+        assert list(rows) == [1]
+        assert list(hours) == [1212.0]
+
+    def test_trips_in_example_shape(self):
+        """get_trips output without a vessel id is assigned to the given vessel."""
+        trips = [
+            {
+                "departureTime": "2024-02-01T00:00:00Z",
+                "arrivalTime": "2024-02-05T00:00:00Z",
+                "fromPortId": "p1",
+                "fromPortName": "VIGO",
+                "toPortId": "p2",
+                "toPortName": "CADIZ",
+            }
+        ]
+        tl = build_timeline([VISITS, trips], vessel_id="v1")
+
+        assert list(tl.for_vessel("v1").kind) == [PORT_VISIT, PORT_VISIT, TRIP, PORT_VISIT]
+        leg = tl.trip_legs().to_records()[0]
+        assert (leg["vesselId"], leg["fromPortName"], leg["toPortName"]) == ("v1", "VIGO", "CADIZ")
+
+    def test_empty(self):
+        """Empty input yields an empty timeline."""
+        tl = build_timeline([{"entries": []}])
+
+        assert len(tl) == 0
+        assert len(tl.port_legs()) == 0
+        assert len(tl.overlaps()) == 0
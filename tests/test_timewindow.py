@@ -0,0 +1,63 @@
+"""
+Tests for TimeWindow and time normalisation.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from ais_global_fishing.timewindow import TimeWindow, format_time, to_utc
+
+UTC = timezone.utc
+
+
+class TestTimeWindow:
+    """Test suite for TimeWindow."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            datetime(2024, 1, 1),
+            datetime(2024, 1, 1, 2, tzinfo=timezone(timedelta(hours=2))),
+            date(2024, 1, 1),
+            1704067200,
+            1704067200.0,
+            "2024-01-01T00:00:00Z",
+            "2024-01-01T00:00:00+00:00Z",
+        ],
+    )
+    def test_supported_inputs_normalise_to_utc(self, value):
+        """Every accepted input type yields the same aware UTC datetime."""
+        assert to_utc(value) == datetime(2024, 1, 1, tzinfo=UTC)
+        assert format_time(value) == "2024-01-01T00:00:00Z"
+
+    def test_unsupported_input(self):
+        """Unknown types raise TypeError."""
+        with pytest.raises(TypeError):
+            to_utc(object())
+
+    def test_params(self):
+        """params() renders the API's start/end parameters."""
+        window = TimeWindow.of(datetime(2024, 1, 1, tzinfo=UTC), date(2024, 2, 1))
+
+        assert window.params() == {"start": "2024-01-01T00:00:00Z", "end": "2024-02-01T00:00:00Z"}
+
+    def test_invalid_range(self):
+        """An empty range raises ValueError."""
+        with pytest.raises(ValueError, match="'end' must be after 'start'"):
+            TimeWindow.of(date(2024, 1, 2), date(2024, 1, 1))
+
+    def test_split_into_steps(self):
+        """The last shard is truncated at *end*; shards tile the window."""
+        shards = TimeWindow.of(date(2024, 1, 1), date(2024, 1, 25)).split(timedelta(days=10))
+
+        assert [s.key() for s in shards] == [
+            "2024-01-01T00:00:00Z/2024-01-11T00:00:00Z",
+            "2024-01-11T00:00:00Z/2024-01-21T00:00:00Z",
+            "2024-01-21T00:00:00Z/2024-01-25T00:00:00Z",
+        ]
+
+    def test_split_none_returns_whole_window(self):
+        """step=None yields the full range."""
+        window = TimeWindow.of(date(2024, 1, 1), date(2024, 2, 1))
+
+        assert window.split(None) == [window]
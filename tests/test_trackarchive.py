@@ -0,0 +1,108 @@
+"""
+Tests for array tracks and the memory-mapped track archive.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ais_global_fishing import mockserver
+from ais_global_fishing.timewindow import to_utc
+from ais_global_fishing.trackarchive import TrackArchive, TrackFile, write_track
+from ais_global_fishing.tracks import Track
+
+
+def _geojson(lo="2024-01-01", hi="2024-01-08", resolution="1h"):
+    return mockserver._track("v1", 3, to_utc(lo).timestamp(), to_utc(hi).timestamp(), resolution)
+
+
+class TestTrack:
+    """Test suite for Track."""
+
+    def test_from_geojson_roundtrip(self):
+        """GeoJSON → arrays → GeoJSON preserves every point."""
+        page = _geojson()
+        track = Track.from_geojson(page, vessel_id="v1")
+
+        assert len(track) == 7 * 24
+        assert track.times[1] - track.times[0] == 3600
+        back = track.to_geojson()["features"][5]
+        assert back["geometry"] == page["features"][5]["geometry"]
+        assert back["properties"]["speed"] == page["features"][5]["properties"]["speed"]
+        assert back["properties"]["timestamp"] == "2024-01-01T05:00:00Z"
+
+    def test_concat_deduplicates(self):
+        """Overlapping shards merge into one sorted track; later points win."""
+        a = Track.from_geojson(_geojson("2024-01-01", "2024-01-03"))
+        b = Track.from_geojson(_geojson("2024-01-02", "2024-01-04"))
+        b.speed[:] = 99
+
+        joined = Track.concat([b, a])
+        assert len(joined) == 72
+        assert np.all(np.diff(joined.times) > 0)
+
+    def test_between(self):
+        track = Track.from_geojson(_geojson())
+        day = track.between("2024-01-02", "2024-01-03")
+
+        assert len(day) == 24
+        assert day.datetimes[0] == np.datetime64("2024-01-02T00:00:00")
+
+
+class TestTrackArchive:
+    """Test suite for TrackArchive and TrackFile."""
+
+    def test_write_and_slice(self, tmp_path):
+        """Time slices come back exactly, within quantisation."""
+        track = Track.from_geojson(_geojson("2024-01-01", "2024-03-01", "10m"), vessel_id="v1")
+        archive = TrackArchive(tmp_path, block_size=100)
+        archive.write(track)
+
+        back = archive.read("v1")
+        assert np.array_equal(back.times, track.times)
+        assert np.abs(back.lat - track.lat).max() <= 5e-7
+        assert np.nanmax(np.abs(back.speed - track.speed)) <= 0.005
+
+        for lo, hi in (("2024-01-15T03:05", "2024-02-02"), ("2023-01-01", "2024-01-01T00:10"), ("2024-02-29T23:55", "2025-01-01")):
+            expected = track.between(lo, hi)
+            got = archive.read("v1", lo, hi)
+            assert np.array_equal(got.times, expected.times)
+
+    def test_columns_are_views(self, tmp_path):
+        """Raw columns are read-only views onto the mapping."""
+        track = Track.from_geojson(_geojson())
+        write_track(tmp_path / "v.gfwt", track, block_size=16)
+
+        with TrackFile(tmp_path / "v.gfwt") as tf:
+            cols = tf.columns("2024-01-02", "2024-01-03")
+            assert len(cols["lat"]) == 24
+            assert not cols["lat"].flags.writeable
+            assert not cols["lat"].flags.owndata
+            del cols
+
+    def test_merge_on_write(self, tmp_path):
+        """Writing new points extends the archived history."""
+        archive = TrackArchive(tmp_path)
+        archive.write(Track.from_geojson(_geojson("2024-01-01", "2024-01-05")), "v/1")
+        archive.write(Track.from_geojson(_geojson("2024-01-04", "2024-01-08")), "v/1")
+
+        assert archive.vessel_ids() == ["v/1"]
+        assert len(archive.read("v/1")) == 7 * 24
+
+    def test_missing_values_and_empty(self, tmp_path):
+        """Unknown speed survives as nan; empty tracks are valid files."""
+        track = Track.from_geojson(_geojson("2024-01-01", "2024-01-02"))
+        track.speed[3] = np.nan
+        archive = TrackArchive(tmp_path)
+        archive.write(track, "v1")
+        archive.write(Track.empty(), "empty")
+
+        assert np.isnan(archive.read("v1").speed[3])
+        assert len(archive.read("empty", "2024-01-01", "2024-02-01")) == 0
+
+    def test_rejects_foreign_files(self, tmp_path):
+        path = tmp_path / "x.gfwt"
+        path.write_bytes(b"not an archive" * 10)
+        with pytest.raises(ValueError):
+            TrackFile(path)
+        with pytest.raises(KeyError):
+            TrackArchive(tmp_path).read("unknown")
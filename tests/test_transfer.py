@@ -0,0 +1,105 @@
+"""
+Tests for content-encoding negotiation and transfer accounting.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.mockserver import serve_in_thread
+from ais_global_fishing.transfer import (
+    TransferStats,
+    accept_encoding,
+    available_encodings,
+    measure,
+)
+from ais_global_fishing.transport import RecordedResponse
+
+VESSEL = "mock-vessel-0001"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with serve_in_thread(latency="fixed:0") as srv:
+        yield srv
+
+
+class TestNegotiation:
+    """Test suite for the Accept-Encoding header."""
+
+    def test_gzip_always_offered(self):
+        """gzip and deflate are offered whatever codecs are installed."""
+        encodings = available_encodings()
+        assert encodings[-2:] == ["gzip", "deflate"]
+        assert accept_encoding() == ", ".join(encodings)
+
+    def test_optional_codecs(self, monkeypatch):
+        """br and zstd are offered only when their codecs are importable."""
+        monkeypatch.setattr("ais_global_fishing.transfer._installed", lambda *names: True)
+        assert available_encodings() == ["zstd", "br", "gzip", "deflate"]
+        monkeypatch.setattr("ais_global_fishing.transfer._installed", lambda *names: False)
+        assert available_encodings() == ["gzip", "deflate"]
+
+    def test_client_sends_header(self):
+        """The client session advertises the available encodings."""
+        client = GFWClient(api_key="test")
+        assert client.session.headers["Accept-Encoding"] == accept_encoding()
+
+
+class TestTransferStats:
+    """Test suite for TransferStats."""
+
+    def test_measure_replayed_response(self):
+        """Responses without a socket count their body as wire bytes."""
+        resp = RecordedResponse(200, b'{"entries": []}', {"Content-Type": "application/json"})
+        assert measure(resp) == (15, 15, "identity")
+
+    def test_measure_ignores_test_doubles(self):
+        """Objects without a byte body are not counted."""
+        assert measure(MagicMock()) is None
+
+    def test_per_family_counters(self):
+        """Requests are grouped by endpoint family and totalled."""
+        stats = TransferStats()
+        resp = RecordedResponse(200, b"x" * 100, {"Content-Encoding": "gzip", "Content-Length": "20"})
+        stats.record("/events", resp)
+        stats.record("/vessels/abc/track", resp)
+        stats.record("/vessels/def/track", resp)
+        families = stats.by_family()
+        assert families["vessels/track"].requests == 2
+        assert families["events"].ratio == pytest.approx(100 / 20)
+        total = stats.total()
+        assert total.requests == 3
+        assert total.body_bytes == 300
+        assert total.encodings == {"gzip": 3}
+        assert "vessels/track" in stats.report()
+        stats.reset()
+        assert stats.by_family() == {}
+
+
+class TestCompressedTransport:
+    """End-to-end against the mock gateway."""
+
+    def test_gzip_response_accounted(self, server):
+        """Large bodies arrive gzip-compressed and decode transparently."""
+        client = GFWClient(api_key="test", base_url=server.base_url)
+        track = client.get_track(VESSEL, "2024-01-01", "2024-02-01")
+        assert track["features"]
+
+        counter = client.transfer.by_family()["vessels/track"]
+        assert counter.encodings == {"gzip": 1}
+        assert counter.wire_bytes < counter.body_bytes / 3
+        assert counter.ratio > 3
+
+    def test_identity_when_not_accepted(self, server):
+        """Clients that do not accept gzip get plain bodies."""
+        client = GFWClient(api_key="test", base_url=server.base_url)
+        client.session.headers["Accept-Encoding"] = "identity"
+        plain = client.get_track(VESSEL, "2024-01-01", "2024-02-01")
+
+        counter = client.transfer.by_family()["vessels/track"]
+        assert counter.encodings == {"identity": 1}
+        assert counter.wire_bytes == counter.body_bytes
+
+        compressed = GFWClient(api_key="test", base_url=server.base_url)
+        assert compressed.get_track(VESSEL, "2024-01-01", "2024-02-01") == plain
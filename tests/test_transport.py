@@ -0,0 +1,120 @@
+"""
+Tests for the record / replay transports.
+"""
+import time
+
+import pytest
+from requests.exceptions import HTTPError
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.transport import RecordedResponse, RecordingTransport, ReplayTransport
+
+
+class FakeTransport:
+    """Answers every GET with the request parameters, every HEAD with 200."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params):
+        self.calls += 1
+        body = ('{"path": "%s", "n": %d}' % (url.rsplit("/", 1)[-1], self.calls)).encode()
+        return RecordedResponse(200, body, {"Content-Type": "application/json"}, url)
+
+    def head(self, url):
+        return RecordedResponse(200, b"", {}, url)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Record a small session through GFWClient and return the archive path."""
+    path = tmp_path / "session.jsonl.gz"
+    with RecordingTransport(FakeTransport(), path) as recorder:
+        client = GFWClient(api_key="test", transport=recorder)
+        client.get_trips("v1")
+        client.get_vessels_bulk(["b", "a"])
+        client.get_track("v1", "2024-01-01", "2024-01-02")
+    return path
+
+
+class TestTransport:
+    """Test suite for RecordingTransport and ReplayTransport."""
+
+    def test_replay_serves_recorded_responses(self, archive):
+        """Replayed responses match the recording, with canonical matching."""
+        replay = ReplayTransport(archive)
+        client = GFWClient(api_key="offline", transport=replay)
+
+        assert client.get_trips("v1") == {"path": "trips", "n": 1}
+        assert client.get_vessels_bulk(["a", "b", "a"]) == {"path": "vessels", "n": 2}
+        assert client.get_track("v1", "2024-01-01", "2024-01-02")["n"] == 3
+        assert replay.misses == 0
+
+    def test_unrecorded_request_is_404(self, archive):
+        """Unknown requests raise HTTPError like a real 404 would."""
+        client = GFWClient(api_key="offline", transport=ReplayTransport(archive))
+
+        with pytest.raises(HTTPError, match="404"):
+            client.get_trips("unknown")
+        with pytest.raises(FileNotFoundError):
+            client.get_track("unknown", "2024-01-01", "2024-01-02")
+
+    def test_injected_errors(self, archive):
+        """error_rate=1 turns every GET into the configured status."""
+        client = GFWClient(
+            api_key="offline",
+            transport=ReplayTransport(archive, error_rate=1.0, error_status=429, seed=1),
+        )
+
+        with pytest.raises(HTTPError) as excinfo:
+            client.get_trips("v1")
+        assert excinfo.value.response.status_code == 429
+        assert excinfo.value.response.headers["retry-after"] == "1"
+
+    def test_injected_latency(self, archive):
+        """A fixed latency delays every response."""
+        client = GFWClient(api_key="offline", transport=ReplayTransport(archive, latency=0.05))
+
+        started = time.perf_counter()
+        client.get_trips("v1")
+        assert time.perf_counter() - started >= 0.05
+
+    def test_invalid_error_rate(self, archive):
+        """error_rate outside [0, 1] is rejected."""
+        with pytest.raises(ValueError):
+            ReplayTransport(archive, error_rate=2)
+
+
+class TestThreadLocalTransport:
+    """Test suite for ThreadLocalTransport."""
+
+    def test_sessions_per_thread_share_adapter(self):
+        """Each thread gets its own session; all mount the same adapter and headers."""
+        import threading
+
+        import requests
+
+        from ais_global_fishing.transport import ThreadLocalTransport
+
+        template = requests.Session()
+        template.headers["Authorization"] = "Bearer test"
+        transport = ThreadLocalTransport(template, pool_size=4)
+        sessions = []
+
+        def grab():
+            sessions.append(transport._session())
+
+        threads = [threading.Thread(target=grab) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        grab()
+        grab()
+
+        assert len({id(s) for s in sessions}) == 4
+        assert all(s.get_adapter("https://x") is transport.adapter for s in sessions)
+        assert template.get_adapter("https://x") is transport.adapter
+        template.headers["X-Extra"] = "1"
+        assert sessions[0].headers["X-Extra"] == "1"
+        transport.close()
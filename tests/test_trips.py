@@ -0,0 +1,166 @@
+"""
+Tests for local, incremental trip segmentation.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ais_global_fishing import GFWClient  # noqa: E402
+from ais_global_fishing.mockserver import serve_in_thread  # noqa: E402
+from ais_global_fishing.tracks import Track  # noqa: E402
+from ais_global_fishing.trips import TripBook, trip_stats  # noqa: E402
+
+
+def _visit(vessel, port, start, end, rid=None):
+    """Port visit in the Gateway v3 shape."""
+    return {
+        "id": rid or f"{vessel}-{start}",
+        "type": "port_visit",
+        "start": start,
+        "end": end,
+        "vessel": {"id": vessel},
+        "port_visit": {"intermediateAnchorage": {"id": port, "name": port.upper(), "flag": "ESP"}},
+    }
+
+
+FIRST = {
+    "entries": [
+        _visit("v1", "vigo", "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z"),
+        _visit("v2", "cadiz", "2024-01-01T00:00:00Z", "2024-01-01T12:00:00Z"),
+        _visit("v1", "cadiz", "2024-01-05T00:00:00Z", "2024-01-06T00:00:00Z"),
+    ]
+}
+
+
+def _track(vessel_id, hours, lat):
+    """Hourly fixes due north along the 0° meridian."""
+    times = np.datetime64("2024-01-01T00:00:00", "s").astype(np.int64) + np.asarray(hours, dtype=np.int64) * 3600
+    n = len(times)
+    nan = np.full(n, np.nan, dtype=np.float32)
+    return Track(times, np.asarray(lat, dtype=np.float64), np.zeros(n), nan, nan.copy(), vessel_id)
+
+
+class TestTripBook:
+    """Test suite for TripBook."""
+
+    def test_trips_between_consecutive_visits(self):
+        """A trip runs from the end of one visit to the start of the next."""
+        book = TripBook()
+        added = book.add(FIRST)
+        records = added.to_records()
+        assert len(book) == 3 and len(added) == 1
+        assert records == [
+            {
+                "vesselId": "v1",
+                "fromPortId": "vigo",
+                "fromPortName": "VIGO",
+                "toPortId": "cadiz",
+                "toPortName": "CADIZ",
+                "departureTime": "2024-01-02T00:00:00Z",
+                "arrivalTime": "2024-01-05T00:00:00Z",
+            }
+        ]
+        assert book.watermark == np.datetime64("2024-01-05T00:00:00")
+
+    def test_incremental_updates(self):
+        """Only trips touching added or replaced visits are reported."""
+        book = TripBook()
+        book.add(FIRST)
+        # A new v1 visit, a re-sent (closed) v2 visit and a new v2 visit.
+        update = {
+            "entries": [
+                _visit("v1", "vigo", "2024-01-09T00:00:00Z", "2024-01-10T00:00:00Z"),
+                _visit("v2", "cadiz", "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z"),
+                _visit("v2", "bilbao", "2024-01-04T00:00:00Z", None),
+            ]
+        }
+        changed = book.add(update).to_records()
+        assert [(r["vesselId"], r["fromPortId"], r["toPortId"]) for r in changed] == [
+            ("v1", "cadiz", "vigo"),
+            ("v2", "cadiz", "bilbao"),
+        ]
+        assert changed[1]["departureTime"] == "2024-01-02T00:00:00Z"
+        assert len(book) == 5 and len(book.trips()) == 3
+        assert len(book.add({"entries": []})) == 0
+
+    def test_save_and_load(self, tmp_path):
+        """Saved visits load back into the same trips."""
+        book = TripBook()
+        book.add(FIRST)
+        book.save(tmp_path / "visits.json")
+        loaded = TripBook.load(tmp_path / "visits.json")
+        assert loaded.trips().to_records() == book.trips().to_records()
+        assert loaded.to_records() == book.to_records()
+
+    def test_first_sync_needs_start(self):
+        with pytest.raises(ValueError):
+            TripBook().sync(None, end="2024-01-01")
+
+    def test_sync_matches_get_trips(self):
+        """Trips from fleet-wide visit syncs equal the per-vessel endpoint."""
+        fleet = [f"mock-vessel-{i:04d}" for i in range(5)]
+        with serve_in_thread(page_size=10_000) as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+            book = TripBook()
+            book.sync(client, "2023-07-01", start="2023-01-01", vessel_ids=fleet)
+            before = len(book.trips())
+            new = book.sync(client, "2025-01-01")
+            assert len(new) == len(book.trips()) - before > 0
+            assert server.stats.requests == 2
+
+            def key(trip):
+                times = (trip["departureTime"], trip["arrivalTime"])
+                return (trip["fromPortId"], trip["toPortId"], *(t.replace(".000Z", "Z") for t in times))
+
+            for vid in fleet:
+                expected = [key(t) for t in client.get_trips(vid)["entries"]]
+                got = [key(r) for r in book.trips().to_records() if r["vesselId"] == vid]
+                assert got == expected
+
+
+    def test_sync_follows_pages(self):
+        """Every page is stored; a failed fetch leaves the watermark alone."""
+        fleet = [f"mock-vessel-{i:04d}" for i in range(10)]
+        with serve_in_thread(page_size=20) as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+            book = TripBook()
+            book.sync(client, "2024-06-01", start="2023-01-01", vessel_ids=fleet)
+            expected = client.get_port_visits("2023-01-01", "2024-06-01", vessel_ids=fleet, all_pages=True)
+            assert len(book) == expected["total"] > 20
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("503")
+
+        watermark = book.watermark
+        client.get_port_visits = fail
+        with pytest.raises(RuntimeError):
+            book.sync(client, "2025-01-01")
+        assert book.watermark == watermark and len(book) == expected["total"]
+
+
+class TestTripStats:
+    """Test suite for trip_stats()."""
+
+    def test_fixes_distance_and_speed(self):
+        """Fixes are assigned to the trip of their vessel and time."""
+        book = TripBook()
+        trips = book.add(FIRST)  # v1: 2024-01-02 → 2024-01-05
+        tracks = [
+            # v1: in port, then 3 hourly fixes 0.1° apart at sea, then after arrival.
+            _track("v1", [0, 30, 31, 32, 100], [0, 1.0, 1.1, 1.3, 5]),
+            _track("v2", [30, 31], [0, 1]),
+            _track("unknown", [30], [0]),
+        ]
+        stats = trip_stats(trips, tracks)
+        assert len(stats) == 1
+        assert stats.points.tolist() == [3]
+        assert stats.hours.tolist() == [72.0]
+        assert stats.distance[0] == pytest.approx(18.0, abs=0.02)
+        assert stats.max_speed[0] == pytest.approx(12.0, abs=0.02)
+        assert stats.to_records()[0]["avgSpeedKnots"] == pytest.approx(0.25, abs=0.01)
+
+    def test_trip_without_fixes(self):
+        stats = trip_stats(TripBook().add(FIRST), [])
+        assert stats.to_records() == [
+            {"points": 0, "distanceNm": 0.0, "hours": 72.0, "avgSpeedKnots": None, "maxSpeedKnots": None}
+        ]
@@ -0,0 +1,205 @@
+"""
+Tests for the watch-list polling scheduler and the token bucket.
+"""
+import io
+from datetime import timedelta
+
+import pytest
+
+from ais_global_fishing.ratelimit import TokenBucket
+from ais_global_fishing.timewindow import format_time, to_utc
+from ais_global_fishing.watchlist import WatchScheduler
+
+T0 = 1_700_000_000.0
+
+
+class Clock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """
+    Event collections over an in-memory list of events, in pages of
+    *page_size*; only the first page unless ``all_pages=True``.
+    """
+
+    def __init__(self, page_size=2):
+        self.events = []
+        self.calls = []
+        self.fail = False
+        self.page_size = page_size
+
+    def add(self, vessel_id, ts, event_id):
+        self.events.append({"id": event_id, "start": format_time(ts), "vessel": {"id": vessel_id}})
+
+    def _get_event_collection(self, collection, start, end, vessel_ids=None, *, all_pages=False):
+        self.calls.append((collection, tuple(vessel_ids)))
+        if self.fail:
+            raise RuntimeError("503 Server Error")
+        lo, hi = to_utc(start).timestamp(), to_utc(end).timestamp()
+        entries = [
+            e for e in self.events
+            if e["vessel"]["id"] in vessel_ids and lo <= to_utc(e["start"]).timestamp() < hi
+        ]
+        if all_pages or len(entries) <= self.page_size:
+            return {"entries": entries, "nextOffset": None}
+        return {"entries": entries[: self.page_size], "nextOffset": self.page_size}
+
+
+def _scheduler(client, clock, budget=1000, **kwargs):
+    bucket = TokenBucket(budget / 60.0, burst=budget, clock=clock)
+    return WatchScheduler(client, collections=["fishing"], clock=clock, bucket=bucket, **kwargs)
+
+
+class TestWatchScheduler:
+    """Test suite for WatchScheduler."""
+
+    def test_batches_vessel_ids(self):
+        """Due vessels are refreshed with one request per batch and collection."""
+        client, clock = FakeClient(), Clock()
+        scheduler = _scheduler(client, clock, batch_size=50)
+        for i in range(120):
+            scheduler.watch(f"v{i}")
+
+        scheduler.tick()
+
+        assert [len(ids) for _, ids in client.calls] == [50, 50, 20]
+        assert scheduler.stats.refreshed == 120
+        assert scheduler.tick() == []
+        assert len(client.calls) == 3
+
+    def test_budget_defers_and_prioritises(self):
+        """Only the budget is spent; the most stale × risky vessels go first."""
+        client, clock = FakeClient(), Clock()
+        scheduler = _scheduler(client, clock, budget=1, batch_size=1)
+        scheduler.watch("low", every=timedelta(hours=1), risk=1)
+        scheduler.watch("high", every=timedelta(hours=1), risk=5)
+
+        scheduler.tick()
+        clock.now += 60
+        scheduler.tick()
+        assert len(client.calls) == 2
+
+        clock.now += 2 * 3600
+        scheduler.tick()
+        assert client.calls[-1] == ("fishing", ("high",))
+        clock.now += 60
+        scheduler.tick()
+        assert client.calls[-1] == ("fishing", ("low",))
+
+    def test_change_notifications(self):
+        """Only events not seen before are reported, once."""
+        client, clock = FakeClient(), Clock()
+        received = []
+        scheduler = _scheduler(client, clock, on_change=received.append)
+        scheduler.watch("v1", every=timedelta(hours=1))
+        client.add("v1", T0 - 3600, "old")
+
+        assert scheduler.tick() == []
+
+        clock.now += 3600
+        for i in range(3):
+            client.add("v1", clock.now - 60 + i, f"new-{i}")
+        changes = scheduler.tick()
+        assert [(c.vessel_id, c.collection, c.event["id"]) for c in changes] == [
+            ("v1", "fishing", "new-0"),
+            ("v1", "fishing", "new-1"),
+            ("v1", "fishing", "new-2"),
+        ]
+        assert received == changes
+
+        clock.now += 3600
+        assert scheduler.tick() == []
+
+    def test_failed_batch_is_retried(self):
+        """A failing request is logged and the batch retried with backoff."""
+        client, clock, log = FakeClient(), Clock(), io.StringIO()
+        scheduler = _scheduler(client, clock, log=log)
+        scheduler.watch("v1", every=timedelta(hours=1))
+        client.fail = True
+
+        scheduler.tick()
+        assert scheduler.stats.errors == 1
+        assert "[failed]" in log.getvalue()
+        assert scheduler.next_due() == T0 + 60
+
+        client.fail = False
+        clock.now += 60
+        scheduler.tick()
+        assert scheduler.stats.refreshed == 1
+        assert scheduler.next_due() == T0 + 60 + 3600
+
+    def test_budget_below_one_batch_is_rejected(self):
+        """A bucket that can never pay for one batch is refused up front."""
+        clock = Clock()
+        bucket = TokenBucket(1 / 60.0, burst=1, clock=clock)
+        with pytest.raises(ValueError, match="batch needs 2"):
+            WatchScheduler(FakeClient(), collections=["fishing", "loitering"], clock=clock, bucket=bucket)
+
+    def test_new_interval_reschedules(self):
+        """Changing a vessel's interval moves its next refresh."""
+        client, clock = FakeClient(), Clock()
+        scheduler = _scheduler(client, clock)
+        scheduler.watch("v1", every=timedelta(days=1))
+        scheduler.tick()
+        assert scheduler.next_due() == T0 + 86400
+
+        scheduler.watch("v1", every=timedelta(hours=1))
+        assert scheduler.next_due() == T0 + 3600
+        clock.now += 3600
+        scheduler.tick()
+        assert len(client.calls) == 2
+
+        scheduler.watch("v1", every=timedelta(hours=1), risk=3)
+        clock.now += 3600
+        scheduler.tick()
+        assert len(client.calls) == 3
+
+    def test_unwatch(self):
+        """Unwatched vessels are no longer polled."""
+        client, clock = FakeClient(), Clock()
+        scheduler = _scheduler(client, clock)
+        scheduler.watch("v1")
+        scheduler.unwatch("v1")
+
+        assert scheduler.tick() == []
+        assert client.calls == []
+        assert "v1" not in scheduler
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket."""
+
+    def test_refill(self):
+        """Tokens are spent and refilled at the configured rate."""
+        clock = Clock(0.0)
+        bucket = TokenBucket(2.0, burst=2, clock=clock)
+
+        assert bucket.take() is None
+        assert bucket.take() is None
+        assert bucket.take() == pytest.approx(0.5)
+        clock.now += 0.5
+        assert bucket.take() is None
+
+    def test_slow_rate_holds_one_token(self):
+        """Below one token per second the bucket still holds one whole token."""
+        clock = Clock(0.0)
+        bucket = TokenBucket(0.5, clock=clock)
+
+        assert bucket.capacity == 1.0
+        assert bucket.take() is None
+        assert bucket.take() == pytest.approx(2.0)
+        with pytest.raises(ValueError):
+            bucket.take(2)
+        with pytest.raises(ValueError):
+            TokenBucket(2.0, burst=0.5)
+
+    def test_unlimited(self):
+        """rate=None never throttles."""
+        bucket = TokenBucket(None)
+        assert all(bucket.take() is None for _ in range(1000))
+        assert bucket.acquire(timeout=0)
@@ -0,0 +1,137 @@
+"""
+Tests for declarative workflow plans.
+"""
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ais_global_fishing import GFWClient
+from ais_global_fishing.cache import TTLCache
+from ais_global_fishing.mockserver import serve_in_thread
+from ais_global_fishing.workflow import (
+    DETAILS,
+    EVENTS,
+    PORT_VISITS,
+    RISK,
+    SEARCH,
+    TRACK,
+    TRIPS,
+    Step,
+    Workflow,
+    search_ids,
+)
+
+WINDOW = {"start": "2024-03-01", "end": "2024-03-08"}
+
+
+def slow_client(delay=0.05):
+    """Client whose calls each take *delay* seconds and echo their target."""
+    client = MagicMock()
+
+    def answer(kind):
+        def call(*args, **kwargs):
+            time.sleep(delay)
+            target = kwargs.get("query") or args[0]
+            if kind == SEARCH:
+                return {"entries": [{"selfReportedInfo": [{"id": f"found-{target}"}]}]}
+            return {"kind": kind, "target": target}
+
+        return call
+
+    client.search_vessels.side_effect = answer(SEARCH)
+    client.get_vessel_details.side_effect = answer(DETAILS)
+    client.get_track.side_effect = answer(TRACK)
+    client.get_events.side_effect = answer(EVENTS)
+    client.get_trips.side_effect = answer(TRIPS)
+    client.get_risk.side_effect = RuntimeError("403 Forbidden")
+    return client
+
+
+class TestPlan:
+    """Test suite for Workflow construction and plan()."""
+
+    def test_validation(self):
+        """Unknown products and missing windows are rejected."""
+        with pytest.raises(ValueError, match="unknown"):
+            Workflow(["weather"])
+        with pytest.raises(ValueError, match="start and end"):
+            Workflow([TRACK])
+        assert Workflow([DETAILS, TRIPS]).products == (DETAILS, TRIPS)
+
+    def test_plan(self):
+        """Searches and the products of known vessels, de-duplicated."""
+        flow = Workflow([DETAILS, TRIPS])
+        assert flow.plan(["v1", "v1"], ["ABC"]) == [
+            Step(SEARCH, "ABC"),
+            Step(DETAILS, "v1"),
+            Step(TRIPS, "v1"),
+        ]
+
+    def test_search_ids(self):
+        """Ids come from selfReportedInfo, or from a plain id."""
+        page = {"entries": [{"selfReportedInfo": [{"id": "a"}]}, {"id": "b"}, {}]}
+        assert search_ids(page) == ["a", "b"]
+        assert search_ids(page, 1) == ["a"]
+
+
+class TestRun:
+    """Test suite for Workflow.run() and warm()."""
+
+    def test_products_and_pipelining(self):
+        """Independent requests overlap; searched vessels get their products."""
+        client = slow_client()
+        flow = Workflow([DETAILS, TRACK, EVENTS, TRIPS], **WINDOW)
+        result = flow.run(client, ["v1", "v2"], ["Q1", "Q2"], workers=16)
+
+        assert result.searches == {"Q1": ["found-Q1"], "Q2": ["found-Q2"]}
+        assert set(result.vessels) == {"v1", "v2", "found-Q1", "found-Q2"}
+        assert result.vessels["found-Q1"][TRACK] == {"kind": TRACK, "target": "found-Q1"}
+        assert result.requests == 2 + 4 * 4
+        # 18 calls of 50 ms: sequential 0.9 s, critical path search + product.
+        assert result.critical_path == pytest.approx(0.1, abs=0.04)
+        assert result.elapsed < 0.4
+        client.get_track.assert_any_call("v1", "2024-03-01", "2024-03-08", resolution="1h")
+
+    def test_errors_do_not_stop_the_run(self):
+        """A failing product is reported; the others are kept."""
+        result = Workflow([DETAILS, RISK]).run(slow_client(0), ["v1"])
+        assert result.errors == {Step(RISK, "v1"): "403 Forbidden"}
+        assert list(result.vessels["v1"]) == [DETAILS]
+        with pytest.raises(ValueError):
+            Workflow([DETAILS]).run(slow_client(0), ["v1"], workers=0)
+
+    def test_products_hold_every_page(self):
+        """List products are not cut off at the server's page size."""
+        vid = "mock-vessel-0000"
+        flow = Workflow([EVENTS, PORT_VISITS, TRIPS], start="2023-10-01", end="2024-03-01")
+        with serve_in_thread(page_size=5) as server:
+            client = GFWClient(api_key="test", base_url=server.base_url)
+            products = flow.run(client, [vid]).vessels[vid]
+            expected = {
+                EVENTS: client.get_events(vid, "2023-10-01", "2024-03-01", all_pages=True),
+                PORT_VISITS: client.get_port_visits("2023-10-01", "2024-03-01", vessel_ids=[vid], all_pages=True),
+                TRIPS: client.get_trips(vid, all_pages=True),
+            }
+
+        for product, page in expected.items():
+            assert len(products[product]["entries"]) == page["total"] > 5
+
+    def test_warm_fills_the_cache(self):
+        """After warming, the same plan is answered from the cache."""
+        fleet = [f"mock-vessel-{i:04d}" for i in range(3)]
+        flow = Workflow([DETAILS, EVENTS, TRIPS], **WINDOW)
+        with serve_in_thread() as server:
+            with pytest.raises(ValueError, match="cache"):
+                flow.warm(GFWClient(api_key="test", base_url=server.base_url), fleet)
+
+            client = GFWClient(api_key="test", base_url=server.base_url, cache=TTLCache(60), thread_safe=True)
+            warmed = flow.warm(client, fleet, ["368045130"])
+            sent = server.stats.requests
+            result = flow.run(client, fleet, ["368045130"])
+
+        assert warmed.requests == result.requests == 1 + 4 * 3
+        assert warmed.vessels[fleet[0]] == {}
+        assert sent == warmed.requests
+        assert server.stats.requests == sent
+        assert result.vessels[fleet[0]][TRIPS]["entries"]